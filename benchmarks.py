@@ -0,0 +1,617 @@
+#!/usr/bin/env python3
+"""Benchmarks de rendimiento para la aplicación Notas
+
+Miden latencia y throughput de las estadísticas de texto, la carga y el
+guardado, el render de Markdown, las búsquedas y el escaneo del directorio
+de notas sobre corpus sintéticos: documentos de 1 KB a 500 MB y árboles de
+10 a 100k notas. No necesitan pantalla: solo usan componentes core y, para
+las señales asíncronas, un GLib.MainLoop sin ventanas.
+
+    python3 benchmarks.py                             # perfil rápido
+    python3 benchmarks.py --full --output base.json   # corpus completos
+    python3 benchmarks.py --baseline base.json        # falla si algo empeora
+"""
+
+import argparse
+import importlib.util
+import itertools
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from core.storage import AtomicWriter, DURABILITY_FILE
+from core.search import IncrementalMatcher, MODE_PLAIN, MODE_IGNORE_CASE, MODE_REGEX
+from core.notes_tree import iter_note_files
+from core.notes_catalog import NotesCatalog
+from core.quick_open import TrigramIndex
+from core.note_grep import ParallelGrep
+from core.task_index import TaskIndex
+from core.link_graph import LinkGraph
+
+# Components built on GObject signals are measured only with PyGObject
+try:
+    import gi
+    gi.require_version('GLib', '2.0')
+    from gi.repository import GLib
+    from core.text_processor import TextProcessor
+    from core.file_manager import FileManager
+    from core.large_file import LargeFile
+    from core.markdown_preview import MarkdownPreview
+    from core.note_index import NoteIndex
+except (ImportError, ValueError):
+    GLib = None
+
+HAVE_MARKDOWN = importlib.util.find_spec('markdown') is not None
+
+KB = 1024
+MB = 1024 * 1024
+
+# Document sizes (chars) and notes tree sizes of each profile
+PROFILES = {
+    'quick': {'sizes': (KB, 64 * KB, MB), 'notes': (10, 1000)},
+    'full': {'sizes': (KB, 64 * KB, MB, 16 * MB, 100 * MB, 500 * MB), 'notes': (10, 1000, 10000, 100000)},
+}
+GROUPS = ('stats', 'file', 'markdown', 'search', 'scan')
+
+# Documents from this size on open in the memory-mapped viewer, not the editor
+LARGE_FILE_THRESHOLD = FileManager.LARGE_FILE_THRESHOLD if GLib else 64 * MB
+# Bigger documents are not rendered: python-markdown takes minutes on them
+MARKDOWN_MAX_SIZE = 16 * MB
+# Corpora from this size on (bytes, or 2 KB per note) are measured once
+SINGLE_RUN_SIZE = 16 * MB
+
+# A benchmark regresses when its median is this much slower than the
+# baseline's and by at least NOISE_MS (shorter differences are timer noise)
+DEFAULT_TOLERANCE = 0.25
+NOISE_MS = 0.5
+
+RESULTS_VERSION = 1
+KEYSTROKES = 1000
+DOCUMENT_QUERIES = (
+    (MODE_PLAIN, 'revisar'),
+    (MODE_IGNORE_CASE, 'PROYECTO'),
+    (MODE_REGEX, r'\[\[[^\]]+\]\]'),
+)
+NOTE_QUERIES = ('nota 12', 'revis', 'diseño', 'carpeta 7', 'servidr')
+# Not in any note: the grep has to read every file
+GREP_PATTERN = r'clave-inexistente-\d+'
+
+_WORDS = ('nota idea proyecto reunión tarea código revisar enlace equipo lunes martes plan '
+          'diseño prueba error versión cliente servidor archivo texto búsqueda índice rápido '
+          'lento memoria disco red usuario datos página título resumen fecha cambio').split()
+
+# Synthetic corpora
+
+def _sentence(rng, words):
+    """Random words, capitalized, without a final period"""
+    text = ' '.join(rng.choice(_WORDS) for _ in range(words))
+    return text[0].upper() + text[1:]
+
+def _paragraph(rng):
+    """A paragraph with emphasis, inline code and links"""
+    parts = []
+    for _ in range(rng.randrange(2, 6)):
+        sentence = _sentence(rng, rng.randrange(6, 16))
+        decoration = rng.randrange(6)
+        if decoration == 0:
+            sentence += f' **{rng.choice(_WORDS)}**'
+        elif decoration == 1:
+            sentence += f' `{rng.choice(_WORDS)}()`'
+        elif decoration == 2:
+            sentence += f' [{rng.choice(_WORDS)}](https://example.com/{rng.choice(_WORDS)})'
+        elif decoration == 3:
+            sentence += f' [[Nota {rng.randrange(1000)}]]'
+        parts.append(sentence + '.')
+    return ' '.join(parts) + '\n\n'
+
+def _block(rng):
+    """A random top-level markdown block"""
+    kind = rng.randrange(10)
+    if kind == 0:
+        return f"{'#' * rng.randrange(1, 4)} {_sentence(rng, rng.randrange(2, 6))}\n\n"
+    if kind == 1:
+        return ''.join(f'- {_sentence(rng, rng.randrange(3, 10))}\n' for _ in range(rng.randrange(2, 7))) + '\n'
+    if kind == 2:
+        return ''.join(f"- [{rng.choice(' x')}] {_sentence(rng, rng.randrange(3, 9))}\n"
+                       for _ in range(rng.randrange(1, 6))) + '\n'
+    if kind == 3:
+        lines = ''.join(f'    {rng.choice(_WORDS)} = {rng.randrange(1000)}\n' for _ in range(rng.randrange(2, 8)))
+        return f'```python\ndef {rng.choice(_WORDS)}():\n{lines}```\n\n'
+    if kind == 4:
+        rows = ''.join(f'| {rng.choice(_WORDS)} | {rng.randrange(100)} |\n' for _ in range(rng.randrange(2, 6)))
+        return f'| Campo | Valor |\n|---|---|\n{rows}\n'
+    if kind == 5:
+        return f'> {_sentence(rng, rng.randrange(8, 20))}.\n\n'
+    return _paragraph(rng)
+
+def synthetic_unit(seed=0):
+    """About 1 MB of varied markdown, the piece every corpus is cut from"""
+    rng = random.Random(seed)
+    blocks = []
+    size = 0
+    while size < MB:
+        block = _block(rng)
+        blocks.append(block)
+        size += len(block)
+    return ''.join(blocks)
+
+def synthetic_document(size, unit):
+    """Markdown text of size chars, repeating unit"""
+    return (unit * (size // len(unit) + 1))[:size]
+
+def write_document(path, size, unit):
+    """Write a synthetic document of size chars a unit at a time"""
+    with open(path, 'w', encoding='utf-8') as f:
+        for start in range(0, size, len(unit)):
+            f.write(unit[:size - start])
+
+def synthetic_notes(root, count, unit, seed=0):
+    """Write count notes of 0.5-4 KB under root, 100 per folder, with a
+    title, a tag, tasks and [[wikilinks]] to other notes"""
+    rng = random.Random(seed)
+    for i in range(count):
+        directory = os.path.join(root, f'carpeta {i // 100}')
+        if i % 100 == 0:
+            os.makedirs(directory, exist_ok=True)
+        start = rng.randrange(len(unit) - 4 * KB)
+        body = unit[start:start + rng.randrange(KB // 2, 4 * KB)]
+        links = ' '.join(f'[[Nota {rng.randrange(count)}]]' for _ in range(3))
+        text = f'# Nota {i}\n\ntags: [{rng.choice(_WORDS)}]\n\n{body}\n\n- [ ] Revisar {links}\n'
+        with open(os.path.join(directory, f'nota-{i}.md'), 'w', encoding='utf-8') as f:
+            f.write(text)
+
+def size_label(size):
+    """Short label of a size in bytes: 1KB, 64KB, 500MB"""
+    return f'{size // MB}MB' if size >= MB else f'{size // KB}KB'
+
+def count_label(count):
+    """Short label of a notes count: 10, 1k, 100k"""
+    return f'{count // 1000}k' if count >= 1000 else str(count)
+
+# Measuring
+
+def measure(function, runs, warmup=1, setup=None):
+    """Seconds taken by each of runs calls of function, after warmup calls;
+    setup() is called untimed before every call and its result passed in"""
+    timings = []
+    for i in range(warmup + runs):
+        argument = setup() if setup else None
+        start = time.perf_counter()
+        if setup:
+            function(argument)
+        else:
+            function()
+        elapsed = time.perf_counter() - start
+        if i >= warmup:
+            timings.append(elapsed)
+    return timings
+
+def _drain_main_context():
+    """Dispatch what worker threads queued with GLib.idle_add"""
+    context = GLib.MainContext.default()
+    while context.pending():
+        context.iteration(False)
+
+class BenchmarkRun:
+    """Results of a run: per benchmark, the median and best latency of a
+    call and the throughput at the median, in the benchmark's unit"""
+
+    def __init__(self, runs, groups):
+        self.runs = runs
+        self.groups = groups
+        self.results = {}
+        self.skipped = {}
+
+    def wants(self, group):
+        """Whether a group of benchmarks was selected"""
+        return group in self.groups
+
+    def runs_for(self, size):
+        """Timed calls for a corpus of size bytes"""
+        return 1 if size >= SINGLE_RUN_SIZE else self.runs
+
+    def record(self, name, timings, amount, unit):
+        """Store and print the timings of a benchmark processing amount
+        units (MB, notes, queries...) per call"""
+        median = statistics.median(timings)
+        result = {
+            'median_ms': median * 1000,
+            'min_ms': min(timings) * 1000,
+            'runs': len(timings),
+            'throughput': amount / median if median else None,
+            'unit': unit,
+        }
+        self.results[name] = result
+        throughput = f"{result['throughput']:12.1f} {unit}" if result['throughput'] else ''
+        print(f"{name:<40} {result['median_ms']:10.2f} {result['min_ms']:10.2f} {throughput}", flush=True)
+
+    def skip(self, name, reason):
+        """Note a benchmark that could not run here"""
+        self.skipped[name] = reason
+        print(f'{name:<40} omitido: {reason}', flush=True)
+
+# Documents
+
+def bench_document(run, workdir, size, unit):
+    """Every benchmark on a document of size chars"""
+    label = size_label(size)
+    path = os.path.join(workdir, f'documento-{label}.md')
+    if size >= LARGE_FILE_THRESHOLD:
+        write_document(path, size, unit)
+        try:
+            bench_large_document(run, path, label)
+        finally:
+            os.unlink(path)
+        return
+
+    text = synthetic_document(size, unit)
+    data = text.encode('utf-8')
+    with open(path, 'wb') as f:
+        f.write(data)
+    megabytes = len(data) / MB
+    runs = run.runs_for(len(data))
+    try:
+        if run.wants('stats'):
+            bench_statistics(run, text, label, megabytes, runs)
+        if run.wants('file'):
+            bench_load_save(run, path, text, label, megabytes, runs)
+        if run.wants('markdown'):
+            bench_markdown(run, text, label, megabytes, runs)
+        if run.wants('search'):
+            bench_document_search(run, text, label, megabytes, runs)
+    finally:
+        os.unlink(path)
+
+def bench_statistics(run, text, label, megabytes, runs):
+    """Full recount of a document, and per-keystroke counting on it"""
+    if GLib is None:
+        run.skip(f'stats[{label}]', 'requiere PyGObject')
+        return
+    processor = TextProcessor()
+    run.record(f'stats.get_statistics[{label}]',
+               measure(lambda: processor.get_statistics(text), runs), megabytes, 'MB/s')
+    run.record(f'stats.reset[{label}]', measure(lambda: processor.reset(text), runs), megabytes, 'MB/s')
+
+    # Typing in the middle of the document: counters follow the deltas
+    middle = len(text) // 2
+    before, after = text[middle - 1:middle], text[middle:middle + 1]
+
+    def type_keys():
+        for i in range(KEYSTROKES):
+            processor.apply_insert(middle + i, 'a', before if i == 0 else 'a', after)
+            processor.get_statistics()
+
+    run.record(f'stats.keystroke[{label}]', measure(type_keys, runs, setup=lambda: processor.reset(text)),
+               KEYSTROKES, 'teclas/s')
+
+def bench_load_save(run, path, text, label, megabytes, runs):
+    """Streamed load into the text counters and atomic save, as the editor does"""
+    errors = []
+    writer = AtomicWriter(lambda target, error: errors.append(error) if error else None, DURABILITY_FILE)
+
+    def save():
+        writer.submit(path, text)
+        writer.flush()
+
+    try:
+        run.record(f'file.save[{label}]', measure(save, runs), megabytes, 'MB/s')
+    finally:
+        writer.stop()
+    if errors:
+        raise errors[0]
+
+    if GLib is None:
+        run.skip(f'file.load[{label}]', 'requiere PyGObject')
+        return
+    manager = FileManager()
+    run.record(f'file.load[{label}]', measure(lambda: _stream_load(manager, path), runs), megabytes, 'MB/s')
+
+def _stream_load(manager, path):
+    """Load a file through FileManager's streamed chunks on a headless main
+    loop, counting them like the editor (the buffer itself needs a display)"""
+    processor = TextProcessor()
+    loop = GLib.MainLoop()
+    errors = []
+
+    def on_error(manager, message):
+        errors.append(message)
+        loop.quit()
+
+    handlers = [
+        manager.connect('load_chunk', lambda manager, filename, text: processor.extend(text)),
+        manager.connect('file_loaded', lambda manager, filename, content: loop.quit()),
+        manager.connect('file_error', on_error),
+    ]
+    processor.begin_reset()
+    manager.load_file_async(path)
+    loop.run()
+    for handler in handlers:
+        manager.disconnect(handler)
+    if errors:
+        raise RuntimeError(errors[0])
+    processor.end_reset()
+
+def bench_large_document(run, path, label):
+    """Line index and counts of a document opened in the memory-mapped viewer"""
+    if GLib is None:
+        run.skip(f'large_file[{label}]', 'requiere PyGObject')
+        return
+    megabytes = os.path.getsize(path) / MB
+
+    def open_large(ready):
+        large = LargeFile(path)
+        while not ready(large):
+            time.sleep(0.001)
+        large.close()
+        _drain_main_context()
+
+    if run.wants('file'):
+        run.record(f'file.large_index[{label}]',
+                   measure(lambda: open_large(lambda large: large.is_indexed()), 1, warmup=0), megabytes, 'MB/s')
+    if run.wants('stats'):
+        run.record(f'stats.large_file[{label}]',
+                   measure(lambda: open_large(lambda large: large.get_statistics()['words'] is not None), 1, warmup=0),
+                   megabytes, 'MB/s')
+
+def bench_markdown(run, text, label, megabytes, runs):
+    """Block-wise preview (whole document, then a single edited block) and
+    full HTML export of a document"""
+    if not HAVE_MARKDOWN:
+        run.skip(f'markdown[{label}]', 'requiere python-markdown')
+        return
+    if len(text) > MARKDOWN_MAX_SIZE:
+        return
+    from core.html_export import render_note
+
+    if GLib is None:
+        run.skip(f'markdown.preview[{label}]', 'requiere PyGObject')
+    else:
+        def render(preview, edit=None):
+            loop = GLib.MainLoop()
+            handlers = [preview.connect('preview_ready', lambda preview, blocks: loop.quit()),
+                        preview.connect('preview_error', lambda preview, message: loop.quit())]
+            if edit is None:
+                preview.update(text)
+            else:
+                preview.apply_edit(*edit)
+                preview.render()
+            loop.run()
+            for handler in handlers:
+                preview.disconnect(handler)
+
+        previews = []
+
+        def fresh_preview():
+            if previews:
+                previews.pop().stop()
+            previews.append(MarkdownPreview())
+            return previews[-1]
+
+        run.record(f'markdown.preview[{label}]', measure(render, runs, setup=fresh_preview), megabytes, 'MB/s')
+
+        # Each edit adds a block: only the blocks around it are split and
+        # hashed again, and only it goes through the converter
+        preview = fresh_preview()
+        render(preview)
+        edits = itertools.count()
+        middle = text.rfind('\n\n', 0, len(text) // 2) + 2
+
+        def edited():
+            return preview, (middle, f'Edición {next(edits)}\n\n')
+
+        run.record(f'markdown.preview_edit[{label}]',
+                   measure(lambda arguments: render(*arguments), runs, setup=edited), 1, 'ediciones/s')
+        previews.pop().stop()
+
+    run.record(f'markdown.export[{label}]', measure(lambda: render_note(text), runs), megabytes, 'MB/s')
+
+def bench_document_search(run, text, label, megabytes, runs):
+    """Find-in-document over the whole text, per search mode"""
+    matcher = IncrementalMatcher()
+
+    def search(mode, query):
+        matcher.start(text, query, mode)
+        matcher.run()
+
+    for mode, query in DOCUMENT_QUERIES:
+        run.record(f'search.document_{mode.replace("-", "_")}[{label}]',
+                   measure(lambda: search(mode, query), runs), megabytes, 'MB/s')
+
+# Notes trees
+
+def bench_notes(run, workdir, count, unit):
+    """Every benchmark on a tree of count notes"""
+    label = count_label(count)
+    root = os.path.join(workdir, f'notas-{label}')
+    state = os.path.join(workdir, f'estado-{label}')
+    os.makedirs(state)
+    synthetic_notes(root, count, unit)
+    runs = run.runs_for(count * 2 * KB)
+    try:
+        catalog = NotesCatalog(root, os.path.join(state, 'catalog.bin'))
+        catalog.rescan()
+        if run.wants('scan'):
+            bench_scan(run, root, state, catalog, label, count, runs)
+        if run.wants('search'):
+            bench_notes_search(run, root, state, catalog, label, count, runs)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+        shutil.rmtree(state, ignore_errors=True)
+
+def bench_scan(run, root, state, catalog, label, count, runs):
+    """Directory walk, catalog (cold, from its cache and up to date) and the
+    task and link indexes it feeds"""
+    # A path that is never written: every sync starts without a cache
+    missing = os.path.join(state, 'sin-cache.bin')
+
+    run.record(f'scan.iter_note_files[{label}]',
+               measure(lambda: sum(1 for _ in iter_note_files(root)), runs), count, 'notas/s')
+    run.record(f'scan.catalog_cold[{label}]',
+               measure(lambda: NotesCatalog(root, missing).rescan(), runs), count, 'notas/s')
+
+    catalog.save()
+    loaded = NotesCatalog(root, catalog.cache_path)
+    run.record(f'scan.catalog_load[{label}]', measure(loaded.load, runs), count, 'notas/s')
+    run.record(f'scan.catalog_warm[{label}]', measure(loaded.rescan, runs), count, 'notas/s')
+
+    entries = list(catalog.entries())
+    for name, index_class in (('tasks', TaskIndex), ('links', LinkGraph)):
+        run.record(f'scan.{name}_cold[{label}]',
+                   measure(lambda: index_class(root, missing).sync(entries), runs), count, 'notas/s')
+        index = index_class(root, missing)
+        index.sync(entries)
+        run.record(f'scan.{name}_warm[{label}]', measure(lambda: index.sync(entries), runs), count, 'notas/s')
+
+def bench_notes_search(run, root, state, catalog, label, count, runs):
+    """Quick open, full-text index and parallel grep over a notes tree"""
+    pairs = [(entry.path, entry.title) for entry in catalog.entries()]
+    run.record(f'search.quick_open_index[{label}]',
+               measure(lambda: TrigramIndex().sync(pairs), runs), count, 'notas/s')
+    quick_open = TrigramIndex()
+    quick_open.sync(pairs)
+    run.record(f'search.quick_open[{label}]',
+               measure(lambda: [quick_open.search(query) for query in NOTE_QUERIES], runs),
+               len(NOTE_QUERIES), 'consultas/s')
+
+    if GLib is None:
+        run.skip(f'search.fts[{label}]', 'requiere PyGObject')
+    else:
+        db_path = os.path.join(state, 'index.sqlite')
+
+        def remove_index():
+            for suffix in ('', '-wal', '-shm'):
+                if os.path.exists(db_path + suffix):
+                    os.unlink(db_path + suffix)
+
+        run.record(f'search.fts_index[{label}]',
+                   measure(lambda arguments: _build_note_index(root, db_path).stop(), runs, setup=remove_index),
+                   count, 'notas/s')
+        index = _build_note_index(root, db_path)
+        try:
+            run.record(f'search.fts[{label}]',
+                       measure(lambda: [index.search(query) for query in NOTE_QUERIES], runs),
+                       len(NOTE_QUERIES), 'consultas/s')
+        finally:
+            index.stop()
+
+    grep = ParallelGrep()
+    grep.warm_up()
+
+    def scan():
+        done = threading.Event()
+        grep.search(root, GREP_PATTERN, lambda job, hits: None, lambda job: done.set())
+        done.wait()
+
+    try:
+        run.record(f'search.grep[{label}]', measure(scan, runs), count, 'notas/s')
+    finally:
+        grep.shutdown()
+
+def _build_note_index(root, db_path):
+    """Index every note from scratch, waiting on the main loop until done"""
+    index = NoteIndex(root, db_path)
+    index.start()
+    context = GLib.MainContext.default()
+    while not index.ready:
+        context.iteration(True)
+    return index
+
+# Baseline comparison
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """(name, baseline ms, ms, ratio, regressed) for every benchmark in both runs"""
+    rows = []
+    for name, result in sorted(results.items()):
+        base = baseline.get(name)
+        if not base or not base.get('median_ms'):
+            continue
+        before = base['median_ms']
+        now = result['median_ms']
+        regressed = now > before * (1 + tolerance) and now - before > NOISE_MS
+        rows.append((name, before, now, now / before, regressed))
+    return rows
+
+def report_comparison(rows, tolerance):
+    """Print a comparison; returns the number of regressions"""
+    print(f"\n{'Comparación con la línea base':<40} {'base ms':>10} {'ms':>10} {'ratio':>7}")
+    for name, before, now, ratio, regressed in rows:
+        mark = '  REGRESIÓN' if regressed else ''
+        print(f'{name:<40} {before:10.2f} {now:10.2f} {ratio:7.2f}{mark}')
+    regressions = sum(1 for row in rows if row[4])
+    print(f'{regressions} regresiones (tolerancia {tolerance:.0%}) en {len(rows)} benchmarks comparados')
+    return regressions
+
+def metadata(profile):
+    """Where and how the results were taken"""
+    return {
+        'profile': profile,
+        'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+        'pygobject': GLib is not None,
+        'markdown': HAVE_MARKDOWN,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmarks de rendimiento de Notas (no necesitan pantalla)')
+    parser.add_argument('--full', action='store_true',
+                        help='corpus completos: documentos de hasta 500 MB y hasta 100k notas')
+    parser.add_argument('--only', action='append', choices=GROUPS,
+                        help='ejecutar solo un grupo de benchmarks (se puede repetir)')
+    parser.add_argument('--runs', type=int, default=5,
+                        help='repeticiones medidas por benchmark (1 en corpus grandes)')
+    parser.add_argument('--output', help='guardar los resultados en este JSON')
+    parser.add_argument('--baseline', help='JSON de una ejecución anterior con el que comparar')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='empeoramiento de la mediana que cuenta como regresión (0.25 = 25%%)')
+    parser.add_argument('--workdir', help='directorio donde generar los corpus (el disco influye en los tiempos)')
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    profile = 'full' if args.full else 'quick'
+    run = BenchmarkRun(max(1, args.runs), set(args.only or GROUPS))
+    unit = synthetic_unit()
+    workdir = tempfile.mkdtemp(prefix='notas-bench-', dir=args.workdir)
+    print(f"{'Benchmark':<40} {'mediana ms':>10} {'mín ms':>10} {'throughput':>12}")
+    try:
+        if run.groups & {'stats', 'file', 'markdown', 'search'}:
+            for size in PROFILES[profile]['sizes']:
+                bench_document(run, workdir, size, unit)
+        if run.groups & {'search', 'scan'}:
+            for count in PROFILES[profile]['notes']:
+                bench_notes(run, workdir, count, unit)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    results = {'version': RESULTS_VERSION, 'meta': metadata(profile),
+               'results': run.results, 'skipped': run.skipped}
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f'\nResultados guardados en {args.output}')
+
+    if baseline is not None:
+        if baseline.get('meta', {}).get('machine') != results['meta']['machine']:
+            print('\nAviso: la línea base se tomó en otra arquitectura')
+        rows = compare(run.results, baseline.get('results', {}), args.tolerance)
+        if report_comparison(rows, args.tolerance):
+            return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
@@ -2,8 +2,14 @@
 """
 Aplicación de notas simple con GTK4 - Primera Versión
 """
+import time
+
+# Taken before any import, for --startup-profile
+_STARTUP_ORIGIN = time.perf_counter()
+
 import sys
 import os
+import threading
 import gi
 
 gi.require_version('Gtk', '4.0')
@@ -14,35 +20,251 @@ from gi.repository import Gtk, Gio, GLib, Gdk
 sys.path.insert(0, os.path.dirname(__file__))
 from core.file_manager import FileManager
 from core.text_processor import TextProcessor
-from core.context_manager import ContextManager
+from core.autosave import AutoSave
+from core.edit_journal import EditJournal, find_journals, replay
+from core.notes_catalog import NotesCatalog
+from core.startup_profile import StartupProfile
 from ui.main_window import MainWindow
 from ui.status_bar import StatusBar
-from ui.file_dialogs import FileDialogs
-from ui.quick_capture import QuickCapture
+from ui.refresh_scheduler import RefreshScheduler
+
+# Dialogs, panes and helpers that are not needed for the first frame are
+# imported where they are first used
 
 class NotasApp(Gtk.Application):
-    def __init__(self):
-        super().__init__(application_id='dev.writearch.Notas')
+    # Journal records are appended in groups at most this often
+    JOURNAL_COMMIT_MS = 500
+
+    # Captures waiting in the inbox are filed as notes this often
+    INBOX_COMPACT_S = 60
+
+    def __init__(self, profile=None):
+        flags = Gio.ApplicationFlags.HANDLES_COMMAND_LINE
+        if profile:
+            # Measure a cold start, not a remote activation of a running instance
+            flags |= Gio.ApplicationFlags.NON_UNIQUE
+        super().__init__(application_id='dev.writearch.Notas', flags=flags)
+        self.profile = profile
 
         # Core components
         self.file_manager = FileManager()
         self.text_processor = TextProcessor()
-        self.context_manager = ContextManager()
-        self.file_dialogs = FileDialogs(self.file_manager.get_notes_dir())
-        self.quick_capture = QuickCapture(self)
+        self.autosave = AutoSave(self.file_manager, self.text_processor)
+        self.journal = EditJournal(os.path.join(self.file_manager.get_state_dir(), 'journal'))
+        self._journal_commit_id = 0
+        self.catalog = NotesCatalog(self.file_manager.get_notes_dir(),
+                                    os.path.join(self.file_manager.get_state_dir(), 'catalog.bin'))
+        self._compacting = False
+        self.spell_checker = None
+        self._spell_loading = False
+        # Created with the preview pane
+        self.markdown_preview = None
+        # Whether the preview's blocks follow the document's edits
+        self._preview_synced = False
+        self._pending_line = None
 
-        # GSettings
-        try:
-            self.settings = Gio.Settings.new('dev.writearch.Notas')
-        except Exception:
-            self.settings = None
+        # Created on first use (see the properties below)
+        self._context_manager = None
+        self._file_dialogs = None
+        self._quick_capture = None
+        self._note_grep = None
+        self._note_index = None
+        self._quick_open = None
+        self._tasks = None
+        self._links = None
+        self._capture_inbox = None
+        self._settings = None
+        self._settings_loaded = False
+        self._capture_error_id = 0
 
         # UI components
         self.main_window = None
         self.status_bar = None
+        self.refresh = None
+        self.large_file = None
+        self.note_search_dialog = None
+        self.task_list_dialog = None
+        self.notes_sidebar = None
+        self.quick_open_dialog = None
+        self.preview_pane = None
+        self.backlinks_panel = None
+        self._export_running = False
+
+        if self.profile:
+            self.profile.mark('NotasApp.__init__')
+
+    @property
+    def context_manager(self):
+        """Context manager, created (with its monitoring timer) on first use"""
+        if self._context_manager is None:
+            from core.context_manager import ContextManager
+            self._context_manager = ContextManager()
+            self._context_manager.connect('note_suggestion', self.on_note_suggestion)
+        return self._context_manager
+
+    @property
+    def file_dialogs(self):
+        """File chooser helper, created on first use"""
+        if self._file_dialogs is None:
+            from ui.file_dialogs import FileDialogs
+            self.file_manager.ensure_notes_dir()
+            self._file_dialogs = FileDialogs(self.file_manager.get_notes_dir())
+        return self._file_dialogs
+
+    @property
+    def quick_capture(self):
+        """Quick capture window manager, created on first use"""
+        if self._quick_capture is None:
+            from ui.quick_capture import QuickCapture
+            self._quick_capture = QuickCapture(self)
+        return self._quick_capture
+
+    @property
+    def note_grep(self):
+        """Parallel regex search over the notes, created on first use"""
+        if self._note_grep is None:
+            from core.note_grep import ParallelGrep
+            self._note_grep = ParallelGrep()
+        return self._note_grep
+
+    def _ensure_note_indexes(self):
+        """Build the indexes fed by the notes catalog, on first use"""
+        if self._note_index is None:
+            from core.note_index import NoteIndex
+            from core.quick_open import TrigramIndex
+            from core.task_index import TaskIndex
+            from core.link_graph import LinkGraph
+            notes_dir = self.file_manager.get_notes_dir()
+            state_dir = self.file_manager.get_state_dir()
+            self._quick_open = TrigramIndex()
+            self._tasks = TaskIndex(notes_dir, os.path.join(state_dir, 'tasks.bin'))
+            self._links = LinkGraph(notes_dir, os.path.join(state_dir, 'links.bin'))
+            self._note_index = NoteIndex(notes_dir, os.path.join(state_dir, 'index.sqlite'))
+
+    @property
+    def note_index(self):
+        """Full-text index of the notes, created on first use"""
+        self._ensure_note_indexes()
+        return self._note_index
+
+    @property
+    def quick_open(self):
+        """Title index for quick open, created on first use"""
+        self._ensure_note_indexes()
+        return self._quick_open
+
+    @property
+    def tasks(self):
+        """Tasks of every note, created on first use"""
+        self._ensure_note_indexes()
+        return self._tasks
+
+    @property
+    def links(self):
+        """Link graph between notes, created on first use"""
+        self._ensure_note_indexes()
+        return self._links
+
+    @property
+    def capture_inbox(self):
+        """Inbox of quick captures waiting to be filed, created on first use"""
+        if self._capture_inbox is None:
+            from core.capture_inbox import CaptureInbox
+            self._capture_inbox = CaptureInbox(os.path.join(self.file_manager.get_state_dir(), 'inbox.log'),
+                                               self.file_manager.get_notes_dir())
+        return self._capture_inbox
+
+    @property
+    def settings(self):
+        """GSettings of the application, or None if the schema is missing"""
+        if not self._settings_loaded:
+            self._settings_loaded = True
+            try:
+                self._settings = Gio.Settings.new('dev.writearch.Notas')
+            except Exception:
+                self._settings = None
+        return self._settings
+
+    def do_command_line(self, command_line):
+        """Handle the arguments of this or a later launch (forwarded by GApplication)
+
+        notas --capture [TEMPLATE] only shows the quick capture window;
+        otherwise the main window is shown and a file argument is opened.
+        """
+        args = command_line.get_arguments()[1:]
+        if '--capture' in args:
+            index = args.index('--capture')
+            template = args[index + 1] if index + 1 < len(args) and not args[index + 1].startswith('-') else None
+            self.show_quick_capture(template)
+            return 0
+
+        self.activate()
+        files = [arg for arg in args if not arg.startswith('-')]
+        if files:
+            self.open_note(command_line.create_file_for_arg(files[0]).get_path())
+        return 0
+
+    def show_quick_capture(self, template=None):
+        """Show the quick capture window, without building the main window"""
+        if self.main_window is None and not self._capture_error_id:
+            # Capture-only instance: follow the saved theme and report failed saves
+            if self.settings:
+                Gtk.Settings.get_default().set_property('gtk-application-prefer-dark-theme',
+                                                        self.settings.get_boolean('dark-mode'))
+            self._capture_error_id = self.file_manager.connect(
+                'file_error', lambda manager, message: self.show_notification(message))
+        self.quick_capture.show_capture_dialog(template)
+
+    def save_capture(self, title, content):
+        """Save a quick capture: appended to the inbox if enabled, else as a new note"""
+        self.file_manager.ensure_notes_dir()
+        if self.settings and self.settings.get_boolean('capture-inbox'):
+            try:
+                self.capture_inbox.append(title, content)
+            except OSError as e:
+                self.show_notification(f"Error guardando la captura: {e}")
+            return
+        self.file_manager.save_file(self.file_manager.new_note_path(title), content, set_current=False)
+
+    def _compact_inbox(self):
+        """File the captures waiting in the inbox as notes, in the background"""
+        if self._compacting or not self.capture_inbox.has_pending():
+            return GLib.SOURCE_REMOVE
+        self._compacting = True
+        durability = self.file_manager.get_durability()
+
+        def run():
+            try:
+                self.capture_inbox.compact(durability, lambda paths: GLib.idle_add(self._on_captures_filed, paths))
+            except OSError as e:
+                print(f"Error filing captures: {e}")
+            GLib.idle_add(self._on_compaction_done)
+
+        threading.Thread(target=run, name='notas-inbox', daemon=True).start()
+        return GLib.SOURCE_REMOVE
+
+    def _on_captures_filed(self, paths):
+        """Add notes filed from the inbox to the catalog and indexes"""
+        for path in paths:
+            self._update_note(path)
+        self.update_catalog()
+        return GLib.SOURCE_REMOVE
+
+    def _on_compaction_done(self):
+        """Allow the next inbox compaction"""
+        self._compacting = False
+        return GLib.SOURCE_REMOVE
 
     def do_activate(self):
         """Activate the application"""
+        if self.main_window:
+            self.main_window.present()
+            return
+        if self._capture_error_id:
+            self.file_manager.disconnect(self._capture_error_id)
+            self._capture_error_id = 0
+        if self.profile:
+            self.profile.mark('registro de la aplicación')
         self.main_window = MainWindow(self)
         self.main_window.present()
 
@@ -50,28 +272,142 @@ class NotasApp(Gtk.Application):
         self.status_bar = StatusBar()
         self.main_window.set_status_bar(self.status_bar)
 
+        # Derived views are refreshed at most once per frame
+        self.refresh = RefreshScheduler(self.main_window)
+        self.refresh.register('status', self._render_status)
+        self.refresh.register('title', self._render_title)
+        self.refresh.register('catalog', self._render_catalog)
+        self.refresh.register('preview', self._render_preview)
+        if self.profile:
+            self.profile.mark('ventana principal')
+
         # Connect core components
         self._connect_components()
 
+        # Restore edits that never reached the disk, or start a fresh journal
+        if not self._recover_unsaved_edits():
+            self._start_journal()
+
+        # Settings are read before the first frame is painted, so the theme
+        # does not flash
+        GLib.idle_add(self._load_settings, priority=GLib.PRIORITY_HIGH_IDLE)
+
+        # Catalog and index the notes once the first frame is up
+        GLib.idle_add(self._start_note_index, priority=GLib.PRIORITY_LOW)
+
+        # Captures left in the inbox are filed now and then
+        GLib.idle_add(self._compact_inbox, priority=GLib.PRIORITY_LOW)
+        GLib.timeout_add_seconds(self.INBOX_COMPACT_S, lambda: self._compact_inbox() or GLib.SOURCE_CONTINUE)
+
+        # Quick capture is built ahead of its first use
+        GLib.idle_add(lambda: self.quick_capture.prepare(), priority=GLib.PRIORITY_LOW)
+
+        if self.profile:
+            self.profile.mark('componentes')
+            self._profile_first_frame()
+
+    def _profile_first_frame(self):
+        """Report the startup phases once the first frame has been painted"""
+        frame_clock = self.main_window.get_frame_clock()
+
+        def on_after_paint(clock):
+            clock.disconnect(handler_id)
+            self.profile.mark('primer frame')
+            print(self.profile.report())
+            print(f"Tiempo hasta el primer frame: {self.profile.total_ms():.1f} ms")
+            GLib.idle_add(self.quit)
+
+        handler_id = frame_clock.connect('after-paint', on_after_paint)
+
+    def _ensure_notes_sidebar(self):
+        """Create the notes sidebar the first time it is shown"""
+        if self.notes_sidebar is None:
+            from ui.notes_sidebar import NotesSidebar
+            self.notes_sidebar = NotesSidebar(self)
+            self.main_window.set_sidebar(self.notes_sidebar)
+        return self.notes_sidebar
+
+    def _ensure_backlinks_panel(self):
+        """Create the backlinks panel the first time it is shown"""
+        if self.backlinks_panel is None:
+            from ui.backlinks_panel import BacklinksPanel
+            self.backlinks_panel = BacklinksPanel(self)
+            self.main_window.set_backlinks(self.backlinks_panel)
+        return self.backlinks_panel
+
+    def _ensure_preview_pane(self):
+        """Create the markdown preview pane the first time it is shown"""
+        if self.preview_pane is None:
+            from ui.preview_pane import PreviewPane
+            from core.markdown_preview import MarkdownPreview
+            self.preview_pane = PreviewPane()
+            self.main_window.set_preview(self.preview_pane)
+            self.markdown_preview = MarkdownPreview()
+            self.markdown_preview.connect('preview_ready', lambda p, blocks: self.preview_pane.show_blocks(blocks))
+            self.markdown_preview.connect('preview_error', lambda p, message: self.preview_pane.show_message(message))
+        return self.preview_pane
+
+    def do_shutdown(self):
+        """Wait for pending saves before exiting"""
+        self.file_manager.flush(timeout=10)
+        if self._note_index:
+            self._note_index.stop()
+        if self._note_grep:
+            self._note_grep.shutdown()
+        if self.markdown_preview:
+            self.markdown_preview.stop()
+        if self.catalog.dirty:
+            try:
+                self.catalog.save()
+            except OSError as e:
+                print(f"Error saving notes catalog: {e}")
+        if self._tasks and self._tasks.dirty:
+            try:
+                self._tasks.save()
+            except OSError as e:
+                print(f"Error saving task index: {e}")
+        if self._links and self._links.dirty:
+            try:
+                self._links.save()
+            except OSError as e:
+                print(f"Error saving link graph: {e}")
+
+        # Unsaved edits stay in the journal for the next start
+        try:
+            if self.autosave.is_dirty():
+                self.journal.close()
+            else:
+                self.journal.discard()
+        except OSError as e:
+            print(f"Error closing journal: {e}")
+
+        Gtk.Application.do_shutdown(self)
+
     def _connect_components(self):
         """Connect all components together"""
         # File manager events
         self.file_manager.connect('file_loaded', self.on_file_loaded)
         self.file_manager.connect('file_saved', self.on_file_saved)
         self.file_manager.connect('file_error', self.on_file_error)
+        self.file_manager.connect('load_started', self.on_load_started)
+        self.file_manager.connect('load_chunk', self.on_load_chunk)
+        self.file_manager.connect('load_progress', self.on_load_progress)
+        self.file_manager.connect('load_cancelled', self.on_load_cancelled)
 
         # Text processor events
-        self.text_processor.connect('text_changed', self.on_text_changed)
+        self.text_processor.connect('text_edited', self.on_text_changed)
+        self.text_processor.connect('text_reset', self.on_text_changed)
 
-        # Context manager events
-        self.context_manager.connect('note_suggestion', self.on_note_suggestion)
+        # Autosave events
+        self.autosave.connect('dirty_changed', lambda a, dirty: self.update_title())
+        self.autosave.connect('document_saved', self.on_document_saved)
+
+        # Crash-recovery journal
+        self.text_processor.connect('text_edited', self.on_text_edited_journal)
 
         # Setup actions
         self._setup_actions()
 
-        # Load settings
-        self._load_settings()
-
     def _setup_actions(self):
         """Setup menu actions"""
         # File actions
@@ -83,6 +419,14 @@ class NotasApp(Gtk.Application):
         open_action.connect('activate', lambda a, p: self.on_open_file())
         self.add_action(open_action)
 
+        quick_open_action = Gio.SimpleAction.new('quick-open', None)
+        quick_open_action.connect('activate', lambda a, p: self.on_quick_open())
+        self.add_action(quick_open_action)
+
+        open_recent_action = Gio.SimpleAction.new('open-recent', GLib.VariantType.new('s'))
+        open_recent_action.connect('activate', lambda a, p: self.open_note(p.get_string()))
+        self.add_action(open_recent_action)
+
         save_action = Gio.SimpleAction.new('save', None)
         save_action.connect('activate', lambda a, p: self.on_save_file())
         self.add_action(save_action)
@@ -91,11 +435,23 @@ class NotasApp(Gtk.Application):
         save_as_action.connect('activate', lambda a, p: self.on_save_as_clicked())
         self.add_action(save_as_action)
 
+        export_action = Gio.SimpleAction.new('export-html', None)
+        export_action.connect('activate', lambda a, p: self.on_export_html())
+        self.add_action(export_action)
+
         # Edit actions
         search_action = Gio.SimpleAction.new('search', None)
         search_action.connect('activate', lambda a, p: self.on_search())
         self.add_action(search_action)
 
+        search_notes_action = Gio.SimpleAction.new('search-notes', None)
+        search_notes_action.connect('activate', lambda a, p: self.on_search_notes())
+        self.add_action(search_notes_action)
+
+        tasks_action = Gio.SimpleAction.new('tasks', None)
+        tasks_action.connect('activate', lambda a, p: self.on_show_tasks())
+        self.add_action(tasks_action)
+
         term_action = Gio.SimpleAction.new('terminal-command', GLib.VariantType.new('s'))
         term_action.connect('activate', self.on_terminal_command_activate)
         self.add_action(term_action)
@@ -109,6 +465,22 @@ class NotasApp(Gtk.Application):
         markdown_action.connect('change-state', self.on_markdown_preview_changed)
         self.add_action(markdown_action)
 
+        line_numbers_action = Gio.SimpleAction.new_stateful('line-numbers', None, GLib.Variant.new_boolean(False))
+        line_numbers_action.connect('change-state', self.on_line_numbers_changed)
+        self.add_action(line_numbers_action)
+
+        spell_action = Gio.SimpleAction.new_stateful('spell-check', None, GLib.Variant.new_boolean(False))
+        spell_action.connect('change-state', self.on_spell_check_changed)
+        self.add_action(spell_action)
+
+        sidebar_action = Gio.SimpleAction.new_stateful('notes-sidebar', None, GLib.Variant.new_boolean(False))
+        sidebar_action.connect('change-state', self.on_notes_sidebar_changed)
+        self.add_action(sidebar_action)
+
+        backlinks_action = Gio.SimpleAction.new_stateful('backlinks', None, GLib.Variant.new_boolean(False))
+        backlinks_action.connect('change-state', self.on_backlinks_changed)
+        self.add_action(backlinks_action)
+
         # Quick capture actions
         quick_capture_action = Gio.SimpleAction.new('quick-capture', None)
         quick_capture_action.connect('activate', lambda a, p: self.quick_capture.show_capture_dialog())
@@ -124,14 +496,54 @@ class NotasApp(Gtk.Application):
         """Handle open file action"""
         def callback(filename):
             if filename:
-                self.file_manager.load_file(filename)
+                self.open_note(filename)
         self.file_dialogs.open_file(callback)
 
+    def open_note(self, filename, line=None):
+        """Open a file in the editor, or in the viewer if it is huge, and
+        optionally move to a line (1-based) once it is loaded"""
+        if self.file_manager.is_large_file(filename):
+            self.open_large_file(filename)
+            if line:
+                self.main_window.goto_line(line)
+        else:
+            self._pending_line = line
+            self.file_manager.load_file_async(filename)
+
+    def open_large_file(self, filename):
+        """Open a huge file in the read-only memory-mapped viewer"""
+        self.file_manager.cancel_load()
+        self.on_new_file()
+        from core.large_file import LargeFile
+        try:
+            large_file = LargeFile(filename)
+        except (OSError, ValueError) as e:
+            self.file_dialogs.show_error(f"Error al abrir archivo: {e}")
+            return
+
+        self.large_file = large_file
+        large_file.connect('index_progress', lambda f, fraction: self.update_status())
+        large_file.connect('index_ready', lambda f: self.update_status())
+        large_file.connect('stats_ready', lambda f: self.update_status())
+        from ui.large_file_view import LargeFileView
+        self.main_window.show_large_file(LargeFileView(large_file))
+        self.update_title()
+        self.update_status()
+        self.update_preview()
+
+    def _close_large_file(self):
+        """Leave the large file viewer, if open"""
+        if self.large_file:
+            self.main_window.close_large_file()
+            self.large_file.close()
+            self.large_file = None
+
     def on_save_file(self):
         """Handle save file action"""
-        if self.file_manager.current_file:
-            content = self.main_window.get_text()
-            self.file_manager.save_file(self.file_manager.current_file, content)
+        if self.large_file:
+            self.show_notification("Los archivos grandes se abren en modo solo lectura")
+        elif self.file_manager.current_file:
+            self.autosave.save_document(self.file_manager.current_file, force=True)
         else:
             self.on_save_file_as()
 
@@ -139,55 +551,371 @@ class NotasApp(Gtk.Application):
         """Handle save as action"""
         def callback(filename):
             if filename:
-                content = self.main_window.get_text()
-                self.file_manager.save_file(filename, content)
+                self.autosave.save_document(filename, force=True)
         self.file_dialogs.save_file(callback)
 
     def on_file_loaded(self, manager, filename, content):
         """Handle file loaded event"""
-        self.main_window.set_text(content)
-        self.main_window.set_title(f'Notas - {os.path.basename(filename)}')
+        if content is None:
+            # Streamed load: the chunks are already in the buffer
+            self.main_window.end_load()
+            self.status_bar.set_progress(None)
+        else:
+            self.main_window.set_text(content)
+        if self._pending_line:
+            self.main_window.goto_line(self._pending_line)
+            self._pending_line = None
+        self.autosave.mark_clean()
+        self._start_journal()
+        self.update_title()
         self.update_status()
+        self.update_preview()
+        self.update_backlinks()
+
+    def on_load_started(self, manager, filename):
+        """Handle the start of a streamed load"""
+        self._close_large_file()
+        self.main_window.begin_load()
+        self.status_bar.set_progress(0.0)
+
+    def on_load_chunk(self, manager, filename, text):
+        """Append a streamed chunk to the editor"""
+        self.main_window.append_loaded_text(text)
+
+    def on_load_progress(self, manager, filename, fraction):
+        """Show streamed load progress"""
+        self.status_bar.set_progress(fraction)
+
+    def on_load_cancelled(self, manager, filename):
+        """Discard a partially loaded file"""
+        self._pending_line = None
+        self.main_window.end_load()
+        self.status_bar.set_progress(None)
+        self.on_new_file()
+
+    def on_document_saved(self, autosave, filename, revision):
+        """Compact the journal down to the edits made after the save"""
+        try:
+            self.journal.compact(revision, filename)
+        except OSError as e:
+            print(f"Error compacting journal: {e}")
+
+    def on_text_edited_journal(self, processor, edit):
+        """Queue an edit in the journal; writes are grouped by a timer"""
+        if edit.removed:
+            self.journal.record_delete(edit.revision, edit.offset, edit.deleted)
+        if edit.inserted:
+            self.journal.record_insert(edit.revision, edit.offset, edit.inserted)
+        if not self._journal_commit_id:
+            self._journal_commit_id = GLib.timeout_add(self.JOURNAL_COMMIT_MS, self._commit_journal)
+
+    def _commit_journal(self):
+        """Append the queued journal records in a single write"""
+        self._journal_commit_id = 0
+        try:
+            self.journal.flush()
+        except OSError as e:
+            print(f"Error writing journal: {e}")
+        return GLib.SOURCE_REMOVE
+
+    def _start_journal(self):
+        """Start journaling the document now open"""
+        try:
+            self.journal.start(self.file_manager.current_file)
+        except OSError as e:
+            print(f"Error starting journal: {e}")
+
+    def _recover_unsaved_edits(self):
+        """Replay the most recent journal left by a crash, if any"""
+        for journal_path in find_journals(self.journal.journal_dir):
+            try:
+                recovered = replay(journal_path)
+            except (OSError, ValueError) as e:
+                print(f"Error replaying journal {journal_path}: {e}")
+                recovered = None
+
+            if recovered is None:
+                # Nothing to restore, or the file changed since
+                try:
+                    os.unlink(journal_path)
+                except OSError:
+                    pass
+                continue
+
+            document_path, text = recovered
+            self.file_manager.current_file = document_path or None
+            self.main_window.set_text(text)
+            self.autosave.mark_modified()
+            try:
+                self.journal.resume(journal_path, document_path)
+            except OSError as e:
+                print(f"Error resuming journal: {e}")
+
+            name = os.path.basename(document_path) if document_path else 'documento sin título'
+            self.show_notification(f"Se recuperaron cambios sin guardar de {name}")
+            self.update_title()
+            return True
+        return False
+
+    def on_cancel_load(self):
+        """Handle cancel load action"""
+        self.file_manager.cancel_load()
 
     def on_file_saved(self, manager, filename):
         """Handle file saved event"""
-        self.main_window.set_title(f'Notas - {os.path.basename(filename)}')
+        self._update_note(filename)
+        self.update_catalog()
+        self.update_title()
         self.update_status()
+        self.update_backlinks()
+
+    def _update_note(self, path):
+        """Refresh a note written by the app in the catalog and indexes"""
+        self.catalog.update_file(path)
+        if self._note_index is None:
+            # Not built yet: their first sync reads the note
+            return
+        self.note_index.update_file(path)
+        entry = self.catalog.get(path)
+        if entry:
+            self.quick_open.update(entry.path, entry.title)
+        if self.tasks.update_file(path):
+            self.update_tasks()
+        if self.links.update_file(path):
+            self.update_backlinks()
 
     def on_file_error(self, manager, error_msg):
         """Handle file error event"""
         self.file_dialogs.show_error(error_msg)
 
-    def on_text_changed(self, processor, text):
-        """Handle text changed event"""
+    def on_text_changed(self, processor, edit=None):
+        """Handle text edited/reset events"""
         self.update_status()
+        if edit is not None and self._preview_synced and self._preview_enabled():
+            # Only the blocks around the edit are split and hashed again
+            self.markdown_preview.apply_edit(edit.offset, edit.inserted, edit.deleted)
+        else:
+            self._preview_synced = False
+        self.update_preview()
+
+    def _preview_enabled(self):
+        """Whether the markdown preview is shown"""
+        action = self.lookup_action('markdown-preview')
+        return bool(action and action.get_state().get_boolean())
+
+    def update_preview(self):
+        """Schedule a markdown preview refresh"""
+        if self.refresh and self._preview_enabled():
+            self.refresh.invalidate('preview')
 
     def update_status(self):
+        """Schedule a status bar refresh"""
+        if self.refresh:
+            self.refresh.invalidate('status')
+
+    def _on_catalog_changed(self):
+        """Feed the quick open index (catalog thread) and refresh the views"""
+        self.quick_open.sync((entry.path, entry.title) for entry in self.catalog.entries())
+        GLib.idle_add(self.update_catalog)
+
+        # Only notes whose size or mtime changed are parsed for tasks
+        if self.tasks.sync(self.catalog.entries()):
+            GLib.idle_add(self.update_tasks)
+        if self.tasks.dirty:
+            try:
+                self.tasks.save()
+            except OSError as e:
+                print(f"Error saving task index: {e}")
+
+        # Only the edges of notes whose size or mtime changed are replaced
+        if self.links.sync(self.catalog.entries()):
+            GLib.idle_add(self.update_backlinks)
+        if self.links.dirty:
+            try:
+                self.links.save()
+            except OSError as e:
+                print(f"Error saving link graph: {e}")
+
+    def update_catalog(self):
+        """Schedule a refresh of the views built from the notes catalog"""
+        if self.refresh:
+            self.refresh.invalidate('catalog')
+        return GLib.SOURCE_REMOVE
+
+    def update_title(self):
+        """Schedule a window title refresh"""
+        if self.refresh:
+            self.refresh.invalidate('title')
+
+    def _render_status(self):
         """Update status bar with current statistics"""
-        text = self.main_window.get_text()
-        stats = self.text_processor.get_statistics(text)
+        if self.large_file:
+            self.status_bar.update(self.large_file.get_statistics(), os.path.basename(self.large_file.filename))
+            return
+        stats = self.text_processor.get_statistics()
         filename = os.path.basename(self.file_manager.current_file) if self.file_manager.current_file else None
         self.status_bar.update(stats, filename)
 
+    def _render_catalog(self):
+        """Update the notes sidebar and the recent notes menu"""
+        if self.notes_sidebar:
+            self.notes_sidebar.refresh()
+        self.main_window.set_recent_notes(self.catalog.recent(10))
+
+    def _render_preview(self):
+        """Hand the current document to the preview renderer"""
+        if self.preview_pane is None:
+            return
+        if self.large_file:
+            self.preview_pane.show_message('Vista previa no disponible en archivos grandes')
+        elif self._preview_enabled():
+            if self._preview_synced:
+                self.markdown_preview.render()
+            else:
+                # Loaded, replaced or edited while hidden: split the whole text
+                self.markdown_preview.update(self.text_processor.get_snapshot())
+                self._preview_synced = True
+
+    def _render_title(self):
+        """Update window title with the current file name and dirty marker"""
+        if self.large_file:
+            self.main_window.set_title(f'Notas - {os.path.basename(self.large_file.filename)} (solo lectura)')
+        elif self.file_manager.current_file:
+            dirty = '*' if self.autosave.is_dirty() else ''
+            self.main_window.set_title(f'Notas - {dirty}{os.path.basename(self.file_manager.current_file)}')
+        else:
+            self.main_window.set_title('Notas')
+
     def on_new_file(self):
         """Handle new file action"""
-        self.main_window.set_text('')
-        self.main_window.set_title('Notas')
+        self._close_large_file()
         self.file_manager.current_file = None
+        self.main_window.set_text('')
+        self.autosave.mark_clean()
+        self._start_journal()
+        self.update_title()
         self.update_status()
+        self.update_backlinks()
 
     def on_save_as_clicked(self):
         """Handle save as action"""
+        if self.large_file:
+            self.show_notification("Los archivos grandes se abren en modo solo lectura")
+            return
+
         def callback(filename):
             if filename:
-                content = self.main_window.get_text()
-                self.file_manager.save_file(filename, content)
+                self.autosave.save_document(filename, force=True)
         self.file_dialogs.save_file(callback)
 
     def on_search(self):
         """Handle search action"""
-        # Simple search implementation - could be enhanced
-        pass
+        if self.large_file:
+            self.show_notification("La búsqueda no está disponible en archivos grandes")
+            return
+        self.main_window.search_bar.open()
+
+    def on_quick_open(self):
+        """Open the note switcher"""
+        if self.quick_open_dialog is None:
+            from ui.quick_open_dialog import QuickOpenDialog
+            self.quick_open_dialog = QuickOpenDialog(self)
+        self.quick_open_dialog.open()
+
+    def on_search_notes(self):
+        """Open the full-text search over all notes"""
+        if self.note_search_dialog is None:
+            from ui.note_search_dialog import NoteSearchDialog
+            self.note_search_dialog = NoteSearchDialog(self)
+        self.note_search_dialog.open()
+
+    def on_show_tasks(self):
+        """Open the list of tasks across all notes"""
+        if self.task_list_dialog is None:
+            from ui.task_list_dialog import TaskListDialog
+            self.task_list_dialog = TaskListDialog(self)
+        self.task_list_dialog.open()
+
+    def update_tasks(self):
+        """Refresh the task list if it is shown"""
+        if self.task_list_dialog and self.task_list_dialog.get_visible():
+            self.task_list_dialog.refresh()
+        return GLib.SOURCE_REMOVE
+
+    def update_backlinks(self):
+        """Show the backlinks of the open note, if the panel exists"""
+        if self.backlinks_panel:
+            self.backlinks_panel.show_note(self.file_manager.current_file)
+        return GLib.SOURCE_REMOVE
+
+    def toggle_task(self, task):
+        """Check or uncheck a task; returns the updated task, or None if it
+        couldn't be toggled"""
+        if task.path == self.file_manager.current_file and not self.large_file:
+            # The editor owns the open note: toggle it there, autosave writes it
+            if not self.main_window.toggle_task_line(task.line, task.done):
+                self.show_notification("La tarea cambió en el editor")
+                return None
+            return task._replace(done=not task.done)
+        try:
+            updated = self.tasks.toggle(task, self.file_manager.get_durability())
+        except ValueError as e:
+            self.show_notification(str(e))
+            self.update_tasks()
+            return None
+        except OSError as e:
+            self.show_notification(f"Error actualizando la tarea: {e}")
+            return None
+        self._update_note(task.path)
+        return updated
+
+    def _start_note_index(self):
+        """Start cataloging and indexing the notes directory in the background"""
+        self.file_manager.ensure_notes_dir()
+        # Built on the main loop, before the catalog thread feeds them
+        self._ensure_note_indexes()
+        self.catalog.refresh_async(self._on_catalog_changed)
+        try:
+            self.note_index.start()
+        except OSError as e:
+            print(f"Error starting note index: {e}")
+        return GLib.SOURCE_REMOVE
+
+    def on_export_html(self):
+        """Export every markdown note to HTML in the background"""
+        if self._export_running:
+            self.show_notification("Ya hay una exportación en curso")
+            return
+        self._export_running = True
+
+        from core.html_export import HtmlExporter, default_output_dir
+        notes_dir = self.file_manager.get_notes_dir()
+        exporter = HtmlExporter(notes_dir, default_output_dir(notes_dir))
+
+        def progress(done, total):
+            GLib.idle_add(self.status_bar.set_progress, done / total if total else 1.0)
+
+        def run():
+            try:
+                result = exporter.run(progress)
+            except OSError as e:
+                result = e
+            GLib.idle_add(self._on_export_done, exporter, result)
+
+        threading.Thread(target=run, name='notas-export', daemon=True).start()
+
+    def _on_export_done(self, exporter, result):
+        """Report the end of an HTML export"""
+        self._export_running = False
+        self.status_bar.set_progress(None)
+        if isinstance(result, Exception):
+            self.show_notification(f"Error exportando a HTML: {result}")
+        elif result.errors:
+            relative, error = result.errors[0]
+            self.show_notification(f"Exportación HTML con errores ({result}): {relative}: {error}")
+        else:
+            self.show_notification(f"Exportación HTML en {exporter.output_dir}: {result}")
+        return GLib.SOURCE_REMOVE
 
     def on_terminal_command_activate(self, action, parameter):
         """Handle terminal command action"""
@@ -261,20 +989,81 @@ class NotasApp(Gtk.Application):
 
     def on_markdown_preview_changed(self, action, value):
         """Handle markdown preview toggle"""
-        preview_enabled = value.get_boolean()
         action.set_state(value)
+        if value.get_boolean():
+            self._ensure_preview_pane()
+        self.main_window.set_preview_visible(value.get_boolean())
+        self.update_preview()
 
-        if preview_enabled:
-            try:
-                import markdown
-                text = self.main_window.get_text()
-                html = markdown.markdown(text)
-                # For now, just show a notification with preview
-                self.show_notification(f"Markdown preview: {html[:100]}...")
-            except ImportError:
-                self.show_notification("Markdown no disponible - instala python-markdown")
+    def on_line_numbers_changed(self, action, value):
+        """Handle line numbers toggle"""
+        action.set_state(value)
+        self.main_window.set_line_numbers_visible(value.get_boolean())
+
+        # Save to GSettings
+        if self.settings:
+            self.settings.set_boolean('line-numbers', value.get_boolean())
+
+    def on_spell_check_changed(self, action, value):
+        """Handle spell checking toggle"""
+        action.set_state(value)
+        if value.get_boolean() and self.spell_checker is None:
+            self._load_spell_checker()
         else:
-            self.show_notification("Vista previa Markdown desactivada")
+            self.main_window.spell.set_enabled(value.get_boolean())
+
+        # Save to GSettings
+        if self.settings:
+            self.settings.set_boolean('spell-check', value.get_boolean())
+
+    def _load_spell_checker(self):
+        """Load the dictionary in the background, then start checking"""
+        from core.spell_check import SpellChecker, find_dictionary
+        if self._spell_loading:
+            return
+        path = (self.settings.get_string('spell-dictionary') if self.settings else '') or find_dictionary()
+        if not path:
+            self.show_notification("No se encontró un diccionario (instala uno o elige spell-dictionary)")
+            self.lookup_action('spell-check').set_state(GLib.Variant.new_boolean(False))
+            return
+        self._spell_loading = True
+        personal_path = os.path.join(self.file_manager.get_state_dir(), 'dictionary.txt')
+
+        def run():
+            try:
+                result = SpellChecker.load(path, personal_path)
+            except OSError as e:
+                result = e
+            GLib.idle_add(self._on_spell_checker_loaded, result)
+
+        threading.Thread(target=run, name='notas-spell', daemon=True).start()
+
+    def _on_spell_checker_loaded(self, result):
+        """Start checking with a freshly loaded dictionary"""
+        self._spell_loading = False
+        if isinstance(result, Exception):
+            self.show_notification(f"Error cargando el diccionario: {result}")
+            self.lookup_action('spell-check').set_state(GLib.Variant.new_boolean(False))
+            return GLib.SOURCE_REMOVE
+        self.spell_checker = result
+        self.main_window.spell.set_checker(result)
+        self.main_window.spell.set_enabled(self.lookup_action('spell-check').get_state().get_boolean())
+        return GLib.SOURCE_REMOVE
+
+    def on_notes_sidebar_changed(self, action, value):
+        """Handle notes sidebar toggle"""
+        action.set_state(value)
+        if value.get_boolean():
+            self._ensure_notes_sidebar().refresh()
+        self.main_window.set_sidebar_visible(value.get_boolean())
+
+    def on_backlinks_changed(self, action, value):
+        """Handle backlinks panel toggle"""
+        action.set_state(value)
+        if value.get_boolean():
+            self._ensure_backlinks_panel()
+        self.main_window.set_backlinks_visible(value.get_boolean())
+        self.update_backlinks()
 
     def on_note_suggestion(self, manager, title, content):
         """Handle note suggestions from context manager"""
@@ -297,12 +1086,63 @@ class NotasApp(Gtk.Application):
                 dark_action = self.lookup_action('dark-mode')
                 if dark_action:
                     dark_action.set_state(GLib.Variant.new_boolean(dark_mode))
+
+                # Line-number gutter
+                if self.settings.get_boolean('line-numbers'):
+                    self.lookup_action('line-numbers').change_state(GLib.Variant.new_boolean(True))
+
+                # Spell checking
+                if self.settings.get_boolean('spell-check'):
+                    self.lookup_action('spell-check').change_state(GLib.Variant.new_boolean(True))
+
+                # Memory budget of the undo history
+                self.main_window.undo.history.set_budget(self.settings.get_int('undo-memory') * 1024)
+
+                # Time budget for refreshing derived views per frame
+                self.refresh.set_budget(self.settings.get_int('refresh-budget'))
+
+                # fsync policy for saves
+                self.file_manager.set_durability(self.settings.get_string('save-durability'))
+
+                # Autosave
+                self.autosave.set_enabled(self.settings.get_boolean('auto-save'))
+                self.settings.connect('changed::auto-save',
+                                      lambda s, key: self.autosave.set_enabled(s.get_boolean(key)))
             except Exception as e:
                 print(f"Error loading settings: {e}")
+        return GLib.SOURCE_REMOVE
+
+def export_html(argv):
+    """notas --export-html [DESTINO]: export the notes without opening the UI"""
+    from core.html_export import HtmlExporter, default_output_dir
+    index = argv.index('--export-html')
+    notes_dir = FileManager().get_notes_dir()
+    if index + 1 < len(argv) and not argv[index + 1].startswith('-'):
+        output_dir = os.path.abspath(os.path.expanduser(argv[index + 1]))
+    else:
+        output_dir = default_output_dir(notes_dir)
+
+    def progress(done, total):
+        print(f"\rExportando {done}/{total}", end='', flush=True)
+
+    result = HtmlExporter(notes_dir, output_dir).run(progress)
+    print(f"\n{output_dir}: {result}")
+    for relative, error in result.errors:
+        print(f"Error exportando {relative}: {error}", file=sys.stderr)
+    return 1 if result.errors else 0
 
 def main():
-    app = NotasApp()
-    return app.run(sys.argv)
+    if '--export-html' in sys.argv:
+        return export_html(sys.argv)
+    profile = None
+    argv = sys.argv
+    if '--startup-profile' in argv:
+        # notas --startup-profile: time each startup phase up to the first frame
+        argv = [arg for arg in argv if arg != '--startup-profile']
+        profile = StartupProfile(_STARTUP_ORIGIN)
+        profile.mark('importaciones')
+    app = NotasApp(profile)
+    return app.run(argv)
 
 if __name__ == '__main__':
     sys.exit(main())
\ No newline at end of file
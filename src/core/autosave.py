@@ -0,0 +1,144 @@
+"""
+Auto Save - Core component saving the current document in the background
+"""
+import gi
+
+gi.require_version('Gtk', '4.0')
+from gi.repository import GObject, GLib
+
+from core.storage import content_digest
+
+class AutoSave(GObject.Object):
+    """Tracks unsaved changes and saves them automatically
+
+    The document is dirty while the TextProcessor revision differs from the
+    last saved one. Edits restart a short debounce timer so the save happens
+    once typing pauses, and a second timer caps how long a continuously edited
+    document may stay unsaved. Before writing, the content hash is compared
+    with the last saved one so reverting an edit costs no disk I/O.
+    """
+
+    __gsignals__ = {
+        'dirty_changed': (GObject.SignalFlags.RUN_FIRST, None, (bool,)),
+        'document_saved': (GObject.SignalFlags.RUN_FIRST, None, (str, int))
+    }
+
+    IDLE_DELAY_MS = 2000
+    MAX_INTERVAL_MS = 30000
+
+    def __init__(self, file_manager, text_processor):
+        super().__init__()
+        self.file_manager = file_manager
+        self.text_processor = text_processor
+        self.enabled = True
+
+        self._saved_revision = text_processor.revision
+        self._saved_digest = None
+        self._pending = {}
+        self._dirty = False
+        self._idle_id = 0
+        self._max_id = 0
+
+        self.text_processor.connect('text_edited', self._on_text_edited)
+        self.file_manager.connect('file_saved', self._on_file_saved)
+
+    def set_enabled(self, enabled):
+        """Enable or disable automatic saves"""
+        self.enabled = enabled
+        if not enabled:
+            self._cancel_timers()
+
+    def is_dirty(self):
+        """Whether the document has changes not yet written to disk"""
+        return self._dirty
+
+    def mark_clean(self):
+        """Treat the current revision as saved (after loading a document)"""
+        self._cancel_timers()
+        self._pending.clear()
+        self._saved_revision = self.text_processor.revision
+        # Unknown until the first save; loading does not hash the document
+        self._saved_digest = None
+        self._set_dirty(False)
+
+    def mark_modified(self):
+        """Treat the current document as differing from the disk (recovered edits)"""
+        self._cancel_timers()
+        self._saved_revision = -1
+        self._saved_digest = None
+        self._set_dirty(True)
+
+    def save_document(self, filename, force=False):
+        """Save the current document to filename
+
+        Unless forced, the write is skipped when the content hash matches the
+        last saved content.
+        """
+        self._cancel_timers()
+        revision = self.text_processor.revision
+        text = self.text_processor.get_snapshot()
+        digest = content_digest(text)
+
+        if not force and digest == self._saved_digest and filename == self.file_manager.current_file:
+            self._saved_revision = revision
+            self._set_dirty(False)
+            return False
+
+        self._pending[filename] = (revision, digest)
+        self.file_manager.save_file(filename, text)
+        return True
+
+    def _on_text_edited(self, processor, edit):
+        """Track dirty state and (re)arm the save timers"""
+        self._set_dirty(processor.revision != self._saved_revision)
+        if not self._dirty or not self.enabled or not self.file_manager.current_file:
+            return
+
+        # Debounce: save once typing pauses
+        if self._idle_id:
+            GLib.source_remove(self._idle_id)
+        self._idle_id = GLib.timeout_add(self.IDLE_DELAY_MS, self._on_timeout, False)
+
+        # Cap: never leave a busy document unsaved for too long
+        if not self._max_id:
+            self._max_id = GLib.timeout_add(self.MAX_INTERVAL_MS, self._on_timeout, True)
+
+    def _on_timeout(self, capped):
+        """Autosave timer callback: the debounce timer or, if capped, the max
+        interval one; the other timer is removed"""
+        # The firing source is removed by returning SOURCE_REMOVE
+        if capped:
+            self._max_id = 0
+        else:
+            self._idle_id = 0
+        self._cancel_timers()
+        filename = self.file_manager.current_file
+        if self.enabled and self._dirty and filename:
+            self.save_document(filename)
+        return GLib.SOURCE_REMOVE
+
+    def _on_file_saved(self, manager, filename):
+        """Record the revision that reached the disk"""
+        if filename not in self._pending:
+            return
+        revision, digest = self._pending.pop(filename)
+        if filename == self.file_manager.current_file:
+            self._saved_revision = revision
+            self._saved_digest = digest
+            self._set_dirty(self.text_processor.revision != revision)
+            self.emit('document_saved', filename, revision)
+
+    def _cancel_timers(self):
+        """Remove pending autosave timers"""
+        if self._idle_id:
+            GLib.source_remove(self._idle_id)
+            self._idle_id = 0
+        if self._max_id:
+            GLib.source_remove(self._max_id)
+            self._max_id = 0
+
+    def _set_dirty(self, dirty):
+        """Update the dirty flag, notifying changes"""
+        if dirty != self._dirty:
+            self._dirty = dirty
+            self.emit('dirty_changed', dirty)
\ No newline at end of file
@@ -0,0 +1,196 @@
+"""
+Capture Inbox - Core component appending quick captures to a single log
+"""
+import os
+import json
+import time
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from core.notes_tree import candidate_note_paths
+from core.storage import (encode_frame, scan_frames, create_exclusive, write_atomic, fsync_dir,
+                          DURABILITY_FILE, DURABILITY_FULL)
+
+def file_capture(notes_dir, title, content, durability=DURABILITY_FILE):
+    """Save a capture as a new note named after its title and return its path
+
+    A note with the same title gets a numbered name ("Title (2).md")
+    instead of being overwritten. If a note with the same name and content
+    already exists the capture was filed before (e.g. compaction was
+    interrupted) and that note is returned.
+    """
+    data = content.encode('utf-8')
+    for path in candidate_note_paths(notes_dir, title):
+        try:
+            create_exclusive(path, data, durability)
+            return path
+        except FileExistsError:
+            try:
+                with open(path, 'rb') as f:
+                    if f.read(len(data) + 1) == data:
+                        return path
+            except OSError:
+                pass
+
+class CaptureInbox:
+    """Append-only log of quick captures waiting to be filed as notes
+
+    Each capture is one framed record appended and fsynced with a single
+    write, which is much cheaper than creating a note (temporary file,
+    rename, directory update) and keeps the notes directory from filling
+    up with tiny files between compactions. compact() files the records as
+    individual notes in batches, dropping each batch from the log once its
+    notes are on disk. Filing is idempotent, so an interrupted compaction
+    is simply resumed. Appends and compaction serialize on a lock file,
+    which also covers captures from a separate capture-only process.
+    """
+
+    BATCH_RECORDS = 128
+
+    def __init__(self, path, notes_dir):
+        self.path = path
+        self.notes_dir = notes_dir
+        self._lock_path = path + '.lock'
+        # (inode, size) of the log right after our last append, when its
+        # end is known to be a complete frame
+        self._known_end = None
+
+    def _lock(self):
+        """Take the inbox lock; returns the descriptor to pass to _unlock"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        fd = os.open(self._lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        return fd
+
+    def _unlock(self, fd):
+        """Release the inbox lock"""
+        os.close(fd)
+
+    def _read(self):
+        """Content of the log, empty if it doesn't exist"""
+        try:
+            with open(self.path, 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return b''
+
+    def has_pending(self):
+        """Whether there may be captures waiting to be filed"""
+        try:
+            return os.path.getsize(self.path) > 0
+        except OSError:
+            return False
+
+    def append(self, title, content, created=None):
+        """Append a capture and flush it to disk"""
+        record = {'title': title, 'content': content, 'created': created or time.time()}
+        frame = encode_frame(json.dumps(record, ensure_ascii=False).encode('utf-8'))
+
+        lock = self._lock()
+        try:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o644)
+            try:
+                st = os.fstat(fd)
+                size = st.st_size
+                if size and self._known_end != (st.st_ino, size):
+                    # Drop a torn frame left by a crash, or it would hide
+                    # every record appended after it
+                    end = 0
+                    for payload, end in scan_frames(self._read()):
+                        pass
+                    if end < size:
+                        os.ftruncate(fd, end)
+                        size = end
+                written = 0
+                while written < len(frame):
+                    written += os.write(fd, frame[written:])
+                os.fsync(fd)
+                self._known_end = (st.st_ino, size + len(frame))
+            finally:
+                os.close(fd)
+            if not size:
+                # The log may have just been created
+                fsync_dir(os.path.dirname(self.path))
+        finally:
+            self._unlock(lock)
+
+    def pending(self):
+        """Captures waiting in the log, as (title, content, created)"""
+        records = []
+        for payload, end in scan_frames(self._read()):
+            record = self._decode(payload)
+            if record:
+                records.append((record['title'], record['content'], record['created']))
+        return records
+
+    @staticmethod
+    def _decode(payload):
+        """Record of a frame, or None if it can't be read"""
+        try:
+            record = json.loads(payload.decode('utf-8'))
+        except ValueError:
+            return None
+        if not isinstance(record, dict) or not isinstance(record.get('content'), str):
+            return None
+        record['title'] = str(record.get('title') or '')
+        record.setdefault('created', 0)
+        return record
+
+    def compact(self, durability=DURABILITY_FILE, on_filed=None):
+        """File the captures in the log as notes, in batches
+
+        on_filed(paths) is called after each batch with the notes it
+        created. Returns every filed path; an OSError stops compaction,
+        leaving the captures not yet filed in the log.
+        """
+        lock = self._lock()
+        try:
+            frames = list(scan_frames(self._read()))
+        finally:
+            self._unlock(lock)
+
+        # The captures leave the log once filed, so the notes are always flushed
+        if durability != DURABILITY_FULL:
+            durability = DURABILITY_FILE
+
+        filed = []
+        dropped = 0
+        for start in range(0, len(frames), self.BATCH_RECORDS):
+            paths = []
+            done = dropped
+            try:
+                for payload, end in frames[start:start + self.BATCH_RECORDS]:
+                    record = self._decode(payload)
+                    if record:
+                        paths.append(file_capture(self.notes_dir, record['title'], record['content'], durability))
+                    done = end
+            finally:
+                if paths and durability != DURABILITY_FULL:
+                    # One directory flush for the whole batch
+                    fsync_dir(self.notes_dir)
+                if done > dropped:
+                    self._drop(done - dropped)
+                    dropped = done
+            filed.extend(paths)
+            if on_filed and paths:
+                on_filed(paths)
+        return filed
+
+    def _drop(self, length):
+        """Remove the first length bytes (filed records) from the log"""
+        lock = self._lock()
+        try:
+            rest = self._read()[length:]
+            if rest:
+                write_atomic(self.path, rest, DURABILITY_FULL)
+            else:
+                with open(self.path, 'r+b') as f:
+                    f.truncate(0)
+                    os.fsync(f.fileno())
+            self._known_end = None
+        finally:
+            self._unlock(lock)
\ No newline at end of file
@@ -0,0 +1,302 @@
+"""
+Edit Journal - Core component for crash recovery of unsaved edits
+"""
+import os
+import glob
+import struct
+
+from core.storage import content_digest, encode_frame, iter_frames, write_atomic, DURABILITY_NONE
+
+# Record payloads: a one byte tag followed by the fields
+_HEADER = struct.Struct('<cqq')       # b'H', base size, base mtime_ns + path
+_INSERT = struct.Struct('<cQQ')       # b'I', revision, offset + utf-8 text
+_DELETE = struct.Struct('<cQQQ')      # b'D', revision, offset, length
+
+class _PieceText:
+    """Text under reconstruction, edited around a movable gap
+
+    Pieces are (string, start, end) views, so moving the gap or splitting the
+    original text never copies it. Edits near each other (i.e. typing) cost
+    O(1) each; the text is joined once at the end.
+    """
+
+    MERGE_LIMIT = 1024
+
+    def __init__(self, text):
+        self.left = [(text, 0, len(text))] if text else []
+        self.right = []
+        self.gap = len(text)
+
+    def _move_gap(self, pos):
+        """Move the gap to pos"""
+        while pos < self.gap:
+            s, a, b = self.left.pop()
+            k = self.gap - pos
+            if b - a <= k:
+                self.right.append((s, a, b))
+                self.gap -= b - a
+            else:
+                self.left.append((s, a, b - k))
+                self.right.append((s, b - k, b))
+                self.gap = pos
+        while pos > self.gap:
+            s, a, b = self.right.pop()
+            k = pos - self.gap
+            if b - a <= k:
+                self.left.append((s, a, b))
+                self.gap += b - a
+            else:
+                self.left.append((s, a, a + k))
+                self.right.append((s, a + k, b))
+                self.gap = pos
+
+    def insert(self, pos, text):
+        """Insert text at pos"""
+        self._move_gap(pos)
+        self.gap += len(text)
+        if self.left and self.left[-1][2] - self.left[-1][1] < self.MERGE_LIMIT:
+            # Glue small pieces together so typing does not pile them up
+            s, a, b = self.left.pop()
+            text = s[a:b] + text
+        self.left.append((text, 0, len(text)))
+
+    def delete(self, pos, length):
+        """Delete length chars starting at pos"""
+        self._move_gap(pos)
+        while length:
+            s, a, b = self.right.pop()
+            if b - a <= length:
+                length -= b - a
+            else:
+                self.right.append((s, a + length, b))
+                length = 0
+
+    def get_text(self):
+        """Join the pieces into the final text"""
+        return ''.join([s[a:b] for s, a, b in self.left] + [s[a:b] for s, a, b in reversed(self.right)])
+
+class EditJournal:
+    """Append-only journal of the edits made to the open document
+
+    The journal starts with a header identifying the base file (path, size
+    and mtime) followed by one framed record per insertion or deletion.
+    Records are buffered and appended in groups by flush(), so typing causes
+    a few small writes per second. Saving the document compacts the journal
+    down to the edits made after the saved revision. The journal (and its
+    directory) is only created by the first flush with records, so opening
+    a document writes nothing.
+    """
+
+    def __init__(self, journal_dir):
+        self.journal_dir = journal_dir
+        self.path = None
+        self._document = None
+        self._fd = None
+        # Header of a started journal not written yet
+        self._header = None
+        self._buffer = bytearray()
+
+    @staticmethod
+    def journal_path(journal_dir, document_path):
+        """Get the journal file used for a document ('' when untitled)"""
+        return os.path.join(journal_dir, content_digest(document_path or '') + '.journal')
+
+    def start(self, document_path):
+        """Start a new journal for a document just loaded from disk"""
+        self.discard()
+        self._document = document_path or ''
+        self.path = self.journal_path(self.journal_dir, self._document)
+        self._header = self._encode_header(self._document)
+
+    def resume(self, journal_path, document_path):
+        """Keep appending to a journal that was just replayed
+
+        Its records came from a previous session, whose revision numbers mean
+        nothing now: they are renumbered to 0 so the next save drops them.
+        """
+        if self.path == journal_path:
+            self.close()
+        else:
+            self.discard()
+        with open(journal_path, 'rb') as f:
+            data = f.read()
+
+        frames = iter_frames(data)
+        kept = bytearray(encode_frame(next(frames)))
+        for payload in frames:
+            tag = payload[:1]
+            if tag == b'I':
+                _, _, offset = _INSERT.unpack_from(payload)
+                kept += encode_frame(_INSERT.pack(b'I', 0, offset) + payload[_INSERT.size:])
+            elif tag == b'D':
+                _, _, offset, length = _DELETE.unpack_from(payload)
+                kept += encode_frame(_DELETE.pack(b'D', 0, offset, length))
+
+        self._document = document_path or ''
+        self.path = journal_path
+        write_atomic(self.path, bytes(kept), DURABILITY_NONE)
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND)
+
+    def _encode_header(self, document_path):
+        """Build the header frame describing the base file"""
+        size, mtime_ns = _stat_base(document_path)
+        payload = _HEADER.pack(b'H', size, mtime_ns) + document_path.encode('utf-8')
+        return encode_frame(payload)
+
+    def _is_open(self):
+        """Whether a journal was started or resumed and not closed"""
+        return self._fd is not None or self._header is not None
+
+    def record_insert(self, revision, offset, text):
+        """Queue an insertion"""
+        if self._is_open():
+            self._buffer += encode_frame(_INSERT.pack(b'I', revision, offset) + text.encode('utf-8'))
+
+    def record_delete(self, revision, offset, length):
+        """Queue a deletion"""
+        if self._is_open():
+            self._buffer += encode_frame(_DELETE.pack(b'D', revision, offset, length))
+
+    def has_pending(self):
+        """Whether there are queued records not yet written"""
+        return bool(self._buffer)
+
+    def flush(self, sync=False):
+        """Append the queued records to the journal in one write"""
+        if not self._is_open() or not self._buffer:
+            return
+        if self._fd is None:
+            # First edit since the document was opened
+            os.makedirs(self.journal_dir, exist_ok=True)
+            write_atomic(self.path, self._header, DURABILITY_NONE)
+            self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND)
+            self._header = None
+        os.write(self._fd, self._buffer)
+        self._buffer.clear()
+        if sync:
+            os.fsync(self._fd)
+
+    def compact(self, revision, document_path):
+        """Drop the records up to a revision that has been saved to disk
+
+        The header is rewritten with the new state of the base file (which
+        may have a new path after 'save as') and only the edits made after
+        the save are kept.
+        """
+        if not self._is_open():
+            return
+        self.flush()
+        if self._fd is None:
+            # Nothing journaled yet: only the base changed
+            self._document = document_path or ''
+            self.path = self.journal_path(self.journal_dir, self._document)
+            self._header = self._encode_header(self._document)
+            return
+        with open(self.path, 'rb') as f:
+            data = f.read()
+
+        old_path = self.path
+        self._document = document_path or ''
+        self.path = self.journal_path(self.journal_dir, self._document)
+
+        kept = bytearray(self._encode_header(self._document))
+        for payload in iter_frames(data):
+            tag = payload[:1]
+            if tag == b'I':
+                record_revision = _INSERT.unpack_from(payload)[1]
+            elif tag == b'D':
+                record_revision = _DELETE.unpack_from(payload)[1]
+            else:
+                continue
+            if record_revision > revision:
+                kept += encode_frame(payload)
+
+        os.close(self._fd)
+        write_atomic(self.path, bytes(kept), DURABILITY_NONE)
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND)
+        if old_path != self.path:
+            os.unlink(old_path)
+
+    def close(self):
+        """Write queued records and close the journal, keeping it on disk"""
+        self.flush()
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        self._header = None
+
+    def discard(self):
+        """Close and delete the journal (the document has no unsaved edits)"""
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        self._header = None
+        self._buffer.clear()
+        if self.path:
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+            self.path = None
+
+def _stat_base(document_path):
+    """Get the (size, mtime_ns) identifying the saved base of a document"""
+    if not document_path:
+        return 0, 0
+    try:
+        st = os.stat(document_path)
+    except FileNotFoundError:
+        return 0, 0
+    return st.st_size, st.st_mtime_ns
+
+def find_journals(journal_dir):
+    """List the journals left in a directory, most recent first"""
+    paths = glob.glob(os.path.join(journal_dir, '*.journal'))
+    return sorted(paths, key=lambda path: os.path.getmtime(path), reverse=True)
+
+def replay(journal_path):
+    """Rebuild the document recorded in a journal
+
+    Returns (document_path, text), with document_path '' for an untitled
+    document, or None if the journal holds no edits or its base file changed
+    since the journal was written.
+    """
+    with open(journal_path, 'rb') as f:
+        data = f.read()
+
+    frames = iter_frames(data)
+    header = next(frames, None)
+    if not header or header[:1] != b'H':
+        return None
+
+    _, size, mtime_ns = _HEADER.unpack_from(header)
+    document_path = header[_HEADER.size:].decode('utf-8')
+    if _stat_base(document_path) != (size, mtime_ns):
+        return None
+
+    base = ''
+    if document_path and size:
+        with open(document_path, 'r', encoding='utf-8') as f:
+            base = f.read()
+
+    text = _PieceText(base)
+    edits = 0
+    try:
+        for payload in frames:
+            tag = payload[:1]
+            if tag == b'I':
+                _, _, offset = _INSERT.unpack_from(payload)
+                text.insert(offset, payload[_INSERT.size:].decode('utf-8'))
+            elif tag == b'D':
+                _, _, offset, length = _DELETE.unpack_from(payload)
+                text.delete(offset, length)
+            else:
+                continue
+            edits += 1
+    except IndexError:
+        # Offsets past the end: the journal does not match its base
+        return None
+
+    if not edits:
+        return None
+    return document_path, text.get_text()
\ No newline at end of file
@@ -2,10 +2,25 @@
 File Manager - Core component for file operations
 """
 import os
+import codecs
 import gi
 
 gi.require_version('Gtk', '4.0')
-from gi.repository import GObject
+from gi.repository import GObject, Gio, GLib
+
+from core.storage import AtomicWriter, DURABILITY_FILE, DURABILITY_POLICIES
+from core.notes_tree import available_note_path
+
+class _StreamLoad:
+    """State of an asynchronous streamed load"""
+
+    def __init__(self, filename, total):
+        self.filename = filename
+        self.total = total
+        self.done = 0
+        self.stream = None
+        self.cancellable = Gio.Cancellable()
+        self.decoder = codecs.getincrementaldecoder('utf-8')()
 
 class FileManager(GObject.Object):
     """Manages file operations with event-driven architecture"""
@@ -13,17 +28,27 @@ class FileManager(GObject.Object):
     __gsignals__ = {
         'file_loaded': (GObject.SignalFlags.RUN_FIRST, None, (str, str)),
         'file_saved': (GObject.SignalFlags.RUN_FIRST, None, (str,)),
-        'file_error': (GObject.SignalFlags.RUN_FIRST, None, (str,))
+        'file_error': (GObject.SignalFlags.RUN_FIRST, None, (str,)),
+        'load_started': (GObject.SignalFlags.RUN_FIRST, None, (str,)),
+        'load_chunk': (GObject.SignalFlags.RUN_FIRST, None, (str, str)),
+        'load_progress': (GObject.SignalFlags.RUN_FIRST, None, (str, float)),
+        'load_cancelled': (GObject.SignalFlags.RUN_FIRST, None, (str,))
     }
 
+    # Bytes read and appended to the buffer per main loop iteration
+    LOAD_CHUNK_SIZE = 256 * 1024
+
+    # Files from this size on open in the read-only memory-mapped viewer
+    LARGE_FILE_THRESHOLD = 64 * 1024 * 1024
+
     def __init__(self):
         super().__init__()
         self.current_file = None
         self.notes_dir = os.path.expanduser('~/Notas')
-
-        # Create notes directory if it doesn't exist
-        if not os.path.exists(self.notes_dir):
-            os.makedirs(self.notes_dir)
+        self._load = None
+        self._writer = AtomicWriter(self._on_write_done, DURABILITY_FILE)
+        # New note paths handed out, possibly not written yet
+        self._claimed = set()
 
     def load_file(self, filename):
         """Load file content"""
@@ -35,16 +60,160 @@ class FileManager(GObject.Object):
         except Exception as e:
             self.emit('file_error', f"Error al cargar archivo: {e}")
 
-    def save_file(self, filename, content=""):
-        """Save content to file"""
+    def is_large_file(self, filename):
+        """Whether a file is too big to be edited in a GtkTextBuffer"""
+        try:
+            return os.path.getsize(filename) >= self.LARGE_FILE_THRESHOLD
+        except OSError:
+            return False
+
+    def load_file_async(self, filename):
+        """Stream file content in chunks without blocking the main loop
+
+        Emits 'load_started', then 'load_chunk' and 'load_progress' for every
+        decoded chunk, and finally 'file_loaded' with a None content (the text
+        was already delivered through the chunks). A load that is cancelled or
+        fails midway ends with 'load_cancelled' instead.
+        """
+        self.cancel_load()
+
+        try:
+            total = os.path.getsize(filename)
+        except OSError as e:
+            self.emit('file_error', f"Error al cargar archivo: {e}")
+            return
+
+        load = _StreamLoad(filename, total)
+        self._load = load
+        self.emit('load_started', filename)
+
+        gfile = Gio.File.new_for_path(filename)
+        gfile.read_async(GLib.PRIORITY_LOW, load.cancellable, self._on_load_opened, load)
+
+    def cancel_load(self):
+        """Cancel the streamed load in progress, if any"""
+        if self._load:
+            self._load.cancellable.cancel()
+
+    def is_loading(self):
+        """Whether a streamed load is in progress"""
+        return self._load is not None
+
+    def _on_load_opened(self, gfile, result, load):
+        """Handle the input stream being opened"""
+        if self._load is not load:
+            return
+        try:
+            load.stream = gfile.read_finish(result)
+        except GLib.Error as e:
+            self._finish_load_with_error(load, e)
+            return
+        self._read_next_chunk(load)
+
+    def _read_next_chunk(self, load):
+        """Request the next chunk at low priority so input events go first"""
+        load.stream.read_bytes_async(self.LOAD_CHUNK_SIZE, GLib.PRIORITY_LOW,
+                                     load.cancellable, self._on_chunk_read, load)
+
+    def _on_chunk_read(self, stream, result, load):
+        """Decode a chunk and hand it to subscribers"""
+        if self._load is not load:
+            # Superseded by a newer load
+            stream.close_async(GLib.PRIORITY_LOW, None, None, None)
+            return
         try:
-            with open(filename, 'w', encoding='utf-8') as f:
-                f.write(content)
+            data = stream.read_bytes_finish(result).get_data()
+            final = not data
+            text = load.decoder.decode(data, final)
+        except (GLib.Error, UnicodeDecodeError) as e:
+            self._finish_load_with_error(load, e)
+            return
+
+        if load.cancellable.is_cancelled():
+            self._finish_load_with_error(load, None)
+            return
+
+        if text:
+            self.emit('load_chunk', load.filename, text)
+
+        if final:
+            stream.close_async(GLib.PRIORITY_LOW, None, None, None)
+            self._load = None
+            self.current_file = load.filename
+            self.emit('load_progress', load.filename, 1.0)
+            self.emit('file_loaded', load.filename, None)
+            return
+
+        load.done += len(data)
+        self.emit('load_progress', load.filename, load.done / load.total if load.total else 1.0)
+        self._read_next_chunk(load)
+
+    def _finish_load_with_error(self, load, error):
+        """Abort a streamed load, reporting cancellation or the error"""
+        if load.stream:
+            load.stream.close_async(GLib.PRIORITY_LOW, None, None, None)
+        self._load = None
+
+        cancelled = error is None or (isinstance(error, GLib.Error) and
+                                      error.matches(Gio.io_error_quark(), Gio.IOErrorEnum.CANCELLED))
+        if not cancelled:
+            self.emit('file_error', f"Error al cargar archivo: {error}")
+        self.emit('load_cancelled', load.filename)
+
+    def save_file(self, filename, content="", set_current=True):
+        """Save content to file
+
+        The write happens atomically on a background thread; 'file_saved' or
+        'file_error' is emitted on the main loop once it is done. Files that
+        are not the open document (e.g. quick captures) pass set_current=False.
+        """
+        if set_current:
             self.current_file = filename
+        self._writer.submit(filename, content)
+
+    def _on_write_done(self, filename, error):
+        """Report a finished write back on the main loop (writer thread)"""
+        GLib.idle_add(self._emit_write_result, filename, error)
+
+    def _emit_write_result(self, filename, error):
+        """Emit the result of a background write"""
+        if error is None:
             self.emit('file_saved', filename)
-        except Exception as e:
-            self.emit('file_error', f"Error al guardar archivo: {e}")
+        else:
+            self.emit('file_error', f"Error al guardar archivo: {error}")
+        return GLib.SOURCE_REMOVE
+
+    def get_durability(self):
+        """Get the fsync policy for saves"""
+        return self._writer.durability
+
+    def set_durability(self, durability):
+        """Set the fsync policy for saves: 'none', 'file' or 'full'"""
+        if durability in DURABILITY_POLICIES:
+            self._writer.durability = durability
+
+    def flush(self, timeout=None):
+        """Wait for pending saves to reach the disk"""
+        return self._writer.flush(timeout)
 
     def get_notes_dir(self):
         """Get the default notes directory"""
-        return self.notes_dir
\ No newline at end of file
+        return self.notes_dir
+
+    def ensure_notes_dir(self):
+        """Create the notes directory if it doesn't exist"""
+        try:
+            os.makedirs(self.notes_dir, exist_ok=True)
+        except OSError as e:
+            print(f"Error creating notes directory: {e}")
+
+    def new_note_path(self, title):
+        """Path in the notes directory for a new note named after title,
+        never that of an existing note or of one still being saved"""
+        path = available_note_path(self.notes_dir, title, self._claimed)
+        self._claimed.add(path)
+        return path
+
+    def get_state_dir(self):
+        """Get the hidden directory for journals, caches and indexes"""
+        return os.path.join(self.notes_dir, '.notas')
\ No newline at end of file
@@ -0,0 +1,200 @@
+"""
+HTML Export - Core component exporting the notes directory to HTML
+"""
+import os
+import re
+import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from html import escape
+
+from core.notes_tree import iter_note_files, extract_title
+from core.storage import content_digest, write_atomic
+
+# Bump when the generated HTML changes, so everything is exported again
+EXPORT_VERSION = 1
+
+MARKDOWN_EXTENSIONS = ('.md', '.markdown')
+MANIFEST_NAME = '.notas-export.json'
+
+_NOTE_LINK = re.compile(r'(href="(?![a-z][a-z0-9+.-]*:)[^"#?]*?)\.(?:md|markdown)(?=["#?])', re.IGNORECASE)
+
+_TEMPLATE = """<!DOCTYPE html>
+<html lang="es">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{title}</title>
+<style>
+body {{ max-width: 46em; margin: 2em auto; padding: 0 1em; font-family: sans-serif; line-height: 1.5; }}
+pre, code {{ font-family: monospace; background: #f4f4f4; }}
+pre {{ padding: 0.8em; overflow-x: auto; }}
+blockquote {{ color: #666; border-left: 3px solid #ccc; margin-left: 0; padding-left: 1em; }}
+table {{ border-collapse: collapse; }}
+td, th {{ border: 1px solid #ccc; padding: 0.3em 0.6em; }}
+</style>
+</head>
+<body>
+{body}
+</body>
+</html>
+"""
+
+def default_output_dir(notes_dir):
+    """Export directory next to the notes directory (~/Notas-html)"""
+    return os.path.normpath(notes_dir) + '-html'
+
+def html_path(relative):
+    """Output path of a note, relative to the export directory"""
+    return os.path.splitext(relative)[0] + '.html'
+
+def render_note(text, path=None):
+    """Standalone HTML page of a markdown note"""
+    import markdown
+    body = markdown.markdown(text, extensions=['fenced_code', 'tables'])
+    # Links between notes point at their exported pages
+    body = _NOTE_LINK.sub(r'\1.html', body)
+    return _TEMPLATE.format(title=escape(extract_title(text, path)), body=body)
+
+def export_batch(notes_dir, output_dir, batch, durability):
+    """Worker entry point: export the notes of a batch whose content changed
+
+    batch holds (relative path, digest in the manifest or None); returns
+    (relative path, size, mtime_ns, digest, converted, error) per note.
+    """
+    results = []
+    for relative, known_digest in batch:
+        source = os.path.join(notes_dir, relative)
+        try:
+            with open(source, 'rb') as f:
+                st = os.fstat(f.fileno())
+                data = f.read()
+            digest = content_digest(data)
+            target = os.path.join(output_dir, html_path(relative))
+            converted = digest != known_digest or not os.path.exists(target)
+            if converted:
+                page = render_note(data.decode('utf-8', errors='replace'), source)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                write_atomic(target, page.encode('utf-8'), durability)
+            results.append((relative, st.st_size, st.st_mtime_ns, digest, converted, None))
+        except (OSError, ImportError) as e:
+            results.append((relative, 0, 0, None, False, str(e)))
+    return results
+
+class ExportResult:
+    """Counts of an export run"""
+
+    def __init__(self):
+        self.converted = 0
+        self.unchanged = 0
+        self.removed = 0
+        self.errors = []
+
+    def __str__(self):
+        return (f'{self.converted} exportadas, {self.unchanged} sin cambios, '
+                f'{self.removed} eliminadas, {len(self.errors)} errores')
+
+class HtmlExporter:
+    """Exports every markdown note to HTML on a process pool
+
+    The manifest in the output directory records, per note, the size,
+    mtime and content hash of the source last exported. Notes whose size
+    and mtime are unchanged are skipped without being read; the rest are
+    hashed by the workers, which only convert notes whose hash changed.
+    Pages are written atomically, and pages of deleted notes are removed.
+    """
+
+    BATCH_FILES = 32
+
+    def __init__(self, notes_dir, output_dir, workers=None, durability='file'):
+        self.notes_dir = notes_dir
+        self.output_dir = output_dir
+        self.workers = workers or max(1, min(8, os.cpu_count() or 2))
+        self.durability = durability
+        self.manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+
+    def _load_manifest(self):
+        """Manifest entries: relative path -> [size, mtime_ns, digest]"""
+        try:
+            with open(self.manifest_path, encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(manifest, dict) or manifest.get('version') != EXPORT_VERSION:
+            return {}
+        return manifest.get('notes', {})
+
+    def _save_manifest(self, notes):
+        """Write the manifest atomically"""
+        data = json.dumps({'version': EXPORT_VERSION, 'notes': notes}, separators=(',', ':'))
+        write_atomic(self.manifest_path, data.encode('utf-8'), self.durability)
+
+    def run(self, progress=None, cancel=None):
+        """Export the notes; progress(done, total) is called as batches
+        finish, and setting the cancel event stops before the next batch"""
+        result = ExportResult()
+        manifest = self._load_manifest()
+        output_dir = os.path.join(os.path.abspath(self.output_dir), '')
+
+        notes = {}
+        pending = []
+        for path, st in iter_note_files(self.notes_dir):
+            if not path.lower().endswith(MARKDOWN_EXTENSIONS) or path.startswith(output_dir):
+                continue
+            relative = os.path.relpath(path, self.notes_dir)
+            entry = manifest.get(relative)
+            if (entry and entry[0] == st.st_size and entry[1] == st.st_mtime_ns
+                    and os.path.exists(os.path.join(self.output_dir, html_path(relative)))):
+                notes[relative] = entry
+                result.unchanged += 1
+            else:
+                pending.append((relative, entry[2] if entry else None))
+
+        # Pages of notes that no longer exist
+        pending_set = {relative for relative, digest in pending}
+        for relative in manifest:
+            if relative not in notes and relative not in pending_set:
+                try:
+                    os.unlink(os.path.join(self.output_dir, html_path(relative)))
+                except OSError:
+                    pass
+                result.removed += 1
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        total = len(pending)
+        done = 0
+        if progress:
+            progress(done, total)
+
+        if pending:
+            batches = [pending[i:i + self.BATCH_FILES] for i in range(0, total, self.BATCH_FILES)]
+            context = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(batches)), mp_context=context) as executor:
+                futures = [executor.submit(export_batch, self.notes_dir, self.output_dir, batch, self.durability)
+                           for batch in batches]
+                try:
+                    for future in as_completed(futures):
+                        for relative, size, mtime_ns, digest, converted, error in future.result():
+                            if error:
+                                result.errors.append((relative, error))
+                                continue
+                            notes[relative] = [size, mtime_ns, digest]
+                            if converted:
+                                result.converted += 1
+                            else:
+                                result.unchanged += 1
+                        done += self.BATCH_FILES
+                        if progress:
+                            progress(min(done, total), total)
+                        if cancel is not None and cancel.is_set():
+                            break
+                finally:
+                    for future in futures:
+                        future.cancel()
+
+        # Unfinished notes keep their old entry so they are retried next time
+        for relative, digest in pending:
+            if relative not in notes and relative in manifest:
+                notes[relative] = manifest[relative]
+        self._save_manifest(notes)
+        return result
\ No newline at end of file
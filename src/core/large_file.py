@@ -0,0 +1,156 @@
+"""
+Large File - Core component for read-only access to huge files through mmap
+"""
+import os
+import mmap
+import bisect
+import codecs
+import threading
+import gi
+
+gi.require_version('Gtk', '4.0')
+from gi.repository import GObject, GLib
+
+from core.text_processor import count_words
+
+class LargeFile(GObject.Object):
+    """Memory-mapped, read-only view of a file too big for a GtkTextBuffer
+
+    A background pass builds a sparse line index: for every block of
+    BLOCK_SIZE bytes it stores the block offset and the number of the line
+    the block starts in. Fetching a line binary-searches the blocks and scans
+    one block at most, so memory use does not grow with the file. A second
+    pass computes word and char counts.
+    """
+
+    __gsignals__ = {
+        'index_progress': (GObject.SignalFlags.RUN_FIRST, None, (float,)),
+        'index_ready': (GObject.SignalFlags.RUN_FIRST, None, ()),
+        'stats_ready': (GObject.SignalFlags.RUN_FIRST, None, ())
+    }
+
+    BLOCK_SIZE = 64 * 1024
+    STATS_CHUNK_SIZE = 4 * 1024 * 1024
+
+    def __init__(self, filename):
+        super().__init__()
+        self.filename = filename
+        self.size = os.path.getsize(filename)
+        self._file = open(filename, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        # Parallel arrays: block start line and block byte offset
+        self._block_lines = [0]
+        self._block_offsets = [0]
+        self._newlines = 0
+        self._indexed = False
+        self._stats = None
+        self._closed = False
+
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._scan, name='notas-large-file', daemon=True)
+        self._thread.start()
+
+    def close(self):
+        """Stop the background pass and release the mapping"""
+        self._closed = True
+        self._stop.set()
+        self._thread.join()
+        self._map.close()
+        self._file.close()
+
+    def is_indexed(self):
+        """Whether the line index covers the whole file"""
+        return self._indexed
+
+    def get_line_count(self):
+        """Number of lines indexed so far (all of them once indexed)"""
+        if self._indexed:
+            return self._newlines + 1 if self.size else 0
+        return self._newlines
+
+    def get_statistics(self):
+        """Line/word/char counts; words and chars are None until computed"""
+        if self._stats:
+            return self._stats
+        return {'lines': self.get_line_count(), 'words': None, 'chars': None}
+
+    def line_offset(self, line):
+        """Byte offset where a line starts"""
+        if line <= 0:
+            return 0
+
+        # Last block starting before the newline that ends line - 1
+        index = bisect.bisect_left(self._block_lines, line) - 1
+        offset = self._block_offsets[index]
+        current = self._block_lines[index]
+        while current < line:
+            found = self._map.find(b'\n', offset)
+            if found < 0:
+                return self.size
+            offset = found + 1
+            current += 1
+        return offset
+
+    def get_lines(self, first, count):
+        """Decode count lines starting at line first"""
+        start = self.line_offset(first)
+        end = start
+        for _ in range(count):
+            found = self._map.find(b'\n', end)
+            if found < 0:
+                end = self.size
+                break
+            end = found + 1
+        text = self._map[start:end].decode('utf-8', errors='replace')
+        lines = text.split('\n')
+        if text.endswith('\n'):
+            lines.pop()
+        return lines
+
+    def _emit_idle(self, signal, *args):
+        """Emit a signal queued by the scan, unless the file was closed since"""
+        if not self._closed:
+            self.emit(signal, *args)
+        return GLib.SOURCE_REMOVE
+
+    def _scan(self):
+        """Background pass: line index first, then word/char counts"""
+        size = self.size
+        offset = 0
+        newlines = 0
+        progress_step = max(size // 100, self.BLOCK_SIZE)
+        next_progress = progress_step
+
+        while offset < size:
+            if self._stop.is_set():
+                return
+            end = min(offset + self.BLOCK_SIZE, size)
+            newlines += self._map[offset:end].count(b'\n')
+            offset = end
+            if offset < size:
+                # Offsets first: readers bisect the line list
+                self._block_offsets.append(offset)
+                self._block_lines.append(newlines)
+            self._newlines = newlines
+            if offset >= next_progress:
+                next_progress += progress_step
+                GLib.idle_add(self._emit_idle, 'index_progress', offset / size)
+
+        self._indexed = True
+        GLib.idle_add(self._emit_idle, 'index_ready')
+
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        chars = 0
+        words = 0
+        tail = ''
+        for start in range(0, size, self.STATS_CHUNK_SIZE):
+            if self._stop.is_set():
+                return
+            text = decoder.decode(self._map[start:start + self.STATS_CHUNK_SIZE], start + self.STATS_CHUNK_SIZE >= size)
+            chars += len(text)
+            words += count_words(tail + text) - count_words(tail)
+            tail = text[-1:] or tail
+
+        self._stats = {'lines': self.get_line_count(), 'words': words, 'chars': chars}
+        GLib.idle_add(self._emit_idle, 'stats_ready')
\ No newline at end of file
@@ -0,0 +1,214 @@
+"""
+Link Graph - Core component tracking [[wikilinks]] between notes
+"""
+import os
+import re
+import threading
+import zlib
+from collections import namedtuple
+
+from core.markdown_syntax import FenceMap
+from core.notes_tree import is_note
+from core.storage import write_atomic
+
+# Targets a note links to, as link keys
+NoteLinks = namedtuple('NoteLinks', 'size mtime_ns targets')
+
+_MAGIC = b'NLNK1\n'
+# [[Target]], [[Target|alias]], [[Target#Heading]]
+_WIKILINK = re.compile(r'\[\[([^\[\]\n|#]+)(?:#[^\[\]\n|]*)?(?:\|[^\[\]\n]*)?\]\]')
+_CODE_SPAN = re.compile(r'(`+).+?(?<!`)\1(?!`)')
+_FENCE_HINT = re.compile(r'```|~~~')
+_NOTE_EXTENSION = re.compile(r'\.(?:md|markdown|txt)$', re.IGNORECASE)
+
+def link_key(name):
+    """Key a link target or note name is matched by: case and spacing
+    insensitive, without a note extension"""
+    return ' '.join(_NOTE_EXTENSION.sub('', name).split()).casefold()
+
+def parse_links(text):
+    """Keys of the [[wikilinks]] of a note, once each, leaving out code"""
+    if '[[' not in text:
+        return ()
+    fences = None
+    if _FENCE_HINT.search(text):
+        fences = FenceMap()
+        fences.reset(text)
+    keys = {}
+    for line_number, line in enumerate(text.split('\n')):
+        if '[[' not in line or (fences and fences.is_code(line_number)):
+            continue
+        if '`' in line:
+            line = _CODE_SPAN.sub('', line)
+        for match in _WIKILINK.finditer(line):
+            key = link_key(match.group(1))
+            if key:
+                keys[key] = None
+    return tuple(keys)
+
+def _clean(text):
+    """Make a path safe for the tab-separated cache"""
+    return text.replace('\t', ' ').replace('\n', ' ')
+
+class LinkGraph:
+    """Outgoing [[wikilinks]] of every note and the reverse adjacency,
+    cached on disk
+
+    Like the task index, it is fed the notes catalog and only parses notes
+    whose size or mtime changed; a changed note has just its own edges
+    replaced in the reverse index. A link matches a note by file name or
+    title (see link_key), so backlinks() unions at most two reverse
+    entries: its cost is the number of backlinks, not the number of notes.
+    """
+
+    def __init__(self, notes_dir, cache_path):
+        self.notes_dir = notes_dir
+        self.cache_path = cache_path
+        self.dirty = False
+        self._loaded = False
+        # Path -> NoteLinks
+        self._outgoing = {}
+        # Link key -> paths of the notes linking to it
+        self._incoming = {}
+        self._lock = threading.Lock()
+
+    def outgoing(self, path):
+        """Link keys of a note"""
+        note = self._outgoing.get(path)
+        return note.targets if note else ()
+
+    def backlinks(self, path, title=None):
+        """Notes linking to a note, by its file name or title"""
+        keys = {link_key(os.path.basename(path))}
+        if title:
+            keys.add(link_key(title))
+        sources = set()
+        with self._lock:
+            for key in keys:
+                sources.update(self._incoming.get(key, ()))
+        sources.discard(path)
+        return sorted(sources)
+
+    def _set(self, path, note):
+        """Replace the edges of a note (None removes it); lock held"""
+        old = self._outgoing.pop(path, None)
+        old_targets = set(old.targets) if old else set()
+        new_targets = set(note.targets) if note else set()
+        for key in old_targets - new_targets:
+            sources = self._incoming.get(key)
+            if sources:
+                sources.discard(path)
+                if not sources:
+                    del self._incoming[key]
+        for key in new_targets - old_targets:
+            self._incoming.setdefault(key, set()).add(path)
+        if note:
+            self._outgoing[path] = note
+        self.dirty = True
+
+    # Cache file
+
+    def load(self):
+        """Read the cache; returns False if missing or unreadable"""
+        self._loaded = True
+        try:
+            with open(self.cache_path, 'rb') as f:
+                data = f.read()
+            if not data.startswith(_MAGIC):
+                return False
+            lines = zlib.decompress(data[len(_MAGIC):]).decode('utf-8').split('\n')
+        except (OSError, zlib.error, UnicodeDecodeError):
+            return False
+
+        outgoing = {}
+        incoming = {}
+        try:
+            for line in lines:
+                if not line:
+                    continue
+                fields = line.split('\t')
+                if fields[0] == 'N':
+                    outgoing[os.path.join(self.notes_dir, fields[1])] = NoteLinks(
+                        int(fields[2]), int(fields[3]), tuple(fields[4:]))
+                elif fields[0] == 'L':
+                    incoming[fields[1]] = {os.path.join(self.notes_dir, relative) for relative in fields[2:]}
+                else:
+                    return False
+        except (ValueError, IndexError):
+            return False
+        with self._lock:
+            self._outgoing = outgoing
+            self._incoming = incoming
+        self.dirty = False
+        return True
+
+    def save(self):
+        """Write the cache atomically: each note's links, then the reverse index"""
+        with self._lock:
+            outgoing = list(self._outgoing.items())
+            incoming = [(key, list(sources)) for key, sources in self._incoming.items()]
+        lines = []
+        for path, note in outgoing:
+            relative = os.path.relpath(path, self.notes_dir)
+            if _clean(relative) == relative:
+                lines.append('\t'.join(['N', relative, str(note.size), str(note.mtime_ns), *note.targets]))
+        for key, sources in incoming:
+            relatives = [os.path.relpath(path, self.notes_dir) for path in sources]
+            lines.append('\t'.join(['L', key, *(relative for relative in relatives if _clean(relative) == relative)]))
+        data = _MAGIC + zlib.compress('\n'.join(lines).encode('utf-8'), 6)
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        write_atomic(self.cache_path, data)
+        self.dirty = False
+
+    # Parsing
+
+    def _read_note(self, path):
+        """Parse the links of a note, or None if it can't be read"""
+        try:
+            with open(path, 'rb') as f:
+                st = os.fstat(f.fileno())
+                data = f.read()
+        except OSError:
+            return None
+        return NoteLinks(st.st_size, st.st_mtime_ns, parse_links(data.decode('utf-8', 'replace')))
+
+    def sync(self, entries):
+        """Bring the graph up to date with catalog entries (path, size,
+        mtime_ns); returns True if any edge changed"""
+        if not self._loaded:
+            self.load()
+        seen = set()
+        changed = False
+        for entry in entries:
+            seen.add(entry.path)
+            note = self._outgoing.get(entry.path)
+            if note and note.size == entry.size and note.mtime_ns == entry.mtime_ns:
+                continue
+            parsed = self._read_note(entry.path)
+            with self._lock:
+                self._set(entry.path, parsed)
+            changed = changed or not note or not parsed or note.targets != parsed.targets
+        with self._lock:
+            for path in [path for path in self._outgoing if path not in seen]:
+                self._set(path, None)
+                changed = True
+        return changed
+
+    def update_file(self, path):
+        """Refresh a single note (e.g. right after saving it); returns True
+        if its links changed"""
+        if not path.startswith(os.path.join(self.notes_dir, '')) or not is_note(path):
+            return False
+        try:
+            st = os.stat(path)
+        except OSError:
+            st = None
+        note = self._outgoing.get(path)
+        if note is None and st is None:
+            return False
+        if note and st and note.size == st.st_size and note.mtime_ns == st.st_mtime_ns:
+            return False
+        parsed = self._read_note(path) if st else None
+        with self._lock:
+            self._set(path, parsed)
+        return (note.targets if note else ()) != (parsed.targets if parsed else ())
\ No newline at end of file
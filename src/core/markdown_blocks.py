@@ -0,0 +1,331 @@
+"""
+Markdown Blocks - Core helpers for rendering markdown block by block
+"""
+import re
+import bisect
+from collections import OrderedDict
+from html import escape
+from html.parser import HTMLParser
+
+from core.storage import content_digest
+
+_FENCE = re.compile(r'^ {0,3}(`{3,}|~{3,})')
+_REFERENCE = re.compile(r'^ {0,3}\[[^\]]+\]:\s')
+_LIST_ITEM = re.compile(r'^ {0,3}([-*+]|\d+[.)])\s')
+_TRAILING_NEWLINES = re.compile(r'\n+((?:</\w+>)*)$')
+
+def split_segments(text):
+    """Split a document into the spans of its top-level blocks
+
+    A span is a block's lines plus the blank lines after it (the first
+    span also takes those before it), so the spans add up to the text.
+    Fenced code keeps its blank lines, and indented lines after a blank
+    line (list continuations, indented code) stay with the block above, as
+    do the items of a loose list.
+    """
+    segments = []
+    start = 0
+    position = 0
+    first_line = None
+    fence = None
+    blank = False
+    for line in text.split('\n'):
+        if fence:
+            if line.strip().startswith(fence):
+                fence = None
+        elif not line.strip():
+            blank = first_line is not None
+        else:
+            if (blank and not line.startswith(('    ', '\t'))
+                    and not (_LIST_ITEM.match(line) and _LIST_ITEM.match(first_line))):
+                segments.append(text[start:position])
+                start = position
+                first_line = None
+            blank = False
+
+            match = _FENCE.match(line)
+            if match:
+                fence = match.group(1)[:3]
+            if first_line is None:
+                first_line = line
+        position += len(line) + 1
+
+    if start < len(text):
+        segments.append(text[start:])
+    return segments
+
+def segment_block(segment):
+    """The block of a span, without the blank lines around it"""
+    lines = segment.split('\n')
+    first = 0
+    while first < len(lines) and not lines[first].strip():
+        first += 1
+    return '\n'.join(lines[first:]).rstrip('\n')
+
+def split_blocks(text):
+    """Split a document into top-level blocks at blank lines"""
+    return [block for block in map(segment_block, split_segments(text)) if block]
+
+def _block_references(block):
+    """Link reference definitions ("[id]: url") of a block"""
+    if '[' not in block:
+        return ''
+    return '\n'.join(line for line in block.split('\n') if _REFERENCE.match(line))
+
+def reference_definitions(blocks):
+    """Link reference definitions ("[id]: url") found in the blocks"""
+    return '\n'.join(references for references in map(_block_references, blocks) if references)
+
+class BlockDocument:
+    """Top-level blocks of a document, kept up to date from its edits
+
+    The text is held as the spans of its blocks (split_segments), each with
+    its block and cache key. An edit re-splits from the span before the
+    edited one until the new spans line up again with the old ones past
+    the edit; the spans after that are only shifted. Splitting and hashing
+    thus cost the size of the blocks around the edit, not of the document.
+    Blocks using link references are keyed again only when the reference
+    definitions change.
+    """
+
+    def __init__(self, text=''):
+        self.reset(text)
+
+    def reset(self, text):
+        """Split a whole new text"""
+        self._segments = split_segments(text)
+        self._starts = []
+        position = 0
+        for segment in self._segments:
+            self._starts.append(position)
+            position += len(segment)
+        self._length = len(text)
+        self._blocks = [segment_block(segment) for segment in self._segments]
+        self._references = [_block_references(block) for block in self._blocks]
+        self.references = '\n'.join(references for references in self._references if references)
+        self._keys = [self._key(block) for block in self._blocks]
+
+    def __len__(self):
+        return self._length
+
+    def text(self):
+        """The whole text"""
+        return ''.join(self._segments)
+
+    def blocks(self):
+        """(key, block) of every block"""
+        return [(key, block) for key, block in zip(self._keys, self._blocks) if block]
+
+    def _key(self, block):
+        """Cache key of a block with the current reference definitions"""
+        return BlockCache.key(block, self.references if '[' in block else '') if block else None
+
+    def apply_edit(self, offset, inserted='', removed=0):
+        """Follow an edit: removed chars at offset replaced by inserted"""
+        if not self._segments:
+            self.reset(inserted)
+            return
+        end = offset + removed
+        # A span starts a block only after a blank line, so the edit may
+        # merge its span into the previous one: re-split from there
+        first = max(bisect.bisect_right(self._starts, offset) - 2, 0)
+        last = max(bisect.bisect_right(self._starts, end) - 1, 0)
+        base = self._starts[first]
+        chunk = ''.join(self._segments[first:last + 1])
+        chunk = chunk[:offset - base] + inserted + chunk[end - base:]
+
+        # Take in old spans until a new one starts where an old one does
+        while True:
+            if last + 1 >= len(self._segments):
+                segments = split_segments(chunk)
+                break
+            segments = split_segments(chunk + self._segments[last + 1])
+            total = count = 0
+            while total < len(chunk):
+                total += len(segments[count])
+                count += 1
+            if total == len(chunk):
+                segments = segments[:count]
+                break
+            last += 1
+            chunk += self._segments[last]
+
+        delta = len(inserted) - removed
+        starts = []
+        position = base
+        for segment in segments:
+            starts.append(position)
+            position += len(segment)
+        self._starts[first:last + 1] = starts
+        after = first + len(segments)
+        if delta:
+            self._starts[after:] = [start + delta for start in self._starts[after:]]
+        self._segments[first:last + 1] = segments
+        self._length += delta
+
+        blocks = [segment_block(segment) for segment in segments]
+        references = [_block_references(block) for block in blocks]
+        changed_references = any(self._references[first:last + 1]) or any(references)
+        self._blocks[first:last + 1] = blocks
+        self._references[first:last + 1] = references
+        self._keys[first:last + 1] = [None] * len(blocks)
+        if changed_references:
+            text = '\n'.join(references for references in self._references if references)
+            if text != self.references:
+                self.references = text
+                self._keys = [self._key(block) if '[' in block else key
+                              for key, block in zip(self._keys, self._blocks)]
+        self._keys[first:after] = [self._key(block) for block in blocks]
+
+class _PangoConverter(HTMLParser):
+    """Turns the HTML of a markdown block into Pango markup"""
+
+    HEADING_SIZES = {'h1': 'xx-large', 'h2': 'x-large', 'h3': 'large', 'h4': 'medium', 'h5': 'medium', 'h6': 'small'}
+    SIMPLE_TAGS = {'strong': 'b', 'b': 'b', 'em': 'i', 'i': 'i', 'code': 'tt', 'del': 's', 's': 's',
+                   'sub': 'sub', 'sup': 'sup', 'u': 'u'}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.out = []
+        self._closing = []
+        self._lists = []
+        self._pre = 0
+        self._pending_cell = False
+        self._item_start = False
+        self._line_start = True
+
+    def _text(self, text):
+        """Append visible text"""
+        if text:
+            self.out.append(text)
+            self._line_start = text.endswith('\n')
+
+    def _newline(self):
+        """Start a new line unless already at one"""
+        if not self._line_start:
+            self._text('\n')
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        close = ''
+        if tag in self.HEADING_SIZES:
+            self._newline()
+            self.out.append(f'<span size="{self.HEADING_SIZES[tag]}" weight="bold">')
+            close = '</span>\n'
+        elif tag in self.SIMPLE_TAGS:
+            if not (tag == 'code' and self._pre):
+                name = self.SIMPLE_TAGS[tag]
+                self.out.append(f'<{name}>')
+                close = f'</{name}>'
+        elif tag == 'pre':
+            self._newline()
+            self._pre += 1
+            self.out.append('<tt>')
+            close = '</tt>\n'
+        elif tag == 'a':
+            self.out.append(f'<a href="{escape(attrs.get("href") or "")}">')
+            close = '</a>'
+        elif tag in ('ul', 'ol'):
+            start = attrs.get('start') or '1'
+            self._lists.append(int(start) - 1 if tag == 'ol' and start.isdigit() else None)
+        elif tag == 'li':
+            if self._lists and self._lists[-1] is not None:
+                self._lists[-1] += 1
+                bullet = f'{self._lists[-1]}.'
+            else:
+                bullet = '•'
+            self._newline()
+            self._text('    ' * max(0, len(self._lists) - 1) + bullet + ' ')
+            self._item_start = True
+        elif tag == 'blockquote':
+            self._newline()
+            self.out.append('<span foreground="#888888"><i>')
+            close = '</i></span>\n'
+        elif tag in ('p', 'tr'):
+            if not self._item_start:
+                self._newline()
+            self._pending_cell = False
+            close = '\n'
+        elif tag in ('td', 'th'):
+            if self._pending_cell:
+                self._text(' │ ')
+            self._pending_cell = True
+            if tag == 'th':
+                self.out.append('<b>')
+                close = '</b>'
+        elif tag == 'hr':
+            self._newline()
+            self._text('──────────\n')
+        elif tag == 'br':
+            self._text('\n')
+        elif tag == 'img':
+            self._text(escape(f'[{attrs.get("alt") or "imagen"}]'))
+        if tag not in ('hr', 'br', 'img'):
+            self._closing.append((tag, close))
+
+    def handle_endtag(self, tag):
+        # Close up to the matching tag, tolerating unbalanced HTML
+        while self._closing:
+            open_tag, close = self._closing.pop()
+            if close.endswith('\n'):
+                self.out.append(close[:-1])
+                self._newline()
+            else:
+                self.out.append(close)
+            if open_tag == 'pre':
+                self._pre -= 1
+            elif open_tag in ('ul', 'ol') and self._lists:
+                self._lists.pop()
+            if open_tag == tag:
+                break
+
+    def handle_data(self, data):
+        if not self._pre:
+            if not data.strip() and ('\n' in data or self._item_start or self._line_start):
+                # Formatting between block tags
+                return
+            data = data.replace('\n', ' ')
+            if self._line_start:
+                data = data.lstrip()
+        self._text(escape(data, quote=False))
+        self._item_start = False
+
+    def markup(self):
+        self.handle_endtag(None)
+        return _TRAILING_NEWLINES.sub(r'\1', ''.join(self.out).lstrip('\n'))
+
+def html_to_pango(html):
+    """Pango markup approximating the HTML of a markdown block"""
+    converter = _PangoConverter()
+    converter.feed(html)
+    converter.close()
+    return converter.markup()
+
+class BlockCache:
+    """Bounded LRU cache of rendered blocks keyed by content hash"""
+
+    def __init__(self, max_blocks=4096):
+        self.max_blocks = max_blocks
+        self._entries = OrderedDict()
+
+    @staticmethod
+    def key(block, references=''):
+        """Cache key of a block rendered with some reference definitions"""
+        return content_digest(f'{block}\x00{references}'.encode('utf-8'))
+
+    def get(self, key):
+        """Cached rendering of a block, or None"""
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        """Store the rendering of a block"""
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_blocks:
+            self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
\ No newline at end of file
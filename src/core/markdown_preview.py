@@ -0,0 +1,116 @@
+"""
+Markdown Preview - Core component rendering the document block by block
+"""
+import threading
+import gi
+
+gi.require_version('Gtk', '4.0')
+from gi.repository import GObject, GLib
+
+from core.markdown_blocks import BlockDocument, html_to_pango, BlockCache
+
+class MarkdownPreview(GObject.Object):
+    """Renders markdown to Pango markup on a worker thread, one block at a time
+
+    The document is kept as top-level blocks (BlockDocument) and each
+    block's markup is cached by content hash. Edits are followed with
+    apply_edit(), which re-splits and re-hashes only the blocks around the
+    edit, and only blocks missing from the cache go through the markdown
+    converter. Only the latest submitted version is rendered: a newer one
+    interrupts the current pass between blocks, keeping what was already
+    rendered in the cache.
+    """
+
+    __gsignals__ = {
+        'preview_ready': (GObject.SignalFlags.RUN_FIRST, None, (GObject.TYPE_PYOBJECT,)),
+        'preview_error': (GObject.SignalFlags.RUN_FIRST, None, (str,))
+    }
+
+    EXTENSIONS = ['fenced_code', 'tables']
+
+    def __init__(self):
+        super().__init__()
+        self.cache = BlockCache()
+        self.document = BlockDocument()
+        self._markdown = None
+        self._pending = None
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopping = False
+
+    def update(self, text):
+        """Render a whole new text"""
+        self.document.reset(text)
+        self.render()
+
+    def apply_edit(self, offset, inserted='', removed=0):
+        """Follow an edit of the document (main loop); render() shows it"""
+        self.document.apply_edit(offset, inserted, removed)
+
+    def render(self):
+        """Render the current version of the document"""
+        with self._cond:
+            self._pending = (self.document.blocks(), self.document.references)
+            if self._thread is None:
+                self._stopping = False
+                self._thread = threading.Thread(target=self._run, name='notas-preview', daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def stop(self):
+        """Stop the worker thread"""
+        with self._cond:
+            self._stopping = True
+            self._pending = None
+            self._cond.notify()
+            thread = self._thread
+            self._thread = None
+        if thread:
+            thread.join()
+
+    def _has_pending(self):
+        """Whether a newer version is waiting"""
+        with self._cond:
+            return self._pending is not None
+
+    def _run(self):
+        """Worker thread main loop"""
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending is not None or self._stopping)
+                if self._stopping:
+                    return
+                blocks, references = self._pending
+                self._pending = None
+
+            try:
+                blocks = self._render(blocks, references)
+            except ImportError:
+                GLib.idle_add(self.emit, 'preview_error', 'Markdown no disponible - instala python-markdown')
+                continue
+            if blocks is not None:
+                GLib.idle_add(self.emit, 'preview_ready', blocks)
+
+    def _render(self, blocks, references):
+        """(key, markup) for every (key, block), or None if a newer version
+        arrived"""
+        # Room for every block of the document plus a previous version
+        self.cache.max_blocks = max(self.cache.max_blocks, 2 * len(blocks))
+        rendered = []
+        for key, block in blocks:
+            markup = self.cache.get(key)
+            if markup is None:
+                if self._has_pending():
+                    return None
+                markup = self._convert(block, references if '[' in block else '')
+                self.cache.put(key, markup)
+            rendered.append((key, markup))
+        return rendered
+
+    def _convert(self, block, references):
+        """Render a single block"""
+        if self._markdown is None:
+            import markdown
+            self._markdown = markdown.Markdown(extensions=self.EXTENSIONS)
+        html = self._markdown.reset().convert(f'{block}\n\n{references}' if references else block)
+        return html_to_pango(html)
\ No newline at end of file
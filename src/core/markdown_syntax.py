@@ -0,0 +1,152 @@
+"""
+Markdown Syntax - Core component tokenizing markdown lines for highlighting
+"""
+import re
+import bisect
+
+_FENCE = re.compile(r'^ {0,3}(`{3,}|~{3,})(.*)$')
+# Matches after a newline; much faster than ^ with re.MULTILINE
+_FENCE_LINES = re.compile(r'\n( {0,3}(?:`{3}|~{3})[^\n]*)')
+_HEADING = re.compile(r'^ {0,3}(#{1,6})(?:\s|$)')
+_QUOTE = re.compile(r'^ {0,3}>')
+_LIST_ITEM = re.compile(r'^\s*([-*+]|\d+[.)])\s+')
+_TASK = re.compile(r'\[([ xX])\](?=\s|$)')
+_CODE_SPAN = re.compile(r'(`+)(.+?)(?<!`)\1(?!`)')
+_STRONG = re.compile(r'(\*\*|__)(?=\S)(.+?)(?<=\S)\1')
+_EMPHASIS = re.compile(r'(?<![*\w])\*(?=[^\s*])(.+?)(?<=[^\s*])\*(?!\*)|(?<![_\w])_(?=[^\s_])(.+?)(?<=[^\s_])_(?![_\w])')
+_LINK = re.compile(r'!?\[[^\]\n]*\]\([^)\n]*\)|<[a-z][a-z0-9+.-]*:[^\s>]+>', re.IGNORECASE)
+
+# Token kinds, each shown with its own text tag
+HEADING_KINDS = ('heading-1', 'heading-2', 'heading')
+TOKEN_KINDS = HEADING_KINDS + ('quote', 'list', 'checkbox', 'task-done', 'code', 'strong', 'emphasis',
+                               'link', 'code-block')
+
+def fence_marker(line):
+    """(char, length, info) of a line that may open or close a fenced block, or None"""
+    match = _FENCE.match(line)
+    if not match:
+        return None
+    return match.group(1)[0], len(match.group(1)), match.group(2)
+
+def tokenize_line(line):
+    """(start, end, kind) spans of a line outside fenced code, in columns"""
+    spans = []
+    heading = _HEADING.match(line)
+    if heading:
+        level = len(heading.group(1))
+        spans.append((0, len(line), HEADING_KINDS[min(level, 3) - 1]))
+    elif _QUOTE.match(line):
+        spans.append((0, len(line), 'quote'))
+
+    item = _LIST_ITEM.match(line)
+    if item:
+        spans.append((item.start(1), item.end(1), 'list'))
+        task = _TASK.match(line, item.end())
+        if task:
+            spans.append((task.start(), task.end(), 'checkbox'))
+            if task.group(1) != ' ' and task.end() < len(line):
+                spans.append((task.end(), len(line), 'task-done'))
+
+    # Code spans hide the markup inside them
+    masked = line
+    for match in _CODE_SPAN.finditer(line):
+        spans.append((match.start(), match.end(), 'code'))
+        masked = masked[:match.start()] + ' ' * (match.end() - match.start()) + masked[match.end():]
+    for pattern, kind in ((_STRONG, 'strong'), (_EMPHASIS, 'emphasis'), (_LINK, 'link')):
+        for match in pattern.finditer(masked):
+            spans.append((match.start(), match.end(), kind))
+    return spans
+
+class FenceMap:
+    """Fenced code blocks of a document, kept up to date through line edits
+
+    Only the lines that look like fence delimiters are stored, together
+    with whether each one belongs to a block and whether the lines after
+    it are inside one. Finding out if a line is code is then a binary
+    search, and an edit re-pairs the delimiters (there are few of them)
+    instead of re-reading the text. Edits that add or remove no delimiter
+    only shift line numbers.
+    """
+
+    def __init__(self):
+        self.lines = []
+        self._markers = []
+        self._in_block = []
+        self._inside_after = []
+
+    def reset(self, text):
+        """Find the delimiters of a whole document"""
+        self.lines = []
+        self._markers = []
+        line = 0
+        position = 0
+        marker = fence_marker(text[:text.find('\n')] if '\n' in text else text)
+        if marker:
+            self.lines.append(0)
+            self._markers.append(marker)
+        for match in _FENCE_LINES.finditer(text):
+            line += text.count('\n', position, match.start(1))
+            position = match.start(1)
+            self.lines.append(line)
+            self._markers.append(fence_marker(match.group(1)))
+        self._pair()
+
+    def _pair(self):
+        """Match opening and closing delimiters"""
+        self._in_block = []
+        self._inside_after = []
+        opening = None
+        for char, length, info in self._markers:
+            if opening is None:
+                # A backtick fence's info string cannot contain backticks
+                if char == '~' or '`' not in info:
+                    opening = (char, length)
+                self._in_block.append(opening is not None)
+                self._inside_after.append(opening is not None)
+            else:
+                self._in_block.append(True)
+                if char == opening[0] and length >= opening[1] and not info.strip():
+                    opening = None
+                self._inside_after.append(opening is not None)
+
+    def is_code(self, line):
+        """Whether a line is part of a fenced block (delimiters included)"""
+        index = bisect.bisect_right(self.lines, line) - 1
+        if index < 0:
+            return False
+        if self.lines[index] == line:
+            return self._in_block[index]
+        return self._inside_after[index]
+
+    def splice(self, first, old_count, new_lines):
+        """Replace the old_count lines from first by new_lines (their text)
+
+        Returns the (start, end) line ranges, in the new numbering, whose
+        membership in a code block may have changed; end is None for the
+        end of the document.
+        """
+        lo = bisect.bisect_left(self.lines, first)
+        hi = bisect.bisect_left(self.lines, first + old_count)
+        added = [(first + i, marker) for i, marker in enumerate(map(fence_marker, new_lines)) if marker]
+        delta = len(new_lines) - old_count
+
+        if hi == lo and not added:
+            if delta:
+                self.lines[hi:] = [line + delta for line in self.lines[hi:]]
+            return []
+
+        previous = list(zip(self._in_block, self._inside_after))
+        previous[lo:hi] = [None] * len(added)
+        self.lines[lo:] = [line for line, marker in added] + [line + delta for line in self.lines[hi:]]
+        self._markers[lo:hi] = [marker for line, marker in added]
+        self._pair()
+
+        changed = []
+        after = lo + len(added)
+        # Lines between the edit and the next delimiter follow a new one
+        changed.append((first, self.lines[after] if after < len(self.lines) else None))
+        for index, state in enumerate(previous):
+            if state != (self._in_block[index], self._inside_after[index]):
+                end = self.lines[index + 1] if index + 1 < len(self.lines) else None
+                changed.append((self.lines[index], end))
+        return changed
\ No newline at end of file
@@ -0,0 +1,215 @@
+"""
+Note Grep - Core component for parallel regex scans over the notes directory
+"""
+import os
+import re
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from core.notes_tree import iter_note_files
+
+# Bytes read from a note at a time; chunks are cut at line boundaries
+CHUNK_SIZE = 1024 * 1024
+# Characters of context kept around a match in its snippet
+SNIPPET_CHARS = 160
+
+def _snippet(text, line_start, line_end, match_start):
+    """The line holding a match, trimmed around it"""
+    if line_end - line_start <= SNIPPET_CHARS:
+        return text[line_start:line_end].rstrip('\r')
+    start = max(line_start, match_start - SNIPPET_CHARS // 4)
+    end = min(line_end, start + SNIPPET_CHARS)
+    prefix = '…' if start > line_start else ''
+    suffix = '…' if end < line_end else ''
+    return prefix + text[start:end].rstrip('\r') + suffix
+
+def grep_file(path, pattern, limit):
+    """(path, line, column, snippet) hits of a compiled pattern in a file,
+    at most limit; lines and columns are 1-based
+
+    The file is read in line-aligned chunks, so memory stays bounded on huge
+    notes. Matches spanning a chunk boundary are not reported.
+    """
+    hits = []
+    line = 1
+    tail = b''
+    with open(path, 'rb') as f:
+        while True:
+            data = f.read(CHUNK_SIZE)
+            if data:
+                data = tail + data
+                cut = data.rfind(b'\n') + 1
+                if cut == 0 and len(data) < 4 * CHUNK_SIZE:
+                    # Keep reading until the line ends
+                    tail = data
+                    continue
+                chunk, tail = (data, b'') if cut == 0 else (data[:cut], data[cut:])
+            elif tail:
+                chunk, tail = tail, b''
+            else:
+                return hits
+
+            text = chunk.decode('utf-8', errors='replace')
+            pos = 0
+            for match in pattern.finditer(text):
+                start = match.start()
+                if match.end() == start:
+                    continue
+                line += text.count('\n', pos, start)
+                pos = start
+                line_start = text.rfind('\n', 0, start) + 1
+                line_end = text.find('\n', start)
+                if line_end < 0:
+                    line_end = len(text)
+                hits.append((path, line, start - line_start + 1,
+                             _snippet(text, line_start, line_end, start)))
+                if len(hits) >= limit:
+                    return hits
+            line += text.count('\n', pos)
+
+def grep_files(paths, pattern, flags, limit):
+    """Worker entry point: grep a batch of files, up to limit hits in total"""
+    compiled = re.compile(pattern, flags)
+    hits = []
+    for path in paths:
+        try:
+            hits.extend(grep_file(path, compiled, limit - len(hits)))
+        except OSError:
+            continue
+        if len(hits) >= limit:
+            break
+    return hits
+
+class GrepJob:
+    """A running scan; cancel() stops it after the batches in flight"""
+
+    def __init__(self, root, pattern, flags, max_results):
+        self.root = root
+        self.pattern = pattern
+        self.flags = flags
+        self.max_results = max_results
+        self.count = 0
+        self.truncated = False
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        """Stop submitting work; no more hits are reported"""
+        self._cancelled.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+class ParallelGrep:
+    """Fans regex scans of the notes tree out over a process pool
+
+    A coordinator thread walks the tree, groups notes into batches and keeps
+    a bounded number of them in flight, so the first hits arrive as soon as
+    the first batch is scanned and a cancel takes effect quickly.
+    on_hits(job, hits) is called from the coordinator thread for every
+    finished batch with hits, and on_done(job) once the scan stops; callers
+    on the main loop should hand them over with GLib.idle_add.
+
+    Workers are spawned rather than forked: the application process runs
+    threads, which fork does not copy safely.
+    """
+
+    # A batch is sent to a worker once it holds this many files or bytes
+    BATCH_FILES = 64
+    BATCH_BYTES = 4 * 1024 * 1024
+
+    def __init__(self, workers=None):
+        self.workers = workers or max(1, min(8, (os.cpu_count() or 2) - 1))
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def warm_up(self):
+        """Start the worker processes ahead of the first search"""
+        executor = self._get_executor()
+        for _ in range(self.workers):
+            executor.submit(os.getpid)
+
+    def search(self, root, pattern, on_hits, on_done, ignore_case=False, max_results=1000):
+        """Start scanning every note under root; raises re.error for an
+        invalid pattern"""
+        flags = re.MULTILINE | (re.IGNORECASE if ignore_case else 0)
+        re.compile(pattern, flags)
+
+        job = GrepJob(root, pattern, flags, max_results)
+        thread = threading.Thread(target=self._run, args=(job, on_hits, on_done),
+                                  name='notas-grep', daemon=True)
+        thread.start()
+        return job
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        with self._lock:
+            if self._executor:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def _get_executor(self):
+        """The process pool, created on first use"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'))
+            return self._executor
+
+    def _batches(self, root):
+        """Group the notes under root into batches of paths"""
+        batch = []
+        size = 0
+        for path, st in iter_note_files(root):
+            batch.append(path)
+            size += st.st_size
+            if len(batch) >= self.BATCH_FILES or size >= self.BATCH_BYTES:
+                yield batch
+                batch = []
+                size = 0
+        if batch:
+            yield batch
+
+    def _run(self, job, on_hits, on_done):
+        """Coordinator thread: submit batches and collect their hits"""
+        try:
+            executor = self._get_executor()
+            batches = self._batches(job.root)
+            pending = set()
+            exhausted = False
+            while not job.cancelled:
+                while not exhausted and len(pending) < 2 * self.workers:
+                    batch = next(batches, None)
+                    if batch is None:
+                        exhausted = True
+                        break
+                    pending.add(executor.submit(grep_files, batch, job.pattern, job.flags,
+                                                job.max_results - job.count))
+                if not pending:
+                    break
+
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if job.cancelled:
+                        break
+                    hits = future.result()[:job.max_results - job.count]
+                    if not hits:
+                        continue
+                    job.count += len(hits)
+                    on_hits(job, hits)
+                    if job.count >= job.max_results:
+                        job.truncated = True
+                        job.cancel()
+
+            for future in pending:
+                future.cancel()
+        except BrokenProcessPool as e:
+            # A worker died: start a fresh pool next time
+            print(f"Error searching notes: {e}")
+            self.shutdown()
+        except Exception as e:
+            print(f"Error searching notes: {e}")
+        finally:
+            on_done(job)
\ No newline at end of file
@@ -0,0 +1,275 @@
+"""
+Note Index - Core component for full-text search over the notes directory
+"""
+import os
+import queue
+import sqlite3
+import threading
+import gi
+
+gi.require_version('Gtk', '4.0')
+from gi.repository import GObject, Gio, GLib
+
+from core.notes_tree import is_note, iter_note_files, read_note, extract_title
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(
+    title, body, tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+# Markers around matched terms in snippets (escaped later for Pango)
+SNIPPET_START = '\x02'
+SNIPPET_END = '\x03'
+
+def build_fts_query(text):
+    """Turn user input into an FTS5 query: all terms, the last one as a prefix"""
+    terms = [term.replace('"', '""') for term in text.split()]
+    if not terms:
+        return None
+    parts = [f'"{term}"' for term in terms]
+    parts[-1] += '*'
+    return ' '.join(parts)
+
+class NoteIndex(GObject.Object):
+    """SQLite FTS5 index of every note under the notes directory
+
+    A worker thread owns the writing connection. The first sync indexes every
+    note; later syncs only re-read files whose mtime or size changed. A
+    Gio.FileMonitor per directory queues single-file updates as notes are
+    written, so the index stays current without rescanning. The tree is
+    walked by the worker's syncs; the main loop only creates the monitors
+    for the directories they found, a batch per idle iteration. Searches run on
+    the caller's thread through a separate read connection.
+    """
+
+    __gsignals__ = {
+        'index_progress': (GObject.SignalFlags.RUN_FIRST, None, (int,)),
+        'index_ready': (GObject.SignalFlags.RUN_FIRST, None, ())
+    }
+
+    # Only the head of very big notes is indexed
+    MAX_INDEXED_BYTES = 2 * 1024 * 1024
+    COMMIT_EVERY = 500
+    # Directory monitors created per main loop iteration
+    WATCH_BATCH = 200
+
+    def __init__(self, notes_dir, db_path):
+        super().__init__()
+        self.notes_dir = notes_dir
+        self.db_path = db_path
+        self.ready = False
+
+        self._queue = queue.Queue()
+        self._thread = None
+        self._monitors = {}
+        self._read_db = None
+
+    def start(self):
+        """Start the worker: sync the whole tree, then watch for changes"""
+        if self._thread:
+            return
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name='notas-index', daemon=True)
+        self._thread.start()
+        self._queue.put(('sync', self.notes_dir))
+
+    def stop(self):
+        """Stop the worker thread and the monitors"""
+        for monitor in self._monitors.values():
+            monitor.cancel()
+        self._monitors.clear()
+        if self._thread:
+            self._queue.put(('stop', None))
+            self._thread.join()
+            self._thread = None
+        if self._read_db:
+            self._read_db.close()
+            self._read_db = None
+
+    def update_file(self, path):
+        """Queue a re-index of a note (e.g. right after saving it)"""
+        if is_note(path):
+            self._queue.put(('update', path))
+
+    def search(self, text, limit=50):
+        """Ranked (path, title, snippet) results; terms in the snippet are
+        wrapped in SNIPPET_START/SNIPPET_END"""
+        fts_query = build_fts_query(text)
+        if not fts_query or not os.path.exists(self.db_path):
+            return []
+
+        if self._read_db is None:
+            self._read_db = sqlite3.connect(self.db_path)
+        try:
+            rows = self._read_db.execute(
+                f"""SELECT files.path, notes_fts.title,
+                           snippet(notes_fts, 1, '{SNIPPET_START}', '{SNIPPET_END}', '…', 12)
+                    FROM notes_fts JOIN files ON files.id = notes_fts.rowid
+                    WHERE notes_fts MATCH ?
+                    ORDER BY bm25(notes_fts, 5.0, 1.0)
+                    LIMIT ?""",
+                (fts_query, limit)
+            ).fetchall()
+        except sqlite3.Error as e:
+            print(f"Error searching notes: {e}")
+            return []
+        return rows
+
+    # Worker thread
+
+    def _connect(self):
+        """Open the writing connection"""
+        db = sqlite3.connect(self.db_path)
+        db.execute('PRAGMA journal_mode=WAL')
+        db.execute('PRAGMA synchronous=NORMAL')
+        db.executescript(_SCHEMA)
+        return db
+
+    def _run(self):
+        """Worker thread main loop"""
+        db = self._connect()
+        try:
+            while True:
+                task, path = self._queue.get()
+                if task == 'stop':
+                    break
+                try:
+                    if task == 'sync':
+                        self._sync(db, path)
+                    elif task == 'update':
+                        self._update(db, path)
+                    db.commit()
+                except (sqlite3.Error, OSError) as e:
+                    print(f"Error indexing {path}: {e}")
+                    db.rollback()
+        finally:
+            db.close()
+
+    def _sync(self, db, root):
+        """Reconcile the index with the files under root and have its
+        directories monitored"""
+        known = {
+            path: (file_id, mtime_ns, size)
+            for file_id, path, mtime_ns, size in db.execute(
+                'SELECT id, path, mtime_ns, size FROM files WHERE path = ? OR substr(path, 1, ?) = ?',
+                (root, len(root) + 1, os.path.join(root, '')))
+        }
+
+        changed = 0
+        directories = []
+        for path, st in iter_note_files(root, directories):
+            entry = known.pop(path, None)
+            if entry and entry[1] == st.st_mtime_ns and entry[2] == st.st_size:
+                continue
+            self._index_file(db, path, st, entry[0] if entry else None)
+            changed += 1
+            if changed % self.COMMIT_EVERY == 0:
+                db.commit()
+                GLib.idle_add(self.emit, 'index_progress', changed)
+
+        # Whatever was not seen on disk is gone
+        for file_id, _, _ in known.values():
+            self._delete(db, file_id)
+
+        if directories:
+            GLib.idle_add(self._watch_directories, directories, priority=GLib.PRIORITY_LOW)
+
+        if root == self.notes_dir:
+            GLib.idle_add(self._mark_ready)
+
+    def _mark_ready(self):
+        """Flag the first sync as done (main loop)"""
+        self.ready = True
+        self.emit('index_ready')
+        return GLib.SOURCE_REMOVE
+
+    def _update(self, db, path):
+        """Re-index or drop a single file"""
+        row = db.execute('SELECT id, mtime_ns, size FROM files WHERE path = ?', (path,)).fetchone()
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            if row:
+                self._delete(db, row[0])
+            return
+        if row and row[1] == st.st_mtime_ns and row[2] == st.st_size:
+            return
+        self._index_file(db, path, st, row[0] if row else None)
+
+    def _index_file(self, db, path, st, file_id):
+        """Store a file's content in the index"""
+        try:
+            body = read_note(path, self.MAX_INDEXED_BYTES)
+        except OSError:
+            return
+        title = extract_title(body, path)
+
+        if file_id is None:
+            file_id = db.execute('INSERT INTO files (path, mtime_ns, size) VALUES (?, ?, ?)',
+                                 (path, st.st_mtime_ns, st.st_size)).lastrowid
+        else:
+            db.execute('UPDATE files SET mtime_ns = ?, size = ? WHERE id = ?',
+                       (st.st_mtime_ns, st.st_size, file_id))
+            db.execute('DELETE FROM notes_fts WHERE rowid = ?', (file_id,))
+        db.execute('INSERT INTO notes_fts (rowid, title, body) VALUES (?, ?, ?)', (file_id, title, body))
+
+    def _delete(self, db, file_id):
+        """Remove a file from the index"""
+        db.execute('DELETE FROM notes_fts WHERE rowid = ?', (file_id,))
+        db.execute('DELETE FROM files WHERE id = ?', (file_id,))
+
+    # File monitoring (main loop)
+
+    def _watch_directories(self, directories):
+        """Monitor directories found by a sync, a batch at a time"""
+        if self._thread is None:
+            # Stopped meanwhile
+            return GLib.SOURCE_REMOVE
+        for directory in directories[:self.WATCH_BATCH]:
+            self._watch_directory(directory)
+        del directories[:self.WATCH_BATCH]
+        return GLib.SOURCE_CONTINUE if directories else GLib.SOURCE_REMOVE
+
+    def _watch_directory(self, directory):
+        """Monitor a single directory"""
+        if directory in self._monitors:
+            return
+        try:
+            monitor = Gio.File.new_for_path(directory).monitor_directory(
+                Gio.FileMonitorFlags.WATCH_MOVES, None)
+        except GLib.Error as e:
+            print(f"Error monitoring {directory}: {e}")
+            return
+        monitor.connect('changed', self._on_directory_changed)
+        self._monitors[directory] = monitor
+
+    def _on_directory_changed(self, monitor, file, other_file, event_type):
+        """Queue index updates for files touched in a watched directory"""
+        paths = [file.get_path()]
+        if other_file is not None and event_type in (Gio.FileMonitorEvent.RENAMED,
+                                                     Gio.FileMonitorEvent.MOVED_IN,
+                                                     Gio.FileMonitorEvent.MOVED_OUT):
+            paths.append(other_file.get_path())
+
+        for path in paths:
+            if not path or os.path.basename(path).startswith('.'):
+                continue
+            if os.path.isdir(path):
+                if event_type in (Gio.FileMonitorEvent.CREATED, Gio.FileMonitorEvent.MOVED_IN,
+                                  Gio.FileMonitorEvent.RENAMED):
+                    # The sync walks it and has its directories monitored
+                    self._queue.put(('sync', path))
+            elif path in self._monitors:
+                # A watched directory went away
+                self._monitors.pop(path).cancel()
+                self._queue.put(('sync', path))
+            elif is_note(path) and event_type != Gio.FileMonitorEvent.CHANGED:
+                # CHANGED fires per write; CHANGES_DONE_HINT follows once done
+                self._queue.put(('update', path))
\ No newline at end of file
@@ -0,0 +1,261 @@
+"""
+Notes Catalog - Core component caching metadata of every note
+"""
+import os
+import heapq
+import threading
+import zlib
+from collections import namedtuple
+
+from core.notes_tree import NOTE_EXTENSIONS, read_note, extract_title, extract_tags
+from core.storage import write_atomic
+
+NoteEntry = namedtuple('NoteEntry', 'path size mtime_ns title tags')
+
+_MAGIC = b'NCAT2\n'
+
+# Only the head of a note is read for its title and tags
+HEAD_BYTES = 4096
+
+def _clean(text):
+    """Make a name or title safe for the tab-separated cache"""
+    return text.replace('\t', ' ').replace('\n', ' ')
+
+class NotesCatalog:
+    """Path, size, mtime, title and tags of every note, cached on disk
+
+    Notes are grouped by directory, each with the directory's mtime. A
+    rescan lists a directory again only when its mtime changed (a file was
+    added, removed or renamed); otherwise its known notes are just stat'ed,
+    and only notes whose size or mtime changed have their head re-read. The
+    cache is a zlib-compressed, column-per-line listing written atomically, so
+    loading it is enough to show 100k notes before any rescan.
+
+    rescan() may run on a worker thread: it builds a new directory map and
+    swaps it in, re-applying notes updated through update_file() meanwhile.
+    refresh_async() does the whole startup sequence off the main loop.
+    """
+
+    def __init__(self, notes_dir, cache_path):
+        self.notes_dir = notes_dir
+        self.cache_path = cache_path
+        self.dirty = False
+        # Relative directory -> (mtime_ns, {name: NoteEntry})
+        self._dirs = {}
+        self._lock = threading.Lock()
+        self._touched = None
+
+    def __len__(self):
+        return sum(len(notes) for mtime_ns, notes in self._dirs.values())
+
+    def entries(self):
+        """Every cached note"""
+        for mtime_ns, notes in list(self._dirs.values()):
+            yield from list(notes.values())
+
+    def get(self, path):
+        """Entry of a note, or None"""
+        directory = self._dirs.get(self._relative(os.path.dirname(path)))
+        return directory[1].get(os.path.basename(path)) if directory else None
+
+    def recent(self, limit=20):
+        """Most recently modified notes"""
+        return heapq.nlargest(limit, self.entries(), key=lambda entry: entry.mtime_ns)
+
+    def with_tag(self, tag):
+        """Notes carrying a tag"""
+        return [entry for entry in self.entries() if tag in entry.tags]
+
+    def _relative(self, directory):
+        """Directory relative to the notes directory ('' for the root)"""
+        relative = os.path.relpath(directory, self.notes_dir)
+        return '' if relative == '.' else relative
+
+    def _absolute(self, relative):
+        """Absolute path of a relative directory"""
+        return os.path.join(self.notes_dir, relative) if relative else self.notes_dir
+
+    # Cache file
+
+    def load(self):
+        """Read the cache; returns False if missing or unreadable"""
+        try:
+            with open(self.cache_path, 'rb') as f:
+                data = f.read()
+            if not data.startswith(_MAGIC):
+                return False
+            text = zlib.decompress(data[len(_MAGIC):]).decode('utf-8')
+        except (OSError, zlib.error, UnicodeDecodeError):
+            return False
+
+        dirs = {}
+        lines = text.split('\n')
+        try:
+            for i in range(0, len(lines) - 5, 6):
+                kind, relative, dir_mtime = lines[i].split('\t')
+                names, sizes, mtimes, titles, tags = (line.split('\t') if line else []
+                                                      for line in lines[i + 1:i + 6])
+                if kind != 'D' or not len(names) == len(sizes) == len(mtimes) == len(titles) == len(tags):
+                    return False
+                prefix = os.path.join(self._absolute(relative), '')
+                dirs[relative] = (int(dir_mtime), {
+                    name: NoteEntry(prefix + name, size, mtime_ns, title, tuple(tag_list.split()))
+                    for name, size, mtime_ns, title, tag_list
+                    in zip(names, map(int, sizes), map(int, mtimes), titles, tags)
+                })
+        except ValueError:
+            return False
+        self._dirs = dirs
+        self.dirty = False
+        return True
+
+    def save(self):
+        """Write the cache atomically"""
+        # Per directory: a header line, then one tab-separated line per field
+        lines = []
+        for relative, (mtime_ns, notes) in list(self._dirs.items()):
+            entries = [entry for name, entry in list(notes.items()) if _clean(name) == name]
+            lines.append(f'D\t{relative}\t{mtime_ns}')
+            lines.append('\t'.join(os.path.basename(entry.path) for entry in entries))
+            lines.append('\t'.join(str(entry.size) for entry in entries))
+            lines.append('\t'.join(str(entry.mtime_ns) for entry in entries))
+            lines.append('\t'.join(_clean(entry.title) for entry in entries))
+            lines.append('\t'.join(' '.join(entry.tags) for entry in entries))
+        data = _MAGIC + zlib.compress('\n'.join(lines).encode('utf-8'), 6)
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        write_atomic(self.cache_path, data)
+        self.dirty = False
+
+    # Scanning
+
+    def _read_entry(self, path, st):
+        """Build the entry of a note from its head"""
+        try:
+            head = read_note(path, HEAD_BYTES)
+        except OSError:
+            return None
+        return NoteEntry(path, st.st_size, st.st_mtime_ns, extract_title(head, path), tuple(extract_tags(head)))
+
+    def rescan(self):
+        """Bring the catalog up to date with the disk; returns True if any
+        note was added, removed or modified"""
+        with self._lock:
+            old = self._dirs
+            self._touched = set()
+
+        children = {}
+        for relative in old:
+            if relative:
+                children.setdefault(os.path.dirname(relative), []).append(relative)
+
+        dirs = {}
+        changed = False
+        relisted = False
+        stack = ['']
+        while stack:
+            relative = stack.pop()
+            directory = self._absolute(relative)
+            try:
+                dir_mtime = os.stat(directory).st_mtime_ns
+            except OSError:
+                changed = True
+                continue
+            known_mtime, known = old.get(relative, (None, {}))
+            notes = {}
+
+            if dir_mtime == known_mtime:
+                # Same entries as last time: only check the known notes
+                for name, entry in known.items():
+                    try:
+                        st = os.stat(entry.path)
+                    except OSError:
+                        changed = True
+                        continue
+                    if st.st_size != entry.size or st.st_mtime_ns != entry.mtime_ns:
+                        entry = self._read_entry(entry.path, st)
+                        changed = True
+                    if entry:
+                        notes[name] = entry
+                stack.extend(children.get(relative, ()))
+            else:
+                relisted = True
+                try:
+                    scanned = list(os.scandir(directory))
+                except OSError:
+                    continue
+                for item in scanned:
+                    if item.name.startswith('.'):
+                        continue
+                    try:
+                        if item.is_dir(follow_symlinks=False):
+                            stack.append(os.path.join(relative, item.name) if relative else item.name)
+                            continue
+                        if not item.is_file() or not item.name.lower().endswith(NOTE_EXTENSIONS):
+                            continue
+                        st = item.stat()
+                    except OSError:
+                        continue
+                    entry = known.get(item.name)
+                    if entry is None or st.st_size != entry.size or st.st_mtime_ns != entry.mtime_ns:
+                        entry = self._read_entry(item.path, st)
+                    if entry:
+                        notes[item.name] = entry
+                changed = changed or notes != known
+            dirs[relative] = (dir_mtime, notes)
+
+        changed = changed or any(notes for relative, (mtime_ns, notes) in old.items() if relative not in dirs)
+        with self._lock:
+            touched = self._touched
+            self._touched = None
+            self._dirs = dirs
+        for path in touched:
+            self.update_file(path)
+        if changed or relisted or len(dirs) != len(old):
+            self.dirty = True
+        return changed or bool(touched)
+
+    def update_file(self, path):
+        """Refresh a single note (e.g. right after saving it)"""
+        if not path.startswith(os.path.join(self.notes_dir, '')):
+            return
+        name = os.path.basename(path)
+        if name.startswith('.') or not name.lower().endswith(NOTE_EXTENSIONS):
+            return
+
+        with self._lock:
+            if self._touched is not None:
+                self._touched.add(path)
+            relative = self._relative(os.path.dirname(path))
+            try:
+                st = os.stat(path)
+            except OSError:
+                entry = None
+            else:
+                entry = self._read_entry(path, st)
+
+            directory = self._dirs.get(relative)
+            if directory is None:
+                if entry is None:
+                    return
+                # Unknown directory: the next rescan will list it
+                directory = self._dirs[relative] = (0, {})
+            if entry is None:
+                directory[1].pop(name, None)
+            else:
+                directory[1][name] = entry
+            self.dirty = True
+
+    def refresh_async(self, on_changed):
+        """Load the cache, rescan and save on a worker thread; on_changed()
+        is called from it whenever the entries changed"""
+        def run():
+            try:
+                if not self._dirs and self.load():
+                    on_changed()
+                if self.rescan():
+                    on_changed()
+                if self.dirty:
+                    self.save()
+            except Exception as e:
+                print(f"Error scanning notes: {e}")
+        threading.Thread(target=run, name='notas-catalog', daemon=True).start()
\ No newline at end of file
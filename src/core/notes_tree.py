@@ -0,0 +1,95 @@
+"""
+Notes Tree - Core helpers for walking the notes directory
+"""
+import os
+import re
+import itertools
+
+_HEADING = re.compile(r'#{1,6}\s+(.+?)\s*#*$')
+_HASHTAG = re.compile(r'(?<![\w#&/])#(\w[\w/-]*)')
+_UNSAFE_FILENAME = re.compile(r'[<>:"/\\|?*\x00-\x1f]')
+_TAGS_LINE = re.compile(r'^tags:\s*\[?([^\]\n]*)\]?\s*$', re.MULTILINE | re.IGNORECASE)
+
+NOTE_EXTENSIONS = ('.md', '.markdown', '.txt')
+
+def is_note(path):
+    """Whether a path looks like a note (visible file with a note extension)"""
+    name = os.path.basename(path)
+    return not name.startswith('.') and name.lower().endswith(NOTE_EXTENSIONS)
+
+def note_filename(title, extension='.md'):
+    """Filesystem-safe file name for a note titled title"""
+    name = _UNSAFE_FILENAME.sub('_', title).strip()[:200]
+    # A leading dot would hide the note
+    name = re.sub(r'^\.+', lambda match: '_' * len(match.group(0)), name)
+    return (name or 'Nota') + extension
+
+def candidate_note_paths(notes_dir, title, extension='.md'):
+    """Paths a note titled title may take: "Title.md", "Title (2).md", ..."""
+    base = note_filename(title, '')
+    yield os.path.join(notes_dir, base + extension)
+    for number in itertools.count(2):
+        yield os.path.join(notes_dir, f'{base} ({number}){extension}')
+
+def available_note_path(notes_dir, title, taken=()):
+    """First path for a new note titled title that doesn't exist and isn't taken"""
+    for path in candidate_note_paths(notes_dir, title):
+        if path not in taken and not os.path.lexists(path):
+            return path
+
+def iter_note_files(root, directories=None):
+    """Yield (path, stat) for every note under root, skipping hidden entries;
+    the directories listed are appended to a directories list if given"""
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            continue
+        if directories is not None:
+            directories.append(directory)
+        for entry in entries:
+            if entry.name.startswith('.'):
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file() and entry.name.lower().endswith(NOTE_EXTENSIONS):
+                    yield entry.path, entry.stat()
+            except OSError:
+                continue
+
+def read_note(path, limit=None):
+    """Read a note as text, at most limit bytes, replacing invalid UTF-8"""
+    with open(path, 'rb') as f:
+        data = f.read() if limit is None else f.read(limit)
+    return data.decode('utf-8', errors='replace')
+
+def extract_title(text, path=None):
+    """Title of a note: its first heading near the top, else its first line,
+    else its file name"""
+    first_line = None
+    lines = [line.strip() for line in text[:4096].splitlines()]
+    for line in [line for line in lines if line][:20]:
+        heading = _HEADING.match(line)
+        if heading:
+            return heading.group(1)
+        if first_line is None:
+            first_line = line
+    if first_line:
+        return first_line[:120]
+    return os.path.splitext(os.path.basename(path))[0] if path else ''
+
+def extract_tags(text):
+    """Sorted tags of a note: #hashtags plus a front matter "tags:" line"""
+    tags = set()
+    for line in text.splitlines():
+        if not _HEADING.match(line.lstrip()):
+            tags.update(tag.lower() for tag in _HASHTAG.findall(line))
+    if text.startswith('---'):
+        end = text.find('\n---', 3)
+        match = _TAGS_LINE.search(text, 3, end if end > 0 else len(text))
+        if match:
+            tags.update(tag.strip(' \'"#').lower() for tag in match.group(1).split(',') if tag.strip(' \'"#'))
+    return sorted(tags)
\ No newline at end of file
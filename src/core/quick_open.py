@@ -0,0 +1,167 @@
+"""
+Quick Open - Core component for fuzzy matching note names and titles
+"""
+import os
+import threading
+import unicodedata
+from array import array
+from collections import Counter
+
+def normalize(text):
+    """Lowercase text without accents, punctuation collapsed to spaces"""
+    text = unicodedata.normalize('NFKD', text.casefold())
+    text = ''.join(c if c.isalnum() else ' ' for c in text if not unicodedata.combining(c))
+    return ' '.join(text.split())
+
+def trigrams(key):
+    """Trigrams of a normalized key, padded so word starts get their own"""
+    padded = f' {key} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def fuzzy_score(query, key):
+    """How well a normalized query matches a key: substrings beat scattered
+    subsequences, word starts and short keys score higher"""
+    pos = key.find(query)
+    if pos >= 0:
+        score = 100 + (30 if pos == 0 else 15 if key[pos - 1] == ' ' else 0)
+    else:
+        # Characters in order, possibly with gaps
+        score = 0
+        pos = 0
+        for char in query:
+            found = key.find(char, pos)
+            if found < 0:
+                return -len(key) * 0.01
+            score += 2 if found == pos else 1
+            pos = found + 1
+    return score - len(key) * 0.01
+
+class TrigramIndex:
+    """In-memory trigram index over note file names and titles
+
+    Each note gets an integer id; postings map a trigram to an array of
+    ids. A query counts, per note, how many of its trigrams it shares with
+    the query, reading the rarest postings first and stopping once a fixed
+    number of ids was counted, so the cost is bounded even when every note
+    matches. The best counted notes are then reranked with fuzzy_score().
+
+    Removed notes are only flagged dead; postings are rebuilt once dead ids
+    outnumber live ones. All methods may be called from any thread.
+    """
+
+    # Posting entries counted per query at most
+    COUNT_BUDGET = 30000
+    # Candidates reranked with the fuzzy scorer
+    RERANK = 200
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clear()
+
+    def _clear(self):
+        """Drop every note"""
+        self._postings = {}
+        self._paths = []
+        self._titles = []
+        self._keys = []
+        self._alive = bytearray()
+        self._ids = {}
+        self._dead = 0
+
+    def __len__(self):
+        return len(self._ids)
+
+    def _add(self, path, title):
+        """Index a note (lock held)"""
+        note_id = len(self._paths)
+        key = normalize(f'{os.path.splitext(os.path.basename(path))[0]} {title}')
+        self._paths.append(path)
+        self._titles.append(title)
+        self._keys.append(key)
+        self._alive.append(1)
+        self._ids[path] = note_id
+        for trigram in trigrams(key):
+            posting = self._postings.get(trigram)
+            if posting is None:
+                posting = self._postings[trigram] = array('i')
+            posting.append(note_id)
+
+    def _remove(self, path):
+        """Flag a note as removed (lock held)"""
+        note_id = self._ids.pop(path, None)
+        if note_id is not None:
+            self._alive[note_id] = 0
+            self._dead += 1
+
+    def _compact(self):
+        """Rebuild the postings without dead notes (lock held)"""
+        notes = [(path, self._titles[note_id]) for path, note_id in self._ids.items()]
+        self._clear()
+        for path, title in notes:
+            self._add(path, title)
+
+    def update(self, path, title):
+        """Add or re-index a note"""
+        with self._lock:
+            note_id = self._ids.get(path)
+            if note_id is not None and self._titles[note_id] == title:
+                return
+            self._remove(path)
+            self._add(path, title)
+            if self._dead > 1024 and self._dead > len(self._ids):
+                self._compact()
+
+    def remove(self, path):
+        """Forget a note"""
+        with self._lock:
+            self._remove(path)
+
+    def sync(self, notes):
+        """Make the index hold exactly the given (path, title) pairs"""
+        notes = dict(notes)
+        with self._lock:
+            for path in [path for path in self._ids if path not in notes]:
+                self._remove(path)
+        # Add in slices so queries are not blocked for long
+        pending = [(path, title) for path, title in notes.items()
+                   if path not in self._ids or self._titles[self._ids[path]] != title]
+        for start in range(0, len(pending), 2000):
+            with self._lock:
+                for path, title in pending[start:start + 2000]:
+                    self._remove(path)
+                    self._add(path, title)
+        with self._lock:
+            if self._dead > 1024 and self._dead > len(self._ids):
+                self._compact()
+
+    def search(self, text, limit=50):
+        """Best (path, title) matches for a query"""
+        query = normalize(text)
+        if len(query) < 2:
+            return []
+        # The last word may still be incomplete: do not require it to end
+        grams = trigrams(query)
+        grams.discard(f'{query[-2:]} ')
+
+        with self._lock:
+            postings = sorted((self._postings[gram] for gram in grams if gram in self._postings), key=len)
+            counts = Counter()
+            budget = self.COUNT_BUDGET
+            for posting in postings:
+                if budget <= 0 or len(postings) == 1:
+                    break
+                counts.update(posting[:budget])
+                budget -= len(posting)
+
+            alive = self._alive
+            if len(postings) == 1:
+                # Every counted note shares the single trigram
+                best = ((note_id, 1) for note_id in postings[0][:self.RERANK * 4])
+            else:
+                best = counts.most_common(self.RERANK * 4)
+            candidates = [(count, note_id) for note_id, count in best if alive[note_id]][:self.RERANK]
+            ranked = sorted(
+                ((count * 10 + fuzzy_score(query, self._keys[note_id]), note_id) for count, note_id in candidates),
+                reverse=True
+            )
+            return [(self._paths[note_id], self._titles[note_id]) for score, note_id in ranked[:limit]]
\ No newline at end of file
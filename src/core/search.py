@@ -0,0 +1,161 @@
+"""
+Search - Core component for incremental in-document search
+"""
+import re
+import time
+import bisect
+from array import array
+
+MODE_PLAIN = 'plain'
+MODE_IGNORE_CASE = 'ignore-case'
+MODE_REGEX = 'regex'
+SEARCH_MODES = (MODE_PLAIN, MODE_IGNORE_CASE, MODE_REGEX)
+
+class IncrementalMatcher:
+    """Finds all matches of a query in a text in small time slices
+
+    start() prepares a search and step() advances it for a bounded amount of
+    time, so a caller on the main loop can spread a search over idle
+    iterations. Match starts are kept sorted in compact arrays, making
+    next/previous navigation a binary search.
+
+    Plain and case-insensitive searches record overlapping matches. When a
+    query extends the previous one on the same text, every new match must
+    start where an old one did, so only those positions are re-checked.
+    """
+
+    # Chars scanned per search window before checking the clock
+    WINDOW = 256 * 1024
+
+    def __init__(self):
+        self.query = ''
+        self.mode = MODE_PLAIN
+        self.starts = array('q')
+        self.ends = array('q')
+        self.done = True
+        self._revision = None
+        self._job = None
+
+    def start(self, text, query, mode=MODE_PLAIN, revision=None):
+        """Prepare a search; raises re.error for an invalid regex"""
+        if mode == MODE_REGEX:
+            pattern = re.compile(query, re.MULTILINE)
+        elif mode == MODE_IGNORE_CASE:
+            pattern = re.compile(re.escape(query), re.IGNORECASE)
+        else:
+            pattern = None
+
+        reusable = (
+            self.done and mode == self.mode and mode != MODE_REGEX
+            and revision is not None and revision == self._revision
+            and self.query and query.startswith(self.query)
+        )
+        candidates = self.starts if reusable else None
+
+        self.query = query
+        self.mode = mode
+        self._revision = revision
+        self.starts = array('q')
+        self.ends = array('q')
+        self.done = not query
+
+        if not query:
+            self._job = None
+        elif candidates is not None:
+            self._job = self._filter(text, query, pattern, candidates)
+        elif mode == MODE_REGEX:
+            self._job = self._scan_regex(text, pattern)
+        else:
+            self._job = self._scan_fixed(text, query, pattern)
+
+    def step(self, budget_ms=5):
+        """Advance the search for about budget_ms; returns True when finished"""
+        if self.done:
+            return True
+        deadline = time.monotonic() + budget_ms / 1000.0
+        for _ in self._job:
+            if time.monotonic() >= deadline:
+                return False
+        self.done = True
+        self._job = None
+        return True
+
+    def run(self):
+        """Finish the search without time slicing"""
+        while not self.step(1000):
+            pass
+
+    def __len__(self):
+        return len(self.starts)
+
+    def _add(self, start, end):
+        """Record a match"""
+        self.starts.append(start)
+        self.ends.append(end)
+
+    def _scan_fixed(self, text, query, pattern):
+        """Plain or case-insensitive scan, window by window"""
+        length = len(query)
+        pos = 0
+        n = len(text)
+        while True:
+            # Windows overlap by length - 1 so no match is cut in two
+            window_end = min(n, pos + self.WINDOW + length - 1)
+            while True:
+                if pattern is None:
+                    found = text.find(query, pos, window_end)
+                else:
+                    match = pattern.search(text, pos, window_end)
+                    found = match.start() if match else -1
+                if found < 0:
+                    break
+                self._add(found, found + length)
+                pos = found + 1
+            if window_end >= n:
+                return
+            pos = max(pos, window_end - length + 1)
+            yield
+
+    def _scan_regex(self, text, pattern):
+        """Regex scan over windows ending at line boundaries"""
+        pos = 0
+        n = len(text)
+        while pos < n:
+            window_end = text.find('\n', min(n, pos + self.WINDOW))
+            window_end = n if window_end < 0 else window_end + 1
+            for match in pattern.finditer(text, pos, window_end):
+                if match.end() > match.start():
+                    self._add(match.start(), match.end())
+            pos = window_end
+            yield
+
+    def _filter(self, text, query, pattern, candidates):
+        """Keep the previous matches that still match the extended query"""
+        length = len(query)
+        for i, start in enumerate(candidates):
+            if pattern is None:
+                matched = text.startswith(query, start)
+            else:
+                matched = pattern.match(text, start) is not None
+            if matched:
+                self._add(start, start + length)
+            if i % 4096 == 0:
+                yield
+
+    def next_match(self, offset):
+        """Index of the first match starting after offset, wrapping around"""
+        if not self.starts:
+            return -1
+        index = bisect.bisect_right(self.starts, offset)
+        return index if index < len(self.starts) else 0
+
+    def previous_match(self, offset):
+        """Index of the last match starting before offset, wrapping around"""
+        if not self.starts:
+            return -1
+        index = bisect.bisect_left(self.starts, offset) - 1
+        return index if index >= 0 else len(self.starts) - 1
+
+    def get_match(self, index):
+        """(start, end) offsets of a match"""
+        return self.starts[index], self.ends[index]
\ No newline at end of file
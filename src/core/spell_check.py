@@ -0,0 +1,123 @@
+"""
+Spell Check - Core component checking words against a local dictionary file
+"""
+import os
+import re
+from collections import OrderedDict
+
+# Letters, with inner apostrophes ("don't", "l'eau")
+_WORD = re.compile(r"[^\W\d_]+(?:['’][^\W\d_]+)*")
+# Text that is not prose: code spans, URLs, link targets, autolinks/HTML, e-mails
+_SKIP = re.compile(r"(`+).+?(?<!`)\1(?!`)|\b[a-z][a-z0-9+.-]*://\S+|\]\([^)\n]*\)|<[^>\n]*>|\S+@\S+\.\w+",
+                   re.IGNORECASE)
+
+def dictionary_candidates(language=None):
+    """Dictionary files to try, for a language code such as 'es_AR'
+
+    Plain word lists (one inflected form per line) come first; hunspell
+    .dic files only hold stems, so they are a fallback.
+    """
+    language = language or (os.environ.get('LANG') or 'es_ES').split('.')[0]
+    base = language.split('_')[0]
+    names = {'es': 'spanish', 'en': 'american-english', 'pt': 'portuguese', 'fr': 'french',
+             'it': 'italian', 'de': 'ngerman'}
+    candidates = []
+    if base in names:
+        candidates.append(f'/usr/share/dict/{names[base]}')
+    candidates.append('/usr/share/dict/words')
+    for folder in ('/usr/share/hunspell', '/usr/share/myspell', '/usr/share/myspell/dicts'):
+        candidates.append(os.path.join(folder, f'{language}.dic'))
+    return candidates
+
+def find_dictionary(language=None):
+    """First existing dictionary file for a language, or None"""
+    for path in dictionary_candidates(language):
+        if os.path.isfile(path):
+            return path
+    return None
+
+def load_words(path):
+    """Words of a word list or hunspell .dic file"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    try:
+        text = data.decode('utf-8')
+    except UnicodeDecodeError:
+        # Older word lists are ISO-8859-1
+        text = data.decode('latin-1')
+    lines = text.split('\n')
+    if path.endswith('.dic') and lines and lines[0].strip().isdigit():
+        # hunspell: word count, then "word/FLAGS"
+        lines = [line.split('/', 1)[0] for line in lines[1:]]
+    return {word for word in (line.strip() for line in lines) if word and not word.startswith('#')}
+
+class SpellChecker:
+    """Spelling verdicts for words, from a local dictionary and a personal
+    word list
+
+    Verdicts are kept in a bounded LRU cache: prose reuses a small
+    vocabulary, so checking an edited line usually costs a few dictionary
+    lookups at most, and memory stays flat however large the notes are.
+    """
+
+    CACHE_WORDS = 8192
+
+    def __init__(self, words=(), personal_path=None):
+        self.words = set(words)
+        self.personal_path = personal_path
+        self._cache = OrderedDict()
+        if personal_path and os.path.isfile(personal_path):
+            self.words |= load_words(personal_path)
+
+    @classmethod
+    def load(cls, dictionary_path, personal_path=None):
+        """Checker for a dictionary file (None for no dictionary)"""
+        words = load_words(dictionary_path) if dictionary_path else ()
+        return cls(words, personal_path)
+
+    def _known(self, word):
+        """Whether the dictionary has a word, ignoring sentence capitalization"""
+        words = self.words
+        if word in words:
+            return True
+        lower = word.lower()
+        if lower in words:
+            return True
+        # "Perro" at the start of a sentence, "Dont" for "don't" lists
+        return word[:1].isupper() and word[:1].lower() + word[1:] in words
+
+    def check(self, word):
+        """Whether a word is spelled correctly"""
+        verdict = self._cache.get(word)
+        if verdict is not None:
+            self._cache.move_to_end(word)
+            return verdict
+        verdict = self._known(word.replace('’', "'"))
+        self._cache[word] = verdict
+        if len(self._cache) > self.CACHE_WORDS:
+            self._cache.popitem(last=False)
+        return verdict
+
+    def misspelled(self, line):
+        """(start, end) columns of the misspelled words of a line"""
+        if not self.words:
+            return []
+        masked = _SKIP.sub(lambda match: ' ' * (match.end() - match.start()), line)
+        spans = []
+        for match in _WORD.finditer(masked):
+            word = match.group()
+            # Single letters and acronyms are left alone
+            if len(word) < 2 or word.isupper():
+                continue
+            if not self.check(word):
+                spans.append((match.start(), match.end()))
+        return spans
+
+    def add_word(self, word):
+        """Accept a word from now on, saving it to the personal word list"""
+        self.words.add(word)
+        self._cache.pop(word, None)
+        if self.personal_path:
+            os.makedirs(os.path.dirname(self.personal_path), exist_ok=True)
+            with open(self.personal_path, 'a', encoding='utf-8') as f:
+                f.write(word + '\n')
\ No newline at end of file
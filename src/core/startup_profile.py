@@ -0,0 +1,35 @@
+"""
+Startup Profile - Core component timing the phases of application startup
+"""
+import time
+
+class StartupProfile:
+    """Records named startup phases and the time each one took
+
+    Each mark closes the phase running since the previous mark (or since
+    the origin, usually taken before the first import) and records its
+    duration, so the report reads as a breakdown of time-to-first-frame.
+    """
+
+    def __init__(self, origin=None):
+        self.origin = time.perf_counter() if origin is None else origin
+        self._last = self.origin
+        self.phases = []
+
+    def mark(self, name):
+        """Close the current phase under a name"""
+        now = time.perf_counter()
+        self.phases.append((name, (now - self._last) * 1000, (now - self.origin) * 1000))
+        self._last = now
+
+    def total_ms(self):
+        """Milliseconds from the origin to the last mark"""
+        return self.phases[-1][2] if self.phases else 0.0
+
+    def report(self):
+        """Per-phase timings as a printable table"""
+        width = max([len(name) for name, elapsed, total in self.phases] + [5])
+        lines = [f"{'Fase':<{width}}  {'ms':>8}  {'total':>8}"]
+        for name, elapsed, total in self.phases:
+            lines.append(f"{name:<{width}}  {elapsed:8.1f}  {total:8.1f}")
+        return '\n'.join(lines)
\ No newline at end of file
@@ -0,0 +1,197 @@
+"""
+Storage - Core helpers for crash-safe file writes
+"""
+import os
+import zlib
+import struct
+import hashlib
+import tempfile
+import threading
+
+# Durability policies: how much is fsynced before a write is reported done
+DURABILITY_NONE = 'none'
+DURABILITY_FILE = 'file'
+DURABILITY_FULL = 'full'
+DURABILITY_POLICIES = (DURABILITY_NONE, DURABILITY_FILE, DURABILITY_FULL)
+
+# Frame header for append-only logs: payload length and CRC32
+_FRAME_HEADER = struct.Struct('<II')
+
+def content_digest(data):
+    """Get a short hash identifying some content (str or bytes)"""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+def encode_frame(payload):
+    """Frame a payload for an append-only log"""
+    return _FRAME_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+def iter_frames(data):
+    """Yield the payloads of the frames in data
+
+    Stops at the first truncated or corrupted frame, which is what a crash in
+    the middle of an append leaves behind.
+    """
+    for payload, end in scan_frames(data):
+        yield payload
+
+def scan_frames(data):
+    """Yield (payload, end offset) for the intact frames at the start of data"""
+    pos = 0
+    header_size = _FRAME_HEADER.size
+    while pos + header_size <= len(data):
+        length, crc = _FRAME_HEADER.unpack_from(data, pos)
+        start = pos + header_size
+        payload = data[start:start + length]
+        if len(payload) < length or zlib.crc32(payload) != crc:
+            return
+        pos = start + length
+        yield payload, pos
+
+def fsync_dir(dirname):
+    """Flush a directory entry (e.g. after a rename) to disk"""
+    try:
+        fd = os.open(dirname, os.O_RDONLY)
+    except OSError:
+        # Not supported on every platform (e.g. Windows)
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def write_atomic(path, data, durability=DURABILITY_FILE):
+    """Write data (str or bytes) to path atomically
+
+    The content goes to a temporary file in the same directory which is then
+    renamed over the target, so readers (and a crash) see either the old or
+    the new file, never a truncated one. The durability policy decides what
+    is fsynced: nothing, the file before the rename, or the file and its
+    directory after the rename.
+    """
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+
+    dirname = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix='.' + os.path.basename(path) + '.', suffix='.tmp', dir=dirname)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            if durability != DURABILITY_NONE:
+                f.flush()
+                os.fsync(f.fileno())
+
+        # Keep the permissions of the file being replaced
+        try:
+            os.chmod(tmp_path, os.stat(path).st_mode & 0o7777)
+        except FileNotFoundError:
+            os.chmod(tmp_path, 0o644)
+
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+    if durability == DURABILITY_FULL:
+        fsync_dir(dirname)
+
+def create_exclusive(path, data, durability=DURABILITY_FILE):
+    """Create path with data, atomically, failing if it already exists
+
+    The content is written to a temporary file that is then hard-linked to
+    the target, which fails with FileExistsError instead of replacing an
+    existing file. A crash leaves either no file or the complete one.
+    """
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+
+    dirname = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix='.' + os.path.basename(path) + '.', suffix='.tmp', dir=dirname)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            if durability != DURABILITY_NONE:
+                f.flush()
+                os.fsync(f.fileno())
+        os.chmod(tmp_path, 0o644)
+        try:
+            os.link(tmp_path, path)
+        except FileExistsError:
+            raise
+        except OSError:
+            # No hard links on this filesystem: reserve the name, then replace it
+            os.close(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644))
+            os.replace(tmp_path, path)
+    finally:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+
+    if durability == DURABILITY_FULL:
+        fsync_dir(dirname)
+
+class AtomicWriter:
+    """Background thread writing files atomically, coalescing repeated saves
+
+    Submitting a path that is already waiting to be written replaces its
+    pending content, so a burst of saves of the same file costs one write.
+    on_done(path, error) is called from the writer thread after each write;
+    error is None on success.
+    """
+
+    def __init__(self, on_done, durability=DURABILITY_FILE):
+        self.on_done = on_done
+        self.durability = durability
+        self._pending = {}
+        self._cond = threading.Condition()
+        self._busy = False
+        self._thread = None
+        self._stopping = False
+
+    def submit(self, path, data):
+        """Queue data to be written to path"""
+        with self._cond:
+            self._pending[path] = data
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='notas-writer', daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def flush(self, timeout=None):
+        """Wait until every queued write has finished"""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending and not self._busy, timeout)
+
+    def stop(self, timeout=None):
+        """Finish queued writes and stop the writer thread"""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        """Writer thread main loop"""
+        while True:
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+                self._cond.wait_for(lambda: self._pending or self._stopping)
+                if not self._pending:
+                    return
+                path = next(iter(self._pending))
+                data = self._pending.pop(path)
+                durability = self.durability
+                self._busy = True
+
+            error = None
+            try:
+                write_atomic(path, data, durability)
+            except Exception as e:
+                error = e
+            self.on_done(path, error)
\ No newline at end of file
@@ -0,0 +1,260 @@
+"""
+Task Index - Core component collecting the checkbox tasks of every note
+"""
+import os
+import re
+import bisect
+import threading
+import zlib
+from array import array
+from collections import namedtuple
+
+from core.markdown_syntax import FenceMap
+from core.notes_tree import is_note
+from core.storage import write_atomic, DURABILITY_NONE, DURABILITY_FILE
+
+Task = namedtuple('Task', 'path line offset done text')
+
+# Tasks of a note: parallel arrays of line numbers (0-based), byte offsets
+# of the mark between the brackets, done flags and texts
+NoteTasks = namedtuple('NoteTasks', 'size mtime_ns lines offsets done texts')
+
+_MAGIC = b'NTSK1\n'
+_TASK_LINE = re.compile(rb'^[ \t]*(?:[-*+]|\d+[.)])[ \t]+\[([ xX])\][ \t]+([^\r\n]*\S)', re.MULTILINE)
+_FENCE_HINT = re.compile(rb'```|~~~')
+_TASK_MARK = re.compile(r'[ \t]*(?:[-*+]|\d+[.)])[ \t]+\[([ xX])\](?=[ \t])')
+
+# Task texts are cut at this many chars
+MAX_TEXT = 300
+
+# Shared by the (many) notes without tasks; never modified
+_NO_TASKS = (array('l'), array('q'), bytearray(), ())
+
+def _clean(text):
+    """Make a path or text safe for the tab-separated cache"""
+    return text.replace('\t', ' ').replace('\n', ' ')
+
+def find_task_mark(line):
+    """(column, done) of the checkbox mark of a task line, or None"""
+    match = _TASK_MARK.match(line)
+    return (match.start(1), match.group(1) != ' ') if match else None
+
+def parse_tasks(data):
+    """(lines, offsets, done, texts) of the `- [ ]` tasks in a note's bytes,
+    leaving out fenced code"""
+    lines = array('l')
+    offsets = array('q')
+    done = bytearray()
+    texts = []
+    fences = None
+    if _FENCE_HINT.search(data):
+        fences = FenceMap()
+        fences.reset(data.decode('utf-8', 'replace'))
+
+    line = 0
+    position = 0
+    for match in _TASK_LINE.finditer(data):
+        line += data.count(b'\n', position, match.start())
+        position = match.start()
+        if fences and fences.is_code(line):
+            continue
+        lines.append(line)
+        offsets.append(match.start(1))
+        done.append(match.group(1) != b' ')
+        texts.append(match.group(2).decode('utf-8', 'replace')[:MAX_TEXT])
+    return (lines, offsets, done, tuple(texts)) if texts else _NO_TASKS
+
+class TaskIndex:
+    """Checkbox tasks (`- [ ]` / `- [x]`) of every note, cached on disk
+
+    Notes are re-parsed only when their size or mtime differs from the
+    cached ones; sync() is fed the notes catalog, which already stats them.
+    Each note's tasks are stored as parallel arrays, along with the byte
+    offset of each task's mark, so toggle() rewrites that single byte in
+    place instead of the whole note.
+    """
+
+    def __init__(self, notes_dir, cache_path):
+        self.notes_dir = notes_dir
+        self.cache_path = cache_path
+        self.dirty = False
+        self._loaded = False
+        # Path -> NoteTasks
+        self._notes = {}
+        self._lock = threading.Lock()
+        self._touched = None
+
+    def tasks(self, pending_only=False):
+        """Every task, by note and line"""
+        result = []
+        for path, note in sorted(list(self._notes.items())):
+            for i, text in enumerate(note.texts):
+                if not (pending_only and note.done[i]):
+                    result.append(Task(path, note.lines[i], note.offsets[i], bool(note.done[i]), text))
+        return result
+
+    def counts(self):
+        """(pending, done) task counts"""
+        total = done = 0
+        for note in list(self._notes.values()):
+            total += len(note.texts)
+            done += sum(note.done)
+        return total - done, done
+
+    # Cache file
+
+    def load(self):
+        """Read the cache; returns False if missing or unreadable"""
+        self._loaded = True
+        try:
+            with open(self.cache_path, 'rb') as f:
+                data = f.read()
+            if not data.startswith(_MAGIC):
+                return False
+            lines = zlib.decompress(data[len(_MAGIC):]).decode('utf-8').split('\n')
+        except (OSError, zlib.error, UnicodeDecodeError):
+            return False
+
+        notes = {}
+        i = 0
+        try:
+            while i < len(lines) and lines[i]:
+                kind, relative, size, mtime_ns, count = lines[i].split('\t')
+                count = int(count)
+                rows = [line.split('\t', 3) for line in lines[i + 1:i + 1 + count]]
+                if kind != 'N' or len(rows) != count:
+                    return False
+                tasks = _NO_TASKS
+                if rows:
+                    tasks = (array('l', (int(row[0]) for row in rows)), array('q', (int(row[1]) for row in rows)),
+                             bytearray(int(row[2]) for row in rows), tuple(row[3] for row in rows))
+                notes[os.path.join(self.notes_dir, relative)] = NoteTasks(int(size), int(mtime_ns), *tasks)
+                i += 1 + count
+        except ValueError:
+            return False
+        with self._lock:
+            self._notes = notes
+        self.dirty = False
+        return True
+
+    def save(self):
+        """Write the cache atomically"""
+        lines = []
+        for path, note in list(self._notes.items()):
+            relative = os.path.relpath(path, self.notes_dir)
+            if _clean(relative) != relative:
+                continue
+            lines.append(f'N\t{relative}\t{note.size}\t{note.mtime_ns}\t{len(note.texts)}')
+            lines.extend(f'{line}\t{offset}\t{done}\t{_clean(text)}'
+                         for line, offset, done, text in zip(note.lines, note.offsets, note.done, note.texts))
+        data = _MAGIC + zlib.compress('\n'.join(lines).encode('utf-8'), 6)
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        write_atomic(self.cache_path, data)
+        self.dirty = False
+
+    # Parsing
+
+    def _read_note(self, path):
+        """Parse the tasks of a note, or None if it can't be read"""
+        try:
+            with open(path, 'rb') as f:
+                st = os.fstat(f.fileno())
+                data = f.read()
+        except OSError:
+            return None
+        return NoteTasks(st.st_size, st.st_mtime_ns, *parse_tasks(data))
+
+    def sync(self, entries):
+        """Bring the tasks up to date with catalog entries (path, size,
+        mtime_ns); returns True if any note was parsed or dropped"""
+        if not self._loaded:
+            self.load()
+        with self._lock:
+            old = self._notes
+            self._touched = set()
+
+        notes = {}
+        changed = False
+        for entry in entries:
+            note = old.get(entry.path)
+            if note is None or note.size != entry.size or note.mtime_ns != entry.mtime_ns:
+                note = self._read_note(entry.path)
+                changed = True
+            if note:
+                notes[entry.path] = note
+        changed = changed or len(notes) != len(old)
+
+        with self._lock:
+            touched = self._touched
+            self._touched = None
+            self._notes = notes
+        for path in touched:
+            self.update_file(path)
+        if changed:
+            self.dirty = True
+        return changed or bool(touched)
+
+    def update_file(self, path):
+        """Refresh a single note (e.g. right after saving it); returns True
+        if it had to be parsed again"""
+        if not path.startswith(os.path.join(self.notes_dir, '')) or not is_note(path):
+            return False
+        with self._lock:
+            if self._touched is not None:
+                self._touched.add(path)
+            try:
+                st = os.stat(path)
+            except OSError:
+                if self._notes.pop(path, None) is None:
+                    return False
+                self.dirty = True
+                return True
+            note = self._notes.get(path)
+            if note and note.size == st.st_size and note.mtime_ns == st.st_mtime_ns:
+                return False
+            note = self._read_note(path)
+            if note:
+                self._notes[path] = note
+            self.dirty = True
+            return True
+
+    # Toggling
+
+    def toggle(self, task, durability=DURABILITY_FILE):
+        """Check or uncheck a task by rewriting its mark in the note
+
+        Raises ValueError if the note changed since it was parsed (its
+        tasks are then parsed again) and OSError if it can't be written.
+        Returns the updated task.
+        """
+        with self._lock:
+            note = self._notes.get(task.path)
+        index = bisect.bisect_left(note.offsets, task.offset) if note else 0
+        if not note or index >= len(note.offsets) or note.offsets[index] != task.offset:
+            raise ValueError('La tarea ya no está en la nota')
+
+        with open(task.path, 'r+b') as f:
+            st = os.fstat(f.fileno())
+            f.seek(task.offset - 1)
+            current = f.read(3)
+            if ((st.st_size, st.st_mtime_ns) != (note.size, note.mtime_ns)
+                    or current not in (b'[ ]', b'[x]', b'[X]') or (current != b'[ ]') != task.done):
+                stale = True
+            else:
+                stale = False
+                f.seek(task.offset)
+                f.write(b' ' if task.done else b'x')
+                f.flush()
+                if durability != DURABILITY_NONE:
+                    os.fsync(f.fileno())
+                st = os.fstat(f.fileno())
+        if stale:
+            self.update_file(task.path)
+            raise ValueError('La nota cambió desde que se leyeron sus tareas')
+
+        with self._lock:
+            note.done[index] = not task.done
+            # Same size, new mtime: the note doesn't need parsing again
+            self._notes[task.path] = note._replace(size=st.st_size, mtime_ns=st.st_mtime_ns)
+            self.dirty = True
+        return task._replace(done=not task.done)
\ No newline at end of file
@@ -6,23 +6,76 @@ import gi
 gi.require_version('Gtk', '4.0')
 from gi.repository import GObject
 
+def count_words(text):
+    """Count whitespace separated words in text"""
+    return len(text.split())
+
+class TextEdit:
+    """Compact record of a single edit applied to the document"""
+
+    __slots__ = ('revision', 'offset', 'inserted', 'removed')
+
+    def __init__(self, revision, offset, inserted='', removed=''):
+        self.revision = revision
+        self.offset = offset
+        self.inserted = inserted
+        self.removed = removed
+
+    @property
+    def deleted(self):
+        """Number of chars removed at offset"""
+        return len(self.removed)
+
+    def __repr__(self):
+        return f"TextEdit(revision={self.revision}, offset={self.offset}, inserted={len(self.inserted)}, deleted={self.deleted})"
+
 class TextProcessor(GObject.Object):
-    """Processes text content and provides statistics"""
+    """Processes text content and provides statistics
+
+    Subscribers are notified through 'text_edited', carrying a TextEdit with
+    only what changed, or 'text_reset' when the whole document was replaced.
+    The full text is never shipped through signals: call get_snapshot() to
+    materialize it lazily (cached until the next revision).
+    """
 
     __gsignals__ = {
-        'text_changed': (GObject.SignalFlags.RUN_FIRST, None, (str,))
+        'text_edited': (GObject.SignalFlags.RUN_FIRST, None, (GObject.TYPE_PYOBJECT,)),
+        'text_reset': (GObject.SignalFlags.RUN_FIRST, None, ())
     }
 
     def __init__(self):
         super().__init__()
+        self._chars = 0
+        self._newlines = 0
+        self._words = 0
+        self._tail = ''
+
+        self.revision = 0
+        self._snapshot_source = None
+        self._snapshot = ('', 0)
+
+    def get_statistics(self, text=None):
+        """Calculate text statistics
 
-    def get_statistics(self, text):
-        """Calculate text statistics"""
+        Without arguments the counters maintained from buffer deltas are
+        returned, which costs O(1) regardless of the document size.
+        """
+        if text is not None:
+            return self._compute_statistics(text)
+
+        return {
+            'lines': self._newlines + 1 if self._chars else 0,
+            'words': self._words,
+            'chars': self._chars
+        }
+
+    def _compute_statistics(self, text):
+        """Calculate statistics scanning the whole text"""
         if not text:
             return {'lines': 0, 'words': 0, 'chars': 0}
 
         lines = text.count('\n') + 1
-        words = len(text.split()) if text.strip() else 0
+        words = count_words(text) if text.strip() else 0
         chars = len(text)
 
         return {
@@ -31,6 +84,66 @@ class TextProcessor(GObject.Object):
             'chars': chars
         }
 
-    def process_text_change(self, text):
-        """Process text changes and emit signal"""
-        self.emit('text_changed', text)
\ No newline at end of file
+    def reset(self, text):
+        """Recount everything from scratch (used when a document is loaded)"""
+        self.begin_reset()
+        self.extend(text)
+        self.end_reset(text)
+
+    def begin_reset(self):
+        """Start replacing the whole document, e.g. for a streamed load"""
+        self._chars = 0
+        self._newlines = 0
+        self._words = 0
+        self._tail = ''
+        self._snapshot = ('', -1)
+
+    def extend(self, text):
+        """Count text appended to the document being replaced"""
+        self._chars += len(text)
+        self._newlines += text.count('\n')
+        self._words += count_words(self._tail + text) - count_words(self._tail)
+        self._tail = text[-1:] or self._tail
+
+    def end_reset(self, text=None):
+        """Finish replacing the document and notify subscribers"""
+        self.revision += 1
+        if text is not None:
+            self._snapshot = (text, self.revision)
+        self.emit('text_reset')
+
+    def apply_insert(self, offset, text, before='', after=''):
+        """Record text inserted at offset, between the chars before and after
+
+        Only the edit and its two neighbouring chars are scanned: a word is
+        counted by the position where it starts, so inserting text can only
+        change the word starts inside the text itself and at the char after.
+        """
+        self._chars += len(text)
+        self._newlines += text.count('\n')
+        self._words += count_words(before + text + after) - count_words(before + after)
+
+        self.revision += 1
+        self.emit('text_edited', TextEdit(self.revision, offset, inserted=text))
+
+    def apply_delete(self, offset, text, before='', after=''):
+        """Record text removed at offset, from between before and after"""
+        self._chars -= len(text)
+        self._newlines -= text.count('\n')
+        self._words += count_words(before + after) - count_words(before + text + after)
+
+        self.revision += 1
+        self.emit('text_edited', TextEdit(self.revision, offset, removed=text))
+
+    def set_snapshot_source(self, source):
+        """Set the callable returning the current full text"""
+        self._snapshot_source = source
+        self._snapshot = ('', -1)
+
+    def get_snapshot(self):
+        """Get the full text of the current revision, materialized on demand"""
+        text, revision = self._snapshot
+        if revision != self.revision and self._snapshot_source:
+            text = self._snapshot_source()
+            self._snapshot = (text, self.revision)
+        return text
\ No newline at end of file
@@ -0,0 +1,266 @@
+"""
+Undo History - Core component keeping a memory-bounded undo/redo history
+"""
+import time
+from array import array
+
+# Delta kinds
+_INSERT = 0
+_DELETE = 1
+_RESET = 2
+
+class UndoHistory:
+    """Undo/redo history of a text document, made of coalesced deltas
+
+    Deltas are kept in parallel arrays (kind, offset, text) and grouped:
+    a group is what one undo reverts. Typing and erasing are merged into
+    one delta per word (or per pause in typing), so a long session stores
+    a few deltas per word rather than one per keystroke. The history has
+    a memory budget; when it is exceeded the oldest groups are dropped in
+    one go, down to three quarters of the budget.
+
+    A reset (the whole document replaced, e.g. by a template) is a single
+    entry holding a loader that produces the new text, not a copy of it.
+    Undoing a reset rebuilds the previous text from the reset before it
+    plus the deltas in between; a reset without loader (a file load)
+    starts a new history instead.
+    """
+
+    MAX_BYTES = 4 * 1024 * 1024
+    # Typing pauses longer than this start a new group
+    COALESCE_S = 1.0
+    # Longest merged delta, so merging stays cheap
+    MAX_MERGE = 1024
+    # Estimated cost of a delta besides its text (array slots, str header)
+    DELTA_BYTES = 64
+
+    def __init__(self, max_bytes=None, clock=time.monotonic):
+        self.max_bytes = max_bytes or self.MAX_BYTES
+        self._clock = clock
+        self._kinds = bytearray()
+        self._offsets = array('q')
+        self._texts = []
+        # Index of the first delta of each group
+        self._groups = array('q')
+        # Groups at the end that were undone, available to redo
+        self._undone = 0
+        self._bytes = 0
+        self._last_time = 0.0
+        # Next delta starts a new group instead of merging
+        self._sealed = True
+        # begin_group() nesting, and whether the open group has deltas
+        self._depth = 0
+        self._group_started = False
+
+    @property
+    def memory_used(self):
+        """Estimated bytes held by the history"""
+        return self._bytes
+
+    def set_budget(self, max_bytes):
+        """Change the memory budget, dropping old groups if needed"""
+        self.max_bytes = max_bytes
+        self._evict()
+
+    def clear(self):
+        """Forget every group"""
+        self._kinds = bytearray()
+        self._offsets = array('q')
+        self._texts = []
+        self._groups = array('q')
+        self._undone = 0
+        self._bytes = 0
+        self._sealed = True
+
+    def begin_group(self):
+        """Start a compound edit (e.g. replacing a selection), undone at once"""
+        if not self._depth:
+            self._group_started = False
+        self._depth += 1
+
+    def end_group(self):
+        """End a compound edit"""
+        self._depth = max(0, self._depth - 1)
+
+    def break_group(self):
+        """Make the next edit a new group"""
+        self._sealed = True
+
+    def can_undo(self):
+        """Whether undo() has something to revert"""
+        position = len(self._groups) - self._undone
+        if position <= 0:
+            return False
+        start = self._groups[position - 1]
+        return self._kinds[start] != _RESET or self._kinds.rfind(_RESET, 0, start) >= 0
+
+    def can_redo(self):
+        """Whether redo() has something to apply again"""
+        return self._undone > 0
+
+    def _cost(self, text):
+        """Estimated bytes of a delta"""
+        return self.DELTA_BYTES + (len(text) if isinstance(text, str) else 0)
+
+    def _drop_redo(self):
+        """A new edit after undoing discards what could be redone"""
+        if not self._undone:
+            return
+        cut = self._groups[len(self._groups) - self._undone]
+        self._bytes -= sum(self._cost(text) for text in self._texts[cut:])
+        del self._kinds[cut:]
+        del self._offsets[cut:]
+        del self._texts[cut:]
+        del self._groups[len(self._groups) - self._undone:]
+        self._undone = 0
+
+    def _push(self, kind, offset, text):
+        """Append a delta, in a new group unless a compound edit is open"""
+        if not self._depth or not self._group_started:
+            self._groups.append(len(self._kinds))
+            self._group_started = bool(self._depth)
+        self._kinds.append(kind)
+        self._offsets.append(offset)
+        self._texts.append(text)
+        self._bytes += self._cost(text)
+
+    def _can_merge(self, kind, now):
+        """Whether an edit may extend the last delta"""
+        return (not self._sealed and self._kinds and self._kinds[-1] == kind
+                and now - self._last_time < self.COALESCE_S and len(self._texts[-1]) < self.MAX_MERGE)
+
+    def record_insert(self, offset, text):
+        """Record text inserted at offset"""
+        if not text:
+            return
+        now = self._clock()
+        self._drop_redo()
+        last = self._texts[-1] if self._texts else ''
+        # A word ends with the spaces after it
+        if (self._can_merge(_INSERT, now) and offset == self._offsets[-1] + len(last)
+                and not (last[-1:].isspace() and not text[0].isspace())):
+            self._texts[-1] = last + text
+            self._bytes += len(text)
+        else:
+            self._push(_INSERT, offset, text)
+        self._last_time = now
+        # A new line starts a new group
+        self._sealed = '\n' in text or len(text) > 1
+        self._evict()
+
+    def record_delete(self, offset, text):
+        """Record text removed at offset"""
+        if not text:
+            return
+        now = self._clock()
+        self._drop_redo()
+        if self._can_merge(_DELETE, now) and '\n' not in text:
+            last = self._texts[-1]
+            if offset + len(text) == self._offsets[-1]:
+                # Backspace
+                self._texts[-1] = text + last
+                self._offsets[-1] = offset
+                self._bytes += len(text)
+            elif offset == self._offsets[-1]:
+                # Delete key
+                self._texts[-1] = last + text
+                self._bytes += len(text)
+            else:
+                self._push(_DELETE, offset, text)
+        else:
+            self._push(_DELETE, offset, text)
+        self._last_time = now
+        self._sealed = '\n' in text or len(text) > 1
+        self._evict()
+
+    def record_reset(self, loader=None):
+        """Record the whole document being replaced by loader()'s text
+
+        Without loader the previous state can't be rebuilt, so the history
+        starts over.
+        """
+        if loader is None:
+            self.clear()
+            return
+        self._drop_redo()
+        depth, self._depth = self._depth, 0
+        self._push(_RESET, 0, loader)
+        self._depth = depth
+        self._sealed = True
+        self._evict()
+
+    def _bounds(self, group):
+        """First and past-the-last delta of a group"""
+        end = self._groups[group + 1] if group + 1 < len(self._groups) else len(self._kinds)
+        return self._groups[group], end
+
+    def _rebuild(self, index):
+        """Text right before the reset at delta index, or None if unknown"""
+        base = self._kinds.rfind(_RESET, 0, index)
+        if base < 0:
+            return None
+        text = self._texts[base]()
+        for i in range(base + 1, index):
+            text = self._apply(text, self._kinds[i], self._offsets[i], self._texts[i])
+        return text
+
+    @staticmethod
+    def _apply(text, kind, offset, delta):
+        """Apply a delta to a string"""
+        if kind == _INSERT:
+            return text[:offset] + delta + text[offset:]
+        return text[:offset] + text[offset + len(delta):]
+
+    def undo(self):
+        """Operations reverting the last group, or None
+
+        Operations are ('insert', offset, text), ('delete', offset, text)
+        and ('reset', 0, text), to apply in order.
+        """
+        if not self.can_undo():
+            return None
+        start, end = self._bounds(len(self._groups) - self._undone - 1)
+        if self._kinds[start] == _RESET:
+            operations = [('reset', 0, self._rebuild(start))]
+        else:
+            operations = [('insert' if self._kinds[i] == _DELETE else 'delete', self._offsets[i], self._texts[i])
+                          for i in reversed(range(start, end))]
+        self._undone += 1
+        self._sealed = True
+        return operations
+
+    def redo(self):
+        """Operations applying the last undone group again, or None"""
+        if not self._undone:
+            return None
+        start, end = self._bounds(len(self._groups) - self._undone)
+        if self._kinds[start] == _RESET:
+            operations = [('reset', 0, self._texts[start]())]
+        else:
+            operations = [('insert' if self._kinds[i] == _INSERT else 'delete', self._offsets[i], self._texts[i])
+                          for i in range(start, end)]
+        self._undone -= 1
+        self._sealed = True
+        return operations
+
+    def _evict(self):
+        """Drop the oldest groups once over budget, down to 3/4 of it"""
+        if self._bytes <= self.max_bytes:
+            return
+        target = self.max_bytes * 3 // 4
+        # Keep the newest group, and every group that can be redone
+        keep = max(1, self._undone + 1)
+        first = 0
+        freed = 0
+        while first < len(self._groups) - keep and self._bytes - freed > target:
+            start, end = self._bounds(first)
+            freed += sum(self._cost(text) for text in self._texts[start:end])
+            first += 1
+        if not first:
+            return
+        cut = self._groups[first]
+        del self._kinds[:cut]
+        del self._offsets[:cut]
+        del self._texts[:cut]
+        self._groups = array('q', [group - cut for group in self._groups[first:]])
+        self._bytes -= freed
\ No newline at end of file
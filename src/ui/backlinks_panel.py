@@ -0,0 +1,95 @@
+"""
+Backlinks Panel - UI component listing the notes that link to the open note
+"""
+import os
+import gi
+
+gi.require_version('Gtk', '4.0')
+from gi.repository import Gtk, Pango
+
+class BacklinksPanel(Gtk.Box):
+    """Notes with a [[wikilink]] to the open note, below the editor
+
+    The list comes from the link graph's reverse index, so showing it
+    costs the number of backlinks. Updates while the panel is hidden are
+    deferred until it is shown.
+    """
+
+    def __init__(self, app):
+        super().__init__(orientation=Gtk.Orientation.VERTICAL, spacing=6)
+        self.app = app
+        self._path = None
+        self._stale = True
+
+        self.set_margin_start(6)
+        self.set_margin_end(6)
+        self.set_margin_top(6)
+        self.set_margin_bottom(6)
+
+        self.title_label = Gtk.Label()
+        self.title_label.set_halign(Gtk.Align.START)
+        self.title_label.add_css_class('dim-label')
+        self.append(self.title_label)
+
+        self.results = Gtk.ListBox()
+        self.results.set_selection_mode(Gtk.SelectionMode.NONE)
+        self.results.connect('row-activated', lambda listbox, row: self.app.open_note(row.path))
+
+        scrolled = Gtk.ScrolledWindow()
+        scrolled.set_vexpand(True)
+        scrolled.set_child(self.results)
+        self.append(scrolled)
+
+        self.connect('show', self._on_show)
+
+    def _on_show(self, widget):
+        """Apply updates deferred while hidden"""
+        if self._stale:
+            self.show_note(self._path)
+
+    def show_note(self, path):
+        """List the backlinks of a note (None for an unsaved document)"""
+        self._path = path
+        if not self.get_visible():
+            self._stale = True
+            return
+        self._stale = False
+
+        row = self.results.get_first_child()
+        while row:
+            next_row = row.get_next_sibling()
+            self.results.remove(row)
+            row = next_row
+
+        if not path:
+            self.title_label.set_text('Enlaces entrantes: guarda la nota para verlos')
+            return
+        entry = self.app.catalog.get(path)
+        sources = self.app.links.backlinks(path, entry.title if entry else None)
+        for source in sources:
+            self.results.append(self._build_row(source))
+        self.title_label.set_text(f'Enlaces entrantes ({len(sources)})')
+
+    def _build_row(self, path):
+        """Build the row of a linking note: its title and folder"""
+        entry = self.app.catalog.get(path)
+        title_label = Gtk.Label(label=entry.title if entry and entry.title else os.path.basename(path))
+        title_label.set_halign(Gtk.Align.START)
+        title_label.set_ellipsize(Pango.EllipsizeMode.END)
+
+        relative = os.path.relpath(os.path.dirname(path), self.app.file_manager.get_notes_dir())
+        dir_label = Gtk.Label(label='' if relative == '.' else relative)
+        dir_label.set_halign(Gtk.Align.START)
+        dir_label.set_ellipsize(Pango.EllipsizeMode.END)
+        dir_label.add_css_class('dim-label')
+
+        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
+        box.set_margin_top(4)
+        box.set_margin_bottom(4)
+        box.append(title_label)
+        box.append(dir_label)
+
+        row = Gtk.ListBoxRow()
+        row.set_child(box)
+        row.path = path
+        return row
\ No newline at end of file
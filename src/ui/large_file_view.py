@@ -0,0 +1,98 @@
+"""
+Large File View - UI component rendering only the visible lines of a huge file
+"""
+import gi
+
+gi.require_version('Gtk', '4.0')
+from gi.repository import Gtk
+
+class LargeFileView(Gtk.Box):
+    """Read-only viewer showing the lines of a LargeFile that fit on screen
+
+    The text view only ever holds the visible window of lines; a separate
+    scrollbar spans the whole line count, so scrolling costs the same on a
+    1 GB file as on a short one.
+    """
+
+    def __init__(self, large_file):
+        super().__init__(orientation=Gtk.Orientation.HORIZONTAL)
+        self.large_file = large_file
+        self._visible_lines = 40
+        self._line_height = 0
+        self._first_line = -1
+
+        self.text_view = Gtk.TextView()
+        self.text_view.set_editable(False)
+        self.text_view.set_cursor_visible(False)
+        self.text_view.set_wrap_mode(Gtk.WrapMode.NONE)
+        self.text_view.set_monospace(True)
+        self.text_view.set_hexpand(True)
+        self.text_view.set_vexpand(True)
+        self.text_view.set_margin_start(20)
+        self.text_view.set_margin_end(20)
+
+        # Horizontal scrolling only: vertical position comes from the adjustment
+        scrolled = Gtk.ScrolledWindow()
+        scrolled.set_policy(Gtk.PolicyType.AUTOMATIC, Gtk.PolicyType.NEVER)
+        scrolled.set_child(self.text_view)
+        scrolled.set_hexpand(True)
+        self.append(scrolled)
+
+        self.adjustment = Gtk.Adjustment(value=0, lower=0, upper=1, step_increment=1,
+                                         page_increment=self._visible_lines, page_size=self._visible_lines)
+        self.adjustment.connect('value-changed', lambda adj: self._render())
+        scrollbar = Gtk.Scrollbar(orientation=Gtk.Orientation.VERTICAL, adjustment=self.adjustment)
+        self.append(scrollbar)
+
+        scroll = Gtk.EventControllerScroll.new(Gtk.EventControllerScrollFlags.VERTICAL)
+        scroll.connect('scroll', self._on_scroll)
+        self.text_view.add_controller(scroll)
+
+        # Disconnected by the window when the viewer is closed
+        self.handler_ids = [
+            self.large_file.connect('index_progress', lambda f, fraction: self._update_range()),
+            self.large_file.connect('index_ready', lambda f: self._update_range())
+        ]
+
+    def do_size_allocate(self, width, height, baseline):
+        """Recompute how many lines fit when the view is resized"""
+        Gtk.Box.do_size_allocate(self, width, height, baseline)
+        visible = max(1, height // self._get_line_height())
+        if visible != self._visible_lines:
+            self._visible_lines = visible
+            self._update_range()
+
+    def _get_line_height(self):
+        """Height of a line in the monospace font, cached"""
+        if not self._line_height:
+            layout = self.text_view.create_pango_layout('0')
+            self._line_height = max(1, layout.get_pixel_size()[1])
+        return self._line_height
+
+    def _update_range(self):
+        """Sync the scrollbar with the number of indexed lines"""
+        lines = self.large_file.get_line_count()
+        self.adjustment.configure(
+            min(self.adjustment.get_value(), max(0, lines - self._visible_lines)),
+            0, max(lines, 1), 1, self._visible_lines, self._visible_lines
+        )
+        self._first_line = -1
+        self._render()
+
+    def _on_scroll(self, controller, dx, dy):
+        """Scroll by whole lines"""
+        self.adjustment.set_value(self.adjustment.get_value() + dy * 3)
+        return True
+
+    def _render(self):
+        """Fetch and show the visible window of lines"""
+        first = int(self.adjustment.get_value())
+        if first == self._first_line:
+            return
+        self._first_line = first
+        lines = self.large_file.get_lines(first, self._visible_lines)
+        self.text_view.get_buffer().set_text('\n'.join(lines))
+
+    def goto_line(self, line):
+        """Scroll so that a line (1-based) is at the top"""
+        self.adjustment.set_value(max(0, line - 1))
\ No newline at end of file
@@ -0,0 +1,97 @@
+"""
+Line Numbers - UI component drawing a line-number gutter for the editor
+"""
+import gi
+
+gi.require_version('Gtk', '4.0')
+from gi.repository import Gtk, Gdk, Graphene
+
+class LineNumberGutter(Gtk.Widget):
+    """Line numbers in the left gutter of a text view
+
+    Only the lines in the viewport are asked for (get_line_at_y, then
+    get_line_yrange line by line), so drawing costs the same at the top of
+    a short note as in the middle of a million-line file. Editor fonts are
+    monospace, so the width is the cached width of a digit times the
+    number of digits of the line count, recomputed only when the font or
+    that number of digits changes.
+    """
+
+    PADDING = 8
+
+    def __init__(self, text_view):
+        super().__init__()
+        self.text_view = text_view
+        self.text_buffer = text_view.get_buffer()
+        self._layout = None
+        self._font = None
+        self._digit_width = 0
+        self._digits = 0
+
+        self.add_css_class('line-numbers')
+        self.text_buffer.connect('changed', self._on_buffer_changed)
+        self.text_buffer.connect('notify::cursor-position', lambda b, p: self.queue_draw())
+        self.text_view.get_vadjustment().connect('value-changed', lambda a: self.queue_draw())
+
+    def _on_buffer_changed(self, buffer):
+        """Renumber; resize only when the number of digits changed"""
+        digits = len(str(buffer.get_line_count()))
+        if digits != self._digits:
+            self._digits = digits
+            self.queue_resize()
+        else:
+            self.queue_draw()
+
+    def _measure_digit(self):
+        """Width of a digit in the editor font, cached per font"""
+        if self._layout is None:
+            self._layout = self.text_view.create_pango_layout('')
+        font = self.text_view.get_pango_context().get_font_description()
+        font_key = font.to_string() if font else ''
+        if font_key != self._font:
+            self._font = font_key
+            self._layout.set_font_description(font)
+            self._layout.set_text('0123456789', -1)
+            width, height = self._layout.get_pixel_size()
+            self._digit_width = (width + 9) // 10
+        return self._digit_width
+
+    def do_measure(self, orientation, for_size):
+        if orientation == Gtk.Orientation.HORIZONTAL:
+            self._digits = len(str(self.text_buffer.get_line_count()))
+            width = self._measure_digit() * self._digits + 2 * self.PADDING
+            return width, width, -1, -1
+        return 0, 0, -1, -1
+
+    def do_snapshot(self, snapshot):
+        digit_width = self._measure_digit()
+        width = self.get_width()
+        current_color = self.get_style_context().get_color()
+        color = Gdk.RGBA(red=current_color.red, green=current_color.green, blue=current_color.blue,
+                         alpha=current_color.alpha * 0.5)
+
+        rect = self.text_view.get_visible_rect()
+        line_iter = self.text_view.get_line_at_y(rect.y)
+        # PyGObject returns (iter, line_top)
+        if isinstance(line_iter, tuple):
+            line_iter = line_iter[0]
+        bottom = rect.y + rect.height
+        current = self.text_buffer.get_iter_at_mark(self.text_buffer.get_insert()).get_line()
+
+        line = -1
+        while line_iter.get_line() != line:
+            line = line_iter.get_line()
+            y, height = self.text_view.get_line_yrange(line_iter)
+            if y > bottom:
+                break
+            number = str(line + 1)
+            window_y = self.text_view.buffer_to_window_coords(Gtk.TextWindowType.LEFT, 0, y)[1]
+
+            self._layout.set_text(number, -1)
+            snapshot.save()
+            snapshot.translate(Graphene.Point().init(width - self.PADDING - digit_width * len(number), window_y))
+            snapshot.append_layout(self._layout, current_color if line == current else color)
+            snapshot.restore()
+
+            # Stays on the last line at the end of the buffer
+            line_iter.forward_line()
\ No newline at end of file
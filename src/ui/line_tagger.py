@@ -0,0 +1,158 @@
+"""
+Line Tagger - UI component applying text tags to the editor line by line
+"""
+import re
+import time
+import gi
+
+gi.require_version('Gtk', '4.0')
+from gi.repository import GLib
+
+# Line states: tagged, never tagged, or tagged with possibly stale tags
+_CLEAN = 0
+_FRESH = 1
+_STALE = 2
+_PENDING = re.compile(b'[\x01\x02]')
+
+class LineTagger:
+    """Base class for passes that tag the editor one line at a time
+
+    Each line has a state in a byte array. Edits mark only the lines they
+    touched as pending (replace_lines); pending lines in the viewport are
+    tagged before the next frame is painted and the rest of the document
+    in idle time slices, so the cost of a pass does not grow with the
+    document. Subclasses create their tags in self._tags and implement
+    tag_line(line, start, end), applying the tags of a line between two
+    iters (end includes its newline).
+    """
+
+    # Time spent tagging per idle iteration, and per viewport pass
+    STEP_BUDGET_MS = 5
+    VIEWPORT_BUDGET_MS = 12
+
+    def __init__(self, text_view):
+        self.text_view = text_view
+        self.text_buffer = text_view.get_buffer()
+        self.enabled = True
+        self._tags = {}
+        self._lines = bytearray([_FRESH])
+        self._cursor = 0
+        self._viewport_id = 0
+        self._step_id = 0
+
+        self.text_view.get_vadjustment().connect('value-changed', lambda a: self._schedule())
+
+    def set_enabled(self, enabled):
+        """Turn the pass on (tagging everything again) or off (removing its tags)"""
+        self.enabled = enabled
+        if enabled:
+            self.reset_lines()
+        else:
+            self._stop()
+            self._remove_tags(*self.text_buffer.get_bounds())
+
+    def _remove_tags(self, start, end):
+        """Remove this pass's tags from a range"""
+        for tag in self._tags.values():
+            self.text_buffer.remove_tag(tag, start, end)
+
+    def _stop(self):
+        """Cancel scheduled tagging"""
+        for source_id in (self._viewport_id, self._step_id):
+            if source_id:
+                GLib.source_remove(source_id)
+        self._viewport_id = 0
+        self._step_id = 0
+
+    def reset_lines(self):
+        """The whole document changed: tag every line again"""
+        if not self.enabled:
+            return
+        self._remove_tags(*self.text_buffer.get_bounds())
+        self._lines = bytearray([_FRESH]) * self.text_buffer.get_line_count()
+        self._cursor = 0
+        self._schedule()
+
+    def replace_lines(self, first, old_count, new_count, changed=()):
+        """The old_count lines from first became new_count lines; changed
+        holds other (start, end) ranges to tag again, end None meaning the
+        end of the document"""
+        if not self.enabled:
+            return
+        if len(self._lines) - old_count + new_count != self.text_buffer.get_line_count():
+            # Out of step with the buffer (should not happen): redo everything
+            self.reset_lines()
+            return
+        self._lines[first:first + old_count] = bytes([_STALE]) * new_count
+        for start, end in changed:
+            self.mark_stale(start, end)
+        self._schedule()
+
+    def mark_stale(self, start=0, end=None):
+        """Tag a range of lines again"""
+        end = len(self._lines) if end is None else min(end, len(self._lines))
+        self._lines[start:end] = self._lines[start:end].replace(b'\x00', b'\x02')
+
+    def line_bounds(self, line, with_newline=False):
+        """Iters at the start and end of a line"""
+        start = self.text_buffer.get_iter_at_line(line)
+        # PyGObject returns (found, iter) on GTK 4
+        if isinstance(start, tuple):
+            start = start[1]
+        end = start.copy()
+        if with_newline:
+            end.forward_line()
+        elif not end.ends_line():
+            end.forward_to_line_end()
+        return start, end
+
+    def _process_line(self, line):
+        """Tag a pending line"""
+        start, end = self.line_bounds(line, with_newline=True)
+        if self._lines[line] == _STALE:
+            self._remove_tags(start, end)
+        self._lines[line] = _CLEAN
+        self.tag_line(line, start, end)
+
+    def _visible_lines(self):
+        """First and last line in the viewport"""
+        rect = self.text_view.get_visible_rect()
+        top = self.text_view.get_line_at_y(rect.y)
+        bottom = self.text_view.get_line_at_y(rect.y + rect.height)
+        # PyGObject returns (iter, line_top)
+        top = top[0] if isinstance(top, tuple) else top
+        bottom = bottom[0] if isinstance(bottom, tuple) else bottom
+        return top.get_line(), bottom.get_line()
+
+    def _schedule(self):
+        """Tag the viewport before the next frame, then the rest when idle"""
+        if self.enabled and not self._viewport_id:
+            self._viewport_id = GLib.idle_add(self._tag_viewport, priority=GLib.PRIORITY_HIGH_IDLE)
+
+    def _tag_viewport(self):
+        """Tag the pending lines in the viewport"""
+        self._viewport_id = 0
+        first, last = self._visible_lines()
+        deadline = time.monotonic() + self.VIEWPORT_BUDGET_MS / 1000
+        match = _PENDING.search(self._lines, first, last + 1)
+        while match and time.monotonic() < deadline:
+            self._process_line(match.start())
+            match = _PENDING.search(self._lines, match.start() + 1, last + 1)
+        # Continue with what is left of the viewport, then the lines below it
+        self._cursor = match.start() if match else last + 1
+
+        if not self._step_id and _PENDING.search(self._lines):
+            self._step_id = GLib.idle_add(self._step, priority=GLib.PRIORITY_LOW)
+        return GLib.SOURCE_REMOVE
+
+    def _step(self):
+        """Tag pending lines for a time slice, from the cursor onwards"""
+        deadline = time.monotonic() + self.STEP_BUDGET_MS / 1000
+        while time.monotonic() < deadline:
+            match = _PENDING.search(self._lines, self._cursor) or _PENDING.search(self._lines)
+            if not match:
+                self._step_id = 0
+                return GLib.SOURCE_REMOVE
+            self._process_line(match.start())
+            self._cursor = match.start() + 1
+        return GLib.SOURCE_CONTINUE
\ No newline at end of file
@@ -1,10 +1,16 @@
 """
 Main Window - UI component for the main application window
 """
+import os
 import gi
 
 gi.require_version('Gtk', '4.0')
-from gi.repository import Gtk, Gio, Gdk
+from gi.repository import Gtk, Gio, Gdk, GLib
+
+from ui.search_bar import SearchBar
+from ui.markdown_highlighter import MarkdownHighlighter
+from ui.spell_highlighter import SpellHighlighter
+from ui.undo_manager import UndoManager
 
 class MainWindow(Gtk.ApplicationWindow):
     """Main application window"""
@@ -20,10 +26,16 @@ class MainWindow(Gtk.ApplicationWindow):
         self.text_view = None
         self.text_buffer = None
         self.status_bar = None
+        self._buffer_handlers = []
+        self._pending_delete = None
+        self.large_file_view = None
+        self.line_numbers = None
 
         self._build_ui()
         self._connect_signals()
 
+        self.app.text_processor.set_snapshot_source(self.get_text)
+
     def _build_ui(self):
         """Build the user interface"""
         # Header bar
@@ -61,15 +73,46 @@ class MainWindow(Gtk.ApplicationWindow):
         self.text_view.get_style_context().add_provider(css_provider, Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION)
 
         self.text_buffer = self.text_view.get_buffer()
+        self.undo = UndoManager(self.text_buffer)
 
         # Scrolled window
         scrolled_window = Gtk.ScrolledWindow()
         scrolled_window.set_child(self.text_view)
         scrolled_window.set_vexpand(True)
 
+        # Editor and read-only large file viewer share the same slot
+        self.stack = Gtk.Stack()
+        self.stack.add_named(scrolled_window, 'editor')
+        self.stack.set_vexpand(True)
+
+        # Markdown syntax highlighting (created before the search bar, whose
+        # match tags take priority)
+        self.highlighter = MarkdownHighlighter(self.text_view, self.app.text_processor)
+        self.spell = SpellHighlighter(self.text_view, self.highlighter)
+
+        # Search bar (Ctrl+F)
+        self.search_bar = SearchBar(self.text_view, self.app.text_processor)
+
+        # Backlinks panel below the editor
+        self.editor_paned = Gtk.Paned(orientation=Gtk.Orientation.VERTICAL)
+        self.editor_paned.set_start_child(self.stack)
+        self.editor_paned.set_shrink_end_child(False)
+
+        # Markdown preview to the right of the editor
+        self.preview_paned = Gtk.Paned(orientation=Gtk.Orientation.HORIZONTAL)
+        self.preview_paned.set_start_child(self.editor_paned)
+        self.preview_paned.set_shrink_end_child(False)
+
+        # Notes sidebar (F9) to the left
+        self.paned = Gtk.Paned(orientation=Gtk.Orientation.HORIZONTAL)
+        self.paned.set_end_child(self.preview_paned)
+        self.paned.set_shrink_start_child(False)
+        self.paned.set_vexpand(True)
+
         # Main layout
         self.main_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
-        self.main_box.append(scrolled_window)
+        self.main_box.append(self.search_bar)
+        self.main_box.append(self.paned)
 
         self.set_child(self.main_box)
 
@@ -90,18 +133,63 @@ class MainWindow(Gtk.ApplicationWindow):
         controller = Gtk.ShortcutController()
         self.add_controller(controller)
 
+        # Ctrl+Z / Ctrl+Y - Undo and redo
+        self.undo.add_shortcuts(self, lambda: self.text_view.scroll_mark_onscreen(self.text_buffer.get_insert()))
+
         # Ctrl+O - Open
         shortcut = Gtk.Shortcut()
         shortcut.set_trigger(Gtk.ShortcutTrigger.parse_string('<Control>o'))
         shortcut.set_action(Gtk.CallbackAction.new(lambda w, a: self.app.on_open_file()))
         controller.add_shortcut(shortcut)
 
+        # Ctrl+P - Quick open
+        shortcut = Gtk.Shortcut()
+        shortcut.set_trigger(Gtk.ShortcutTrigger.parse_string('<Control>p'))
+        shortcut.set_action(Gtk.CallbackAction.new(lambda w, a: self.app.on_quick_open()))
+        controller.add_shortcut(shortcut)
+
         # Ctrl+S - Save
         shortcut = Gtk.Shortcut()
         shortcut.set_trigger(Gtk.ShortcutTrigger.parse_string('<Control>s'))
         shortcut.set_action(Gtk.CallbackAction.new(lambda w, a: self.app.on_save_file()))
         controller.add_shortcut(shortcut)
 
+        # Ctrl+F - Search
+        shortcut = Gtk.Shortcut()
+        shortcut.set_trigger(Gtk.ShortcutTrigger.parse_string('<Control>f'))
+        shortcut.set_action(Gtk.CallbackAction.new(lambda w, a: self.app.on_search()))
+        controller.add_shortcut(shortcut)
+
+        # Ctrl+T - Tasks of every note
+        shortcut = Gtk.Shortcut()
+        shortcut.set_trigger(Gtk.ShortcutTrigger.parse_string('<Control>t'))
+        shortcut.set_action(Gtk.CallbackAction.new(lambda w, a: self.app.on_show_tasks()))
+        controller.add_shortcut(shortcut)
+
+        # Ctrl+Shift+F - Search all notes
+        shortcut = Gtk.Shortcut()
+        shortcut.set_trigger(Gtk.ShortcutTrigger.parse_string('<Control><Shift>f'))
+        shortcut.set_action(Gtk.CallbackAction.new(lambda w, a: self.app.on_search_notes()))
+        controller.add_shortcut(shortcut)
+
+        # F9 - Notes sidebar
+        shortcut = Gtk.Shortcut()
+        shortcut.set_trigger(Gtk.ShortcutTrigger.parse_string('F9'))
+        shortcut.set_action(Gtk.NamedAction.new('app.notes-sidebar'))
+        controller.add_shortcut(shortcut)
+
+        # Ctrl+L - Go to line
+        shortcut = Gtk.Shortcut()
+        shortcut.set_trigger(Gtk.ShortcutTrigger.parse_string('<Control>l'))
+        shortcut.set_action(Gtk.CallbackAction.new(lambda w, a: self.show_goto_line_dialog()))
+        controller.add_shortcut(shortcut)
+
+        # Escape - Cancel a file being loaded
+        shortcut = Gtk.Shortcut()
+        shortcut.set_trigger(Gtk.ShortcutTrigger.parse_string('Escape'))
+        shortcut.set_action(Gtk.CallbackAction.new(lambda w, a: self.app.on_cancel_load()))
+        controller.add_shortcut(shortcut)
+
         # Ctrl+Shift+N - Quick Capture
         shortcut = Gtk.Shortcut()
         shortcut.set_trigger(Gtk.ShortcutTrigger.parse_string('<Control><Shift>n'))
@@ -110,36 +198,239 @@ class MainWindow(Gtk.ApplicationWindow):
 
     def _connect_signals(self):
         """Connect signals"""
-        self.text_buffer.connect('changed', self._on_text_changed)
-
-    def _on_text_changed(self, buffer):
-        """Handle text changes"""
-        start, end = buffer.get_bounds()
-        text = buffer.get_text(start, end, False)
-        self.app.on_text_changed(self.app.text_processor, text)
+        self._buffer_handlers = [
+            self.text_buffer.connect_after('insert-text', self._on_insert_text),
+            self.text_buffer.connect('delete-range', self._on_delete_range),
+            self.text_buffer.connect_after('delete-range', self._on_range_deleted),
+        ] + self.undo.handler_ids
+
+    def _on_insert_text(self, buffer, location, text, length):
+        """Feed inserted text to the statistics engine"""
+        # Connected after the default handler: location points past the insertion
+        offset = location.get_offset() - len(text)
+        start = buffer.get_iter_at_offset(offset)
+        self.app.text_processor.apply_insert(offset, text, self._char_before(start), self._char_at(location))
+
+    def _on_delete_range(self, buffer, start, end):
+        """Remember the text about to be deleted"""
+        self._pending_delete = buffer.get_text(start, end, False)
+
+    def _on_range_deleted(self, buffer, start, end):
+        """Feed deleted text to the statistics engine"""
+        text = self._pending_delete or ''
+        self._pending_delete = None
+        self.app.text_processor.apply_delete(start.get_offset(), text, self._char_before(start), self._char_at(start))
+
+    def _char_before(self, text_iter):
+        """Get the char preceding an iter, or '' at the buffer start"""
+        if text_iter.is_start():
+            return ''
+        previous = text_iter.copy()
+        previous.backward_char()
+        return previous.get_char()
+
+    def _char_at(self, text_iter):
+        """Get the char at an iter, or '' at the buffer end"""
+        if text_iter.is_end():
+            return ''
+        return text_iter.get_char()
 
     def _on_file_drop(self, drop_target, value, x, y):
         """Handle file drops"""
         if isinstance(value, Gdk.FileList):
             files = value.get_files()
-            for file in files:
-                file_path = file.get_path()
-                if file_path:
-                    cursor_iter = self.text_buffer.get_iter_at_offset(
-                        self.text_buffer.get_cursor_position()
-                    )
-                    self.text_buffer.insert(cursor_iter, f"{file_path}\n")
+            paths = [file.get_path() for file in files if file.get_path()]
+            if paths:
+                # A single insertion so dropping many files is one edit
+                cursor_iter = self.text_buffer.get_iter_at_offset(
+                    self.text_buffer.get_cursor_position()
+                )
+                self.text_buffer.insert(cursor_iter, ''.join(f"{path}\n" for path in paths))
         return True
 
     def set_text(self, text):
         """Set text content"""
-        self.text_buffer.set_text(text)
+        # Replacing the whole document is cheaper to recount once than to
+        # diff through the delta handlers (which would copy the old text)
+        for handler_id in self._buffer_handlers:
+            self.text_buffer.handler_block(handler_id)
+        try:
+            self.text_buffer.set_text(text)
+        finally:
+            for handler_id in self._buffer_handlers:
+                self.text_buffer.handler_unblock(handler_id)
+        # A loaded document starts a new undo history
+        self.undo.reset()
+        self.app.text_processor.reset(text)
+
+    def begin_load(self):
+        """Clear the document and lock editing while a file streams in"""
+        self.set_text('')
+        self.text_view.set_editable(False)
+        self.app.text_processor.begin_reset()
+
+    def append_loaded_text(self, text):
+        """Append a chunk of a streamed file to the end of the buffer"""
+        for handler_id in self._buffer_handlers:
+            self.text_buffer.handler_block(handler_id)
+        try:
+            self.text_buffer.insert(self.text_buffer.get_end_iter(), text)
+        finally:
+            for handler_id in self._buffer_handlers:
+                self.text_buffer.handler_unblock(handler_id)
+        self.app.text_processor.extend(text)
+
+    def end_load(self):
+        """Unlock editing once a streamed load finished or was cancelled"""
+        self.text_view.set_editable(True)
+        self.text_buffer.place_cursor(self.text_buffer.get_start_iter())
+        self.app.text_processor.end_reset()
+
+    def show_large_file(self, view):
+        """Replace the editor by a read-only large file viewer"""
+        self.close_large_file()
+        self.large_file_view = view
+        self.stack.add_named(view, 'viewer')
+        self.stack.set_visible_child_name('viewer')
+
+    def close_large_file(self):
+        """Go back to the editor"""
+        if self.large_file_view:
+            for handler_id in self.large_file_view.handler_ids:
+                self.large_file_view.large_file.disconnect(handler_id)
+            self.stack.set_visible_child_name('editor')
+            self.stack.remove(self.large_file_view)
+            self.large_file_view = None
+
+    def goto_line(self, line):
+        """Move to a line (1-based) in the editor or the large file viewer"""
+        if self.large_file_view:
+            self.large_file_view.goto_line(line)
+            return
+        line_iter = self.text_buffer.get_iter_at_line(max(0, line - 1))
+        # PyGObject returns (found, iter) on GTK 4
+        if isinstance(line_iter, tuple):
+            line_iter = line_iter[1]
+        self.text_buffer.place_cursor(line_iter)
+        self.text_view.scroll_to_iter(line_iter, 0.1, True, 0.0, 0.0)
+
+    def toggle_task_line(self, line, done):
+        """Check or uncheck the task on a line (0-based) if it is still done
+        or pending as expected; returns whether it was toggled"""
+        from core.task_index import find_task_mark
+        start = self.text_buffer.get_iter_at_line(line)
+        # PyGObject returns (found, iter) on GTK 4
+        if isinstance(start, tuple):
+            if not start[0]:
+                return False
+            start = start[1]
+        end = start.copy()
+        if not end.ends_line():
+            end.forward_to_line_end()
+        mark = find_task_mark(self.text_buffer.get_text(start, end, False))
+        if not mark or mark[1] != done:
+            return False
+        mark_start = self.text_buffer.get_iter_at_offset(start.get_offset() + mark[0])
+        mark_end = self.text_buffer.get_iter_at_offset(start.get_offset() + mark[0] + 1)
+        self.text_buffer.begin_user_action()
+        self.text_buffer.delete(mark_start, mark_end)
+        self.text_buffer.insert(mark_start, ' ' if done else 'x')
+        self.text_buffer.end_user_action()
+        return True
+
+    def show_goto_line_dialog(self):
+        """Ask for a line number and jump to it"""
+        dialog = Gtk.Dialog(
+            title='Ir a línea',
+            transient_for=self,
+            modal=True
+        )
+        dialog.add_buttons(
+            'Cancelar', Gtk.ResponseType.CANCEL,
+            'Ir', Gtk.ResponseType.OK
+        )
+        dialog.set_default_response(Gtk.ResponseType.OK)
+
+        entry = Gtk.Entry()
+        entry.set_placeholder_text('Número de línea...')
+        entry.set_input_purpose(Gtk.InputPurpose.DIGITS)
+        entry.set_activates_default(True)
+        entry.set_margin_start(10)
+        entry.set_margin_end(10)
+        entry.set_margin_top(10)
+        entry.set_margin_bottom(10)
+        dialog.get_content_area().append(entry)
+
+        def on_response(dialog, response_id):
+            if response_id == Gtk.ResponseType.OK:
+                text = entry.get_text().strip()
+                if text.isdigit():
+                    self.goto_line(int(text))
+            dialog.destroy()
+
+        dialog.connect('response', on_response)
+        dialog.present()
 
     def get_text(self):
         """Get current text content"""
         start, end = self.text_buffer.get_bounds()
         return self.text_buffer.get_text(start, end, False)
 
+    def set_sidebar(self, sidebar):
+        """Set the notes sidebar, hidden until toggled"""
+        sidebar.set_visible(False)
+        self.paned.set_start_child(sidebar)
+
+    def set_sidebar_visible(self, visible):
+        """Show or hide the notes sidebar"""
+        sidebar = self.paned.get_start_child()
+        if sidebar:
+            sidebar.set_visible(visible)
+
+    def set_backlinks(self, panel):
+        """Set the backlinks panel, hidden until toggled"""
+        panel.set_visible(False)
+        self.editor_paned.set_end_child(panel)
+
+    def set_backlinks_visible(self, visible):
+        """Show or hide the backlinks panel"""
+        panel = self.editor_paned.get_end_child()
+        if panel:
+            panel.set_visible(visible)
+            if visible:
+                self.editor_paned.set_position(self.editor_paned.get_height() * 3 // 4)
+
+    def set_preview(self, preview):
+        """Set the markdown preview pane, hidden until toggled"""
+        preview.set_visible(False)
+        self.preview_paned.set_end_child(preview)
+
+    def set_preview_visible(self, visible):
+        """Show or hide the markdown preview pane"""
+        preview = self.preview_paned.get_end_child()
+        if preview:
+            preview.set_visible(visible)
+            if visible:
+                self.preview_paned.set_position(self.preview_paned.get_width() // 2)
+
+    def set_line_numbers_visible(self, visible):
+        """Show or hide the line-number gutter of the editor"""
+        if visible:
+            if self.line_numbers is None:
+                from ui.line_numbers import LineNumberGutter
+                self.line_numbers = LineNumberGutter(self.text_view)
+            self.text_view.set_gutter(Gtk.TextWindowType.LEFT, self.line_numbers)
+        else:
+            self.text_view.set_gutter(Gtk.TextWindowType.LEFT, None)
+
+    def set_recent_notes(self, entries):
+        """Fill the recent notes menu"""
+        self.recent_menu.remove_all()
+        for entry in entries:
+            item = Gio.MenuItem.new(entry.title or os.path.basename(entry.path), None)
+            item.set_action_and_target_value('app.open-recent', GLib.Variant.new_string(entry.path))
+            self.recent_menu.append_item(item)
+
     def set_status_bar(self, status_bar):
         """Set the status bar component"""
         self.status_bar = status_bar
@@ -157,13 +448,19 @@ class MainWindow(Gtk.ApplicationWindow):
         file_menu = Gio.Menu()
         file_menu.append('Nuevo', 'app.new')
         file_menu.append('Abrir', 'app.open')
+        file_menu.append('Abrir nota...', 'app.quick-open')
+        self.recent_menu = Gio.Menu()
+        file_menu.append_submenu('Recientes', self.recent_menu)
         file_menu.append('Guardar', 'app.save')
         file_menu.append('Guardar como...', 'app.save-as')
+        file_menu.append('Exportar notas a HTML', 'app.export-html')
         menu.append_submenu('Archivo', file_menu)
 
         # Edit submenu
         edit_menu = Gio.Menu()
         edit_menu.append('Buscar', 'app.search')
+        edit_menu.append('Buscar en notas...', 'app.search-notes')
+        edit_menu.append('Tareas...', 'app.tasks')
         edit_menu.append('Ejecutar comando...', 'app.terminal-command')
 
         # Quick capture submenu
@@ -183,6 +480,10 @@ class MainWindow(Gtk.ApplicationWindow):
         view_menu = Gio.Menu()
         view_menu.append('Modo oscuro', 'app.dark-mode')
         view_menu.append('Vista previa Markdown', 'app.markdown-preview')
+        view_menu.append('Números de línea', 'app.line-numbers')
+        view_menu.append('Corrección ortográfica', 'app.spell-check')
+        view_menu.append('Panel de notas', 'app.notes-sidebar')
+        view_menu.append('Enlaces entrantes', 'app.backlinks')
         menu.append_submenu('Ver', view_menu)
 
         menu_button.set_menu_model(menu)
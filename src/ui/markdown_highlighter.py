@@ -0,0 +1,92 @@
+"""
+Markdown Highlighter - UI component tagging markdown syntax in the editor
+"""
+import gi
+
+gi.require_version('Gtk', '4.0')
+from gi.repository import Pango
+
+from core.markdown_syntax import FenceMap, tokenize_line, TOKEN_KINDS
+from ui.line_tagger import LineTagger
+
+class MarkdownHighlighter(LineTagger):
+    """Highlights markdown (headings, emphasis, code, task checkboxes...)
+    with text tags, one line at a time
+
+    An edit marks only the lines it touched, plus the lines whose fenced
+    code membership changed (tracked by a FenceMap), as pending. Other
+    line passes that need to know about code blocks (add_follower) get the
+    same line changes right after the FenceMap is updated.
+    """
+
+    TAG_PROPERTIES = {
+        'heading-1': {'weight': Pango.Weight.BOLD, 'scale': 1.4},
+        'heading-2': {'weight': Pango.Weight.BOLD, 'scale': 1.2},
+        'heading': {'weight': Pango.Weight.BOLD},
+        'quote': {'foreground': '#888a85', 'style': Pango.Style.ITALIC},
+        'list': {'foreground': '#3465a4', 'weight': Pango.Weight.BOLD},
+        'checkbox': {'foreground': '#3465a4', 'weight': Pango.Weight.BOLD},
+        'task-done': {'foreground': '#888a85', 'strikethrough': True},
+        'code': {'background': 'rgba(128,128,128,0.18)'},
+        'strong': {'weight': Pango.Weight.BOLD},
+        'emphasis': {'style': Pango.Style.ITALIC},
+        'link': {'foreground': '#3465a4', 'underline': Pango.Underline.SINGLE},
+        'code-block': {'paragraph-background': 'rgba(128,128,128,0.12)'},
+    }
+
+    def __init__(self, text_view, text_processor):
+        super().__init__(text_view)
+        self.text_processor = text_processor
+        self.fences = FenceMap()
+        self._followers = []
+
+        for kind in TOKEN_KINDS:
+            tag = self.text_buffer.create_tag(f'md-{kind}')
+            for name, value in self.TAG_PROPERTIES[kind].items():
+                tag.set_property(name, value)
+            self._tags[kind] = tag
+
+        self.text_processor.connect('text_edited', self._on_text_edited)
+        self.text_processor.connect('text_reset', self._on_text_reset)
+
+    def add_follower(self, tagger):
+        """Forward line changes to another LineTagger, after the fences"""
+        self._followers.append(tagger)
+
+    def _on_text_reset(self, processor):
+        """The whole document changed: start over"""
+        self.fences.reset(self.text_processor.get_snapshot())
+        for tagger in [self] + self._followers:
+            tagger.reset_lines()
+
+    def _on_text_edited(self, processor, edit):
+        """Mark the lines touched by an edit, and those it moved in or out
+        of a code block"""
+        first = self.text_buffer.get_iter_at_offset(edit.offset).get_line()
+        old_count = edit.removed.count('\n') + 1
+        new_count = edit.inserted.count('\n') + 1
+        if len(self._lines) - old_count + new_count != self.text_buffer.get_line_count():
+            # Out of step with the buffer (should not happen): redo everything
+            self._on_text_reset(processor)
+            return
+
+        start, end = self.line_bounds(first)
+        if new_count > 1:
+            end = self.line_bounds(first + new_count - 1)[1]
+        new_lines = self.text_buffer.get_text(start, end, False).split('\n')
+        changed = self.fences.splice(first, old_count, new_lines)
+        for tagger in [self] + self._followers:
+            tagger.replace_lines(first, old_count, new_count, changed)
+
+    def tag_line(self, line, start, end):
+        if self.fences.is_code(line):
+            self.text_buffer.apply_tag(self._tags['code-block'], start, end)
+            return
+        text = self.text_buffer.get_text(start, end, False).rstrip('\n')
+        if not text:
+            return
+        offset = start.get_offset()
+        for column_start, column_end, kind in tokenize_line(text):
+            self.text_buffer.apply_tag(self._tags[kind],
+                                       self.text_buffer.get_iter_at_offset(offset + column_start),
+                                       self.text_buffer.get_iter_at_offset(offset + column_end))
\ No newline at end of file
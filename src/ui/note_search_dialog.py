@@ -0,0 +1,244 @@
+"""
+Note Search Dialog - UI component for searching across all notes
+"""
+import os
+import re
+import gi
+
+gi.require_version('Gtk', '4.0')
+from gi.repository import Gtk, GLib
+
+from core.note_index import SNIPPET_START, SNIPPET_END
+
+MODE_INDEX = 'index'
+MODE_REGEX = 'regex'
+MODE_REGEX_IGNORE_CASE = 'regex-ignore-case'
+
+def snippet_to_markup(snippet):
+    """Escape a snippet for Pango, making the matched terms bold"""
+    markup = []
+    for i, part in enumerate(snippet.split(SNIPPET_START)):
+        matched, _, rest = part.partition(SNIPPET_END) if i else ('', '', part)
+        if matched:
+            markup.append(f'<b>{GLib.markup_escape_text(matched)}</b>')
+        markup.append(GLib.markup_escape_text(rest))
+    return ''.join(markup).replace('\n', ' ')
+
+def match_to_markup(line, pattern):
+    """Escape a grep snippet for Pango, making the first match bold"""
+    match = pattern.search(line)
+    if not match:
+        return GLib.markup_escape_text(line)
+    return (GLib.markup_escape_text(line[:match.start()])
+            + f'<b>{GLib.markup_escape_text(match.group())}</b>'
+            + GLib.markup_escape_text(line[match.end():]))
+
+class NoteSearchDialog(Gtk.Window):
+    """Window listing ranked notes that match the query
+
+    The index mode queries the full-text index. The regex modes scan every
+    note on the grep process pool; hits are appended as each batch finishes,
+    and changing the query or closing the window cancels the scan.
+    """
+
+    MODES = [('Texto completo', MODE_INDEX), ('Regex', MODE_REGEX),
+             ('Regex (ignorar mayúsculas)', MODE_REGEX_IGNORE_CASE)]
+
+    # Regex hits listed at most
+    MAX_GREP_RESULTS = 1000
+
+    def __init__(self, app):
+        super().__init__()
+        self.app = app
+        self._grep_job = None
+        self._grep_pattern = None
+
+        self.set_title('Buscar en notas')
+        self.set_default_size(640, 520)
+        self.set_transient_for(app.main_window)
+        self.set_hide_on_close(True)
+
+        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=10)
+        box.set_margin_start(12)
+        box.set_margin_end(12)
+        box.set_margin_top(12)
+        box.set_margin_bottom(12)
+
+        self.entry = Gtk.SearchEntry()
+        self.entry.set_placeholder_text('Buscar en todas las notas...')
+        self.entry.connect('search-changed', lambda e: self._run_search())
+        self.entry.connect('activate', lambda e: self._activate_first())
+        self.entry.connect('stop-search', lambda e: self.close())
+
+        self.mode_dropdown = Gtk.DropDown.new_from_strings([label for label, mode in self.MODES])
+        self.mode_dropdown.connect('notify::selected', self._on_mode_changed)
+
+        search_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=6)
+        self.entry.set_hexpand(True)
+        search_box.append(self.entry)
+        search_box.append(self.mode_dropdown)
+        box.append(search_box)
+
+        self.status_label = Gtk.Label()
+        self.status_label.set_halign(Gtk.Align.START)
+        self.status_label.add_css_class('dim-label')
+        box.append(self.status_label)
+
+        self.results = Gtk.ListBox()
+        self.results.set_selection_mode(Gtk.SelectionMode.BROWSE)
+        self.results.connect('row-activated', self._on_row_activated)
+
+        scrolled = Gtk.ScrolledWindow()
+        scrolled.set_vexpand(True)
+        scrolled.set_child(self.results)
+        box.append(scrolled)
+
+        self.set_child(box)
+        self.connect('close-request', lambda w: self._cancel_grep() or False)
+
+        # Escape to close
+        controller = Gtk.ShortcutController()
+        self.add_controller(controller)
+        shortcut = Gtk.Shortcut()
+        shortcut.set_trigger(Gtk.ShortcutTrigger.parse_string('Escape'))
+        shortcut.set_action(Gtk.CallbackAction.new(lambda w, a: self.close()))
+        controller.add_shortcut(shortcut)
+
+    def open(self):
+        """Show the dialog with the query selected"""
+        self.present()
+        self.entry.grab_focus()
+        self.entry.select_region(0, -1)
+        if not self.app.note_index.ready:
+            self.status_label.set_text('Indexando notas... los resultados pueden estar incompletos')
+
+    def _clear_results(self):
+        """Remove every result row"""
+        row = self.results.get_first_child()
+        while row:
+            next_row = row.get_next_sibling()
+            self.results.remove(row)
+            row = next_row
+
+    def _get_mode(self):
+        """Selected search mode"""
+        return self.MODES[self.mode_dropdown.get_selected()][1]
+
+    def _on_mode_changed(self, dropdown, pspec):
+        """Search again in the new mode"""
+        if self._get_mode() != MODE_INDEX:
+            self.app.note_grep.warm_up()
+        self._run_search()
+
+    def _run_search(self):
+        """Search the notes in the selected mode"""
+        self._cancel_grep()
+        self._clear_results()
+        self.entry.remove_css_class('error')
+        query = self.entry.get_text().strip()
+        if not query:
+            self.status_label.set_text('')
+            return
+        if self._get_mode() == MODE_INDEX:
+            self._search_index(query)
+        else:
+            self._start_grep(self.entry.get_text())
+
+    def _search_index(self, query):
+        """Query the full-text index and list the results"""
+
+        results = self.app.note_index.search(query)
+        for path, title, snippet in results:
+            self.results.append(self._build_row(path, title, snippet))
+
+        status = f'{len(results)} notas'
+        if not self.app.note_index.ready:
+            status += ' (indexando...)'
+        self.status_label.set_text(status)
+
+    def _start_grep(self, pattern):
+        """Start scanning every note for a regex"""
+        try:
+            self._grep_job = self.app.note_grep.search(
+                self.app.file_manager.get_notes_dir(), pattern,
+                lambda job, hits: GLib.idle_add(self._on_grep_hits, job, hits),
+                lambda job: GLib.idle_add(self._on_grep_done, job),
+                ignore_case=self._get_mode() == MODE_REGEX_IGNORE_CASE,
+                max_results=self.MAX_GREP_RESULTS
+            )
+        except re.error:
+            self.entry.add_css_class('error')
+            self.status_label.set_text('Regex inválida')
+            return
+        self._grep_pattern = re.compile(self._grep_job.pattern, self._grep_job.flags)
+        self.status_label.set_text('Buscando...')
+
+    def _cancel_grep(self):
+        """Stop the scan in progress"""
+        if self._grep_job:
+            self._grep_job.cancel()
+            self._grep_job = None
+
+    def _on_grep_hits(self, job, hits):
+        """Append a batch of regex hits (main loop)"""
+        if job is self._grep_job:
+            notes_dir = self.app.file_manager.get_notes_dir()
+            for path, line, column, snippet in hits:
+                heading = f'{os.path.relpath(path, notes_dir)}:{line}:{column}'
+                self.results.append(self._build_row(path, heading, snippet, line=line))
+            self.status_label.set_text(f'{job.count} coincidencias...')
+        return GLib.SOURCE_REMOVE
+
+    def _on_grep_done(self, job):
+        """Show the final hit count (main loop)"""
+        if job is self._grep_job:
+            self._grep_job = None
+            status = f'{job.count} coincidencias'
+            if job.truncated:
+                status += f' (se muestran las primeras {job.max_results})'
+            self.status_label.set_text(status)
+        return GLib.SOURCE_REMOVE
+
+    def _build_row(self, path, title, snippet, line=None):
+        """Build the row showing one result"""
+        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=2)
+        box.set_margin_top(6)
+        box.set_margin_bottom(6)
+
+        title_label = Gtk.Label()
+        title_label.set_markup(f'<b>{GLib.markup_escape_text(title or os.path.basename(path))}</b>')
+        title_label.set_halign(Gtk.Align.START)
+        box.append(title_label)
+
+        snippet_label = Gtk.Label()
+        if line is None:
+            snippet_label.set_markup(snippet_to_markup(snippet))
+        else:
+            snippet_label.set_markup(match_to_markup(snippet, self._grep_pattern))
+        snippet_label.set_halign(Gtk.Align.START)
+        snippet_label.set_wrap(True)
+        snippet_label.set_xalign(0)
+        box.append(snippet_label)
+
+        if line is None:
+            path_label = Gtk.Label(label=os.path.relpath(path, self.app.file_manager.get_notes_dir()))
+            path_label.set_halign(Gtk.Align.START)
+            path_label.add_css_class('dim-label')
+            box.append(path_label)
+
+        row = Gtk.ListBoxRow()
+        row.set_child(box)
+        row.path = path
+        row.line = line
+        return row
+
+    def _activate_first(self):
+        """Open the selected (or first) result"""
+        row = self.results.get_selected_row() or self.results.get_row_at_index(0)
+        if row:
+            self._on_row_activated(self.results, row)
+
+    def _on_row_activated(self, list_box, row):
+        """Open the note of a result"""
+        self.close()
+        self.app.open_note(row.path, row.line)
\ No newline at end of file
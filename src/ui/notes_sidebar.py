@@ -0,0 +1,101 @@
+"""
+Notes Sidebar - UI component listing every note from the catalog
+"""
+import os
+import gi
+
+gi.require_version('Gtk', '4.0')
+from gi.repository import Gtk, Pango
+
+class NotesSidebar(Gtk.Box):
+    """Filterable list of notes, most recently modified first
+
+    The list view only creates widgets for the visible rows and the model
+    holds paths, so showing 100k notes costs one sort of the catalog.
+    Refreshes while the sidebar is hidden are deferred until it is shown.
+    """
+
+    def __init__(self, app):
+        super().__init__(orientation=Gtk.Orientation.VERTICAL, spacing=6)
+        self.app = app
+        self._stale = True
+
+        self.set_size_request(260, -1)
+        self.set_margin_start(6)
+        self.set_margin_end(6)
+        self.set_margin_top(6)
+
+        self.entry = Gtk.SearchEntry()
+        self.entry.set_placeholder_text('Filtrar notas...')
+        self.entry.connect('search-changed', lambda e: self.refresh())
+        self.append(self.entry)
+
+        self.model = Gtk.StringList()
+        factory = Gtk.SignalListItemFactory()
+        factory.connect('setup', self._on_setup_row)
+        factory.connect('bind', self._on_bind_row)
+
+        self.list_view = Gtk.ListView(model=Gtk.SingleSelection(model=self.model), factory=factory)
+        self.list_view.set_single_click_activate(True)
+        self.list_view.connect('activate', self._on_activate)
+
+        scrolled = Gtk.ScrolledWindow()
+        scrolled.set_vexpand(True)
+        scrolled.set_child(self.list_view)
+        self.append(scrolled)
+
+        self.count_label = Gtk.Label()
+        self.count_label.add_css_class('dim-label')
+        self.append(self.count_label)
+
+        self.connect('show', self._on_show)
+
+    def _on_show(self, widget):
+        """Apply refreshes deferred while hidden"""
+        if self._stale:
+            self.refresh()
+
+    def _on_setup_row(self, factory, list_item):
+        """Create the widgets of a row"""
+        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
+        box.set_margin_top(4)
+        box.set_margin_bottom(4)
+        for css_class in (None, 'dim-label'):
+            label = Gtk.Label()
+            label.set_halign(Gtk.Align.START)
+            label.set_ellipsize(Pango.EllipsizeMode.END)
+            if css_class:
+                label.add_css_class(css_class)
+            box.append(label)
+        list_item.set_child(box)
+
+    def _on_bind_row(self, factory, list_item):
+        """Show a note in a row"""
+        path = list_item.get_item().get_string()
+        entry = self.app.catalog.get(path)
+        title_label = list_item.get_child().get_first_child()
+        dir_label = title_label.get_next_sibling()
+        title_label.set_text(entry.title if entry and entry.title else os.path.basename(path))
+        relative = os.path.relpath(os.path.dirname(path), self.app.catalog.notes_dir)
+        dir_label.set_text('' if relative == '.' else relative)
+
+    def _on_activate(self, list_view, position):
+        """Open the activated note"""
+        self.app.open_note(self.model.get_string(position))
+
+    def refresh(self):
+        """Rebuild the list from the catalog"""
+        if not self.get_visible():
+            self._stale = True
+            return
+        self._stale = False
+
+        query = self.entry.get_text().strip().lower()
+        entries = self.app.catalog.entries()
+        if query:
+            entries = [entry for entry in entries
+                       if query in entry.title.lower() or query in entry.path.lower()
+                       or query.lstrip('#') in entry.tags]
+        paths = [entry.path for entry in sorted(entries, key=lambda entry: entry.mtime_ns, reverse=True)]
+        self.model.splice(0, self.model.get_n_items(), paths)
+        self.count_label.set_text(f'{len(paths)} notas')
\ No newline at end of file
@@ -0,0 +1,68 @@
+"""
+Preview Pane - UI component showing the rendered markdown next to the editor
+"""
+import gi
+
+gi.require_version('Gtk', '4.0')
+from gi.repository import Gtk
+
+class PreviewPane(Gtk.ScrolledWindow):
+    """Live preview with one label per markdown block
+
+    Updates are diffed by block key: the unchanged blocks at the start and
+    end keep their labels, so only the edited blocks are replaced.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._keys = []
+        self._labels = []
+
+        self.set_size_request(300, -1)
+        self.box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=12)
+        self.box.set_margin_start(20)
+        self.box.set_margin_end(20)
+        self.box.set_margin_top(20)
+        self.box.set_margin_bottom(20)
+        self.set_child(self.box)
+
+    def _make_label(self, markup):
+        """Label showing a rendered block"""
+        label = Gtk.Label()
+        label.set_wrap(True)
+        label.set_xalign(0)
+        label.set_selectable(True)
+        label.set_markup(markup)
+        return label
+
+    def show_blocks(self, blocks):
+        """Show a list of (key, markup) blocks"""
+        keys = [key for key, markup in blocks]
+
+        # Unchanged blocks at both ends
+        prefix = 0
+        limit = min(len(keys), len(self._keys))
+        while prefix < limit and keys[prefix] == self._keys[prefix]:
+            prefix += 1
+        suffix = 0
+        while (suffix < limit - prefix
+               and keys[len(keys) - 1 - suffix] == self._keys[len(self._keys) - 1 - suffix]):
+            suffix += 1
+
+        for label in self._labels[prefix:len(self._labels) - suffix]:
+            self.box.remove(label)
+
+        sibling = self._labels[prefix - 1] if prefix else None
+        new_labels = []
+        for key, markup in blocks[prefix:len(blocks) - suffix]:
+            label = self._make_label(markup)
+            self.box.insert_child_after(label, sibling)
+            sibling = label
+            new_labels.append(label)
+
+        self._labels[prefix:len(self._labels) - suffix] = new_labels
+        self._keys = keys
+
+    def show_message(self, message):
+        """Replace the preview with a message"""
+        self.show_blocks([(None, message)])
\ No newline at end of file
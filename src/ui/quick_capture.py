@@ -6,8 +6,19 @@ import gi
 gi.require_version('Gtk', '4.0')
 from gi.repository import Gtk, Gdk
 
+from ui.undo_manager import UndoManager
+
 class QuickCapture:
-    """Quick capture dialog for instant note creation"""
+    """Quick capture dialog for instant note creation
+
+    The window is built once and hidden between captures, so showing it
+    again only resets the template, title and text. When the application
+    runs for a capture only (no main window), closing the dialog destroys
+    it and lets the process exit.
+    """
+
+    # Shared by every capture text view
+    _css_provider = None
 
     def __init__(self, app):
         self.app = app
@@ -26,13 +37,26 @@ class QuickCapture:
             'todo': "# TODO\n\n**Tasks:**\n- [ ] \n- [ ] \n- [ ] \n\n**Priority:** High/Medium/Low\n\n**Deadline:**\n\n"
         }
 
-    def show_capture_dialog(self, template_type=None):
-        """Show the quick capture dialog"""
+    @classmethod
+    def _get_css_provider(cls):
+        """CSS for the monospace font, loaded once"""
+        if cls._css_provider is None:
+            cls._css_provider = Gtk.CssProvider()
+            cls._css_provider.load_from_data(b"textview { font-family: monospace; font-size: 11pt; }")
+        return cls._css_provider
+
+    def prepare(self):
+        """Build the dialog ahead of time so the first capture shows at once"""
+        if self.window is None:
+            self._build_window()
+        return False
+
+    def _build_window(self):
+        """Build the capture window and its widgets"""
         self.window = Gtk.Window()
         self.window.set_title("Quick Capture")
         self.window.set_default_size(600, 400)
-        self.window.set_modal(True)
-        self.window.set_transient_for(self.app.main_window)
+        self.window.connect('close-request', lambda w: self._close() or True)
 
         # Main box
         box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=10)
@@ -44,16 +68,14 @@ class QuickCapture:
         # Template selector
         template_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=10)
         template_label = Gtk.Label(label="Template:")
-        template_combo = Gtk.ComboBoxText()
+        self.template_combo = Gtk.ComboBoxText()
 
         for template_name in self.templates.keys():
-            template_combo.append_text(template_name)
-
-        template_combo.set_active(0 if not template_type else list(self.templates.keys()).index(template_type) if template_type in self.templates else 0)
-        template_combo.connect('changed', self._on_template_changed)
+            self.template_combo.append_text(template_name)
+        self.template_combo.connect('changed', self._on_template_changed)
 
         template_box.append(template_label)
-        template_box.append(template_combo)
+        template_box.append(self.template_combo)
         box.append(template_box)
 
         # Title entry
@@ -74,11 +96,10 @@ class QuickCapture:
         self.capture_text.set_margin_end(10)
         self.capture_text.set_margin_top(10)
         self.capture_text.set_margin_bottom(10)
+        self.capture_text.get_style_context().add_provider(self._get_css_provider(),
+                                                           Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION)
 
-        # CSS for monospace font
-        css_provider = Gtk.CssProvider()
-        css_provider.load_from_data(b"textview { font-family: monospace; font-size: 11pt; }")
-        self.capture_text.get_style_context().add_provider(css_provider, Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION)
+        self.undo = UndoManager(self.capture_text.get_buffer())
 
         scrolled.set_child(self.capture_text)
         box.append(scrolled)
@@ -92,7 +113,7 @@ class QuickCapture:
         save_button.connect('clicked', self._on_save_clicked)
 
         cancel_button = Gtk.Button(label="Cancel")
-        cancel_button.connect('clicked', lambda b: self.window.destroy())
+        cancel_button.connect('clicked', lambda b: self._close())
 
         button_box.append(cancel_button)
         button_box.append(save_button)
@@ -100,9 +121,6 @@ class QuickCapture:
 
         self.window.set_child(box)
 
-        # Set initial template
-        self._set_template(template_combo.get_active_text())
-
         # Setup keyboard shortcuts
         controller = Gtk.ShortcutController()
         self.window.add_controller(controller)
@@ -113,13 +131,47 @@ class QuickCapture:
         shortcut.set_action(Gtk.CallbackAction.new(lambda w, a: self._on_save_clicked(None)))
         controller.add_shortcut(shortcut)
 
+        # Ctrl+Z / Ctrl+Y to undo and redo, template switches included
+        self.undo.add_shortcuts(self.window)
+
         # Escape to cancel
         shortcut = Gtk.Shortcut()
         shortcut.set_trigger(Gtk.ShortcutTrigger.parse_string('Escape'))
-        shortcut.set_action(Gtk.CallbackAction.new(lambda w, a: self.window.destroy()))
+        shortcut.set_action(Gtk.CallbackAction.new(lambda w, a: self._close()))
         controller.add_shortcut(shortcut)
 
+    def show_capture_dialog(self, template_type=None):
+        """Show the quick capture dialog"""
+        if self.window is None:
+            self._build_window()
+
+        # Start from a clean note with the requested template
+        names = list(self.templates.keys())
+        index = names.index(template_type) if template_type in self.templates else 0
+        self.title_entry.set_text('')
+        self.undo.reset()
+        if self.template_combo.get_active() == index:
+            self._set_template(names[index])
+        else:
+            self.template_combo.set_active(index)
+
+        main_window = self.app.main_window
+        self.window.set_transient_for(main_window)
+        self.window.set_modal(main_window is not None)
+        # Without a main window the dialog keeps the application running
+        self.window.set_application(self.app if main_window is None else None)
         self.window.present()
+        self.capture_text.grab_focus()
+
+    def _close(self):
+        """Hide the dialog, keeping its widgets for the next capture"""
+        if self.app.main_window is None:
+            # Capture-only instance: closing its only window ends the process
+            self.window.destroy()
+            self.window = None
+            return
+        self.window.set_application(None)
+        self.window.set_visible(False)
 
     def _on_template_changed(self, combo):
         """Handle template selection change"""
@@ -130,7 +182,8 @@ class QuickCapture:
         """Set the template content"""
         if template_name in self.templates:
             content = self.templates[template_name]
-            self.capture_text.get_buffer().set_text(content)
+            # Undoable, without copying the text the user is replacing
+            self.undo.set_text(content, lambda: content)
 
             # Suggest title based on template
             if not self.title_entry.get_text():
@@ -146,19 +199,8 @@ class QuickCapture:
         start, end = buffer.get_bounds()
         content = buffer.get_text(start, end, False)
 
-        # Create filename from title
-        filename = self._sanitize_filename(title) + ".md"
-
-        # Save the file
-        self.app.file_manager.save_file(filename, content)
-
-        self.window.destroy()
-
-    def _sanitize_filename(self, filename):
-        """Sanitize filename to be filesystem-safe"""
-        import re
-        # Replace invalid characters with underscores
-        return re.sub(r'[<>:"/\\|?*]', '_', filename).strip()
+        self.app.save_capture(title, content)
+        self._close()
 
     def capture_with_context(self, context_type=None, context_value=None):
         """Capture with context awareness"""
@@ -0,0 +1,130 @@
+"""
+Quick Open Dialog - UI component for jumping to a note by name (Ctrl+P)
+"""
+import os
+import gi
+
+gi.require_version('Gtk', '4.0')
+from gi.repository import Gtk, Gdk
+
+class QuickOpenDialog(Gtk.Window):
+    """Switcher fuzzy-matching note names and titles as the user types
+
+    Matches come from the in-memory trigram index, so each keystroke is
+    answered within the frame. With an empty query the most recently
+    modified notes are listed.
+    """
+
+    MAX_RESULTS = 30
+
+    def __init__(self, app):
+        super().__init__()
+        self.app = app
+
+        self.set_title('Abrir nota')
+        self.set_default_size(560, 420)
+        self.set_transient_for(app.main_window)
+        self.set_modal(True)
+        self.set_hide_on_close(True)
+
+        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=6)
+        box.set_margin_start(10)
+        box.set_margin_end(10)
+        box.set_margin_top(10)
+        box.set_margin_bottom(10)
+
+        self.entry = Gtk.SearchEntry()
+        self.entry.set_placeholder_text('Nombre o título de la nota...')
+        self.entry.set_search_delay(0)
+        self.entry.connect('search-changed', lambda e: self._update_results())
+        self.entry.connect('activate', lambda e: self._open_selected())
+        self.entry.connect('stop-search', lambda e: self.close())
+        box.append(self.entry)
+
+        self.results = Gtk.ListBox()
+        self.results.set_selection_mode(Gtk.SelectionMode.BROWSE)
+        self.results.connect('row-activated', lambda l, row: self._open_row(row))
+
+        scrolled = Gtk.ScrolledWindow()
+        scrolled.set_vexpand(True)
+        scrolled.set_child(self.results)
+        box.append(scrolled)
+
+        self.set_child(box)
+
+        # Up/Down move the selection while typing
+        keys = Gtk.EventControllerKey()
+        keys.set_propagation_phase(Gtk.PropagationPhase.CAPTURE)
+        keys.connect('key-pressed', self._on_key_pressed)
+        self.entry.add_controller(keys)
+
+    def open(self):
+        """Show the switcher with an empty query"""
+        self.entry.set_text('')
+        self._update_results()
+        self.present()
+        self.entry.grab_focus()
+
+    def _on_key_pressed(self, controller, keyval, keycode, state):
+        """Move the selection with the arrow keys"""
+        if keyval in (Gdk.KEY_Down, Gdk.KEY_Up):
+            row = self.results.get_selected_row()
+            index = row.get_index() if row else -1
+            index += 1 if keyval == Gdk.KEY_Down else -1
+            row = self.results.get_row_at_index(max(0, index))
+            if row:
+                self.results.select_row(row)
+            return True
+        return False
+
+    def _update_results(self):
+        """List the best matches of the query"""
+        row = self.results.get_first_child()
+        while row:
+            next_row = row.get_next_sibling()
+            self.results.remove(row)
+            row = next_row
+
+        query = self.entry.get_text().strip()
+        if query:
+            matches = self.app.quick_open.search(query, self.MAX_RESULTS)
+        else:
+            matches = [(entry.path, entry.title) for entry in self.app.catalog.recent(self.MAX_RESULTS)]
+
+        notes_dir = self.app.file_manager.get_notes_dir()
+        for path, title in matches:
+            self.results.append(self._build_row(path, title, notes_dir))
+        first = self.results.get_row_at_index(0)
+        if first:
+            self.results.select_row(first)
+
+    def _build_row(self, path, title, notes_dir):
+        """Build the row showing one note"""
+        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
+        box.set_margin_top(4)
+        box.set_margin_bottom(4)
+
+        title_label = Gtk.Label(label=title or os.path.basename(path))
+        title_label.set_halign(Gtk.Align.START)
+        box.append(title_label)
+
+        path_label = Gtk.Label(label=os.path.relpath(path, notes_dir))
+        path_label.set_halign(Gtk.Align.START)
+        path_label.add_css_class('dim-label')
+        box.append(path_label)
+
+        row = Gtk.ListBoxRow()
+        row.set_child(box)
+        row.path = path
+        return row
+
+    def _open_selected(self):
+        """Open the selected note"""
+        row = self.results.get_selected_row()
+        if row:
+            self._open_row(row)
+
+    def _open_row(self, row):
+        """Open the note of a row"""
+        self.close()
+        self.app.open_note(row.path)
\ No newline at end of file
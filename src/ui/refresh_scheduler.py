@@ -0,0 +1,88 @@
+"""
+Refresh Scheduler - UI component coalescing updates of derived views
+"""
+import time
+import gi
+
+gi.require_version('Gtk', '4.0')
+from gi.repository import GLib
+
+class RefreshScheduler:
+    """Coalesces invalidations of derived views and flushes them once per frame
+
+    Views (status bar, window title, preview...) are registered by name with a
+    render callback. Invalidating a view only marks it dirty; the callbacks run
+    later from the widget's GdkFrameClock (or an idle source when no frame
+    clock is available), at most once per frame however many edits happened.
+    Each flush stops once the latency budget is spent and leaves the remaining
+    views for the next frame, so rendering never blocks keystroke handling.
+    """
+
+    DEFAULT_BUDGET_MS = 8
+
+    def __init__(self, widget=None, budget_ms=DEFAULT_BUDGET_MS):
+        self.widget = widget
+        self.budget_ms = budget_ms
+        self._views = {}
+        self._dirty = {}
+        self._tick_id = 0
+        self._idle_id = 0
+
+    def register(self, name, callback):
+        """Register a derived view and its render callback"""
+        self._views[name] = callback
+
+    def set_budget(self, budget_ms):
+        """Set the maximum time in milliseconds spent rendering per frame"""
+        self.budget_ms = max(1, budget_ms)
+
+    def invalidate(self, *names):
+        """Mark views as dirty and schedule a flush"""
+        for name in names:
+            if name in self._views:
+                self._dirty[name] = True
+        if self._dirty:
+            self._schedule()
+
+    def _schedule(self):
+        """Schedule a flush on the next frame (or idle)"""
+        if self._tick_id or self._idle_id:
+            return
+
+        if self.widget is not None and self.widget.get_mapped():
+            self._tick_id = self.widget.add_tick_callback(self._on_tick)
+        else:
+            self._idle_id = GLib.idle_add(self._on_idle, priority=GLib.PRIORITY_DEFAULT_IDLE)
+
+    def _on_tick(self, widget, frame_clock):
+        """Frame clock callback"""
+        self._tick_id = 0
+        self._flush(self.budget_ms)
+        if self._dirty:
+            self._schedule()
+        return GLib.SOURCE_REMOVE
+
+    def _on_idle(self):
+        """Idle callback used when the widget has no frame clock"""
+        self._idle_id = 0
+        self._flush(self.budget_ms)
+        if self._dirty:
+            self._schedule()
+        return GLib.SOURCE_REMOVE
+
+    def _flush(self, budget_ms):
+        """Render dirty views until the budget is exhausted"""
+        deadline = time.monotonic() + budget_ms / 1000.0
+
+        # Views invalidated while flushing wait for the next frame
+        pending = list(self._dirty)
+        for name in pending:
+            self._dirty.pop(name, None)
+            callback = self._views.get(name)
+            if callback:
+                try:
+                    callback()
+                except Exception as e:
+                    print(f"Error refreshing {name}: {e}")
+            if time.monotonic() >= deadline:
+                break
@@ -0,0 +1,217 @@
+"""
+Search Bar - UI component for incremental in-document search (Ctrl+F)
+"""
+import re
+import gi
+
+gi.require_version('Gtk', '4.0')
+from gi.repository import Gtk, GLib
+
+from core.search import IncrementalMatcher, MODE_PLAIN, MODE_IGNORE_CASE, MODE_REGEX
+
+class SearchBar(Gtk.SearchBar):
+    """Search bar highlighting every match of the query in the editor
+
+    Matching and tagging run in idle time slices, so typing a query or
+    editing a huge document never blocks the main loop.
+    """
+
+    MODES = [('Texto', MODE_PLAIN), ('Ignorar mayúsculas', MODE_IGNORE_CASE), ('Regex', MODE_REGEX)]
+
+    # Time spent matching and number of matches tagged per idle iteration
+    STEP_BUDGET_MS = 5
+    TAGS_PER_STEP = 2000
+    RESTART_DELAY_MS = 150
+
+    def __init__(self, text_view, text_processor):
+        super().__init__()
+        self.text_view = text_view
+        self.text_buffer = text_view.get_buffer()
+        self.text_processor = text_processor
+        self.matcher = IncrementalMatcher()
+
+        self._tagged = 0
+        self._current = -1
+        self._step_id = 0
+        self._restart_id = 0
+
+        self._match_tag = self.text_buffer.create_tag('search-match', background='#fce94f', foreground='#000000')
+        self._current_tag = self.text_buffer.create_tag('search-current', background='#f57900', foreground='#000000')
+
+        self._build_ui()
+
+        self.text_processor.connect('text_edited', self._on_text_changed)
+        self.text_processor.connect('text_reset', self._on_text_changed)
+        self.connect('notify::search-mode-enabled', self._on_search_mode_changed)
+
+    def _build_ui(self):
+        """Build the search bar widgets"""
+        box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=6)
+
+        self.entry = Gtk.SearchEntry()
+        self.entry.set_placeholder_text('Buscar en el documento...')
+        self.entry.set_size_request(300, -1)
+        self.entry.connect('search-changed', lambda e: self._restart())
+        self.entry.connect('activate', lambda e: self.next_match())
+        self.entry.connect('next-match', lambda e: self.next_match())
+        self.entry.connect('previous-match', lambda e: self.previous_match())
+        self.entry.connect('stop-search', lambda e: self.set_search_mode(False))
+        box.append(self.entry)
+
+        self.mode_dropdown = Gtk.DropDown.new_from_strings([label for label, mode in self.MODES])
+        self.mode_dropdown.connect('notify::selected', lambda d, p: self._restart())
+        box.append(self.mode_dropdown)
+
+        previous_button = Gtk.Button()
+        previous_button.set_icon_name('go-up-symbolic')
+        previous_button.set_tooltip_text('Anterior (Shift+Ctrl+G)')
+        previous_button.connect('clicked', lambda b: self.previous_match())
+        box.append(previous_button)
+
+        next_button = Gtk.Button()
+        next_button.set_icon_name('go-down-symbolic')
+        next_button.set_tooltip_text('Siguiente (Ctrl+G)')
+        next_button.connect('clicked', lambda b: self.next_match())
+        box.append(next_button)
+
+        self.count_label = Gtk.Label()
+        self.count_label.set_margin_start(6)
+        box.append(self.count_label)
+
+        self.set_child(box)
+        self.connect_entry(self.entry)
+        self.set_show_close_button(True)
+
+    def open(self):
+        """Show the bar and focus the entry, seeded with the selection"""
+        bounds = self.text_buffer.get_selection_bounds()
+        if bounds:
+            start, end = bounds
+            if start.get_line() == end.get_line():
+                self.entry.set_text(self.text_buffer.get_text(start, end, False))
+        self.set_search_mode(True)
+        self.entry.grab_focus()
+
+    def _get_mode(self):
+        """Selected search mode"""
+        return self.MODES[self.mode_dropdown.get_selected()][1]
+
+    def _on_search_mode_changed(self, bar, pspec):
+        """Clear highlights when the bar is closed"""
+        if self.get_search_mode():
+            self._restart()
+        else:
+            self._stop()
+            self._clear_tags()
+            self.text_view.grab_focus()
+
+    def _on_text_changed(self, processor, edit=None):
+        """Match offsets are stale after an edit: search again shortly"""
+        if not self.get_search_mode() or not self.entry.get_text():
+            return
+        self._stop()
+        if self._restart_id:
+            GLib.source_remove(self._restart_id)
+        self._restart_id = GLib.timeout_add(self.RESTART_DELAY_MS, self._on_restart_timeout)
+
+    def _on_restart_timeout(self):
+        """Debounced restart after edits"""
+        self._restart_id = 0
+        self._restart()
+        return GLib.SOURCE_REMOVE
+
+    def _stop(self):
+        """Stop the search in progress"""
+        if self._step_id:
+            GLib.source_remove(self._step_id)
+            self._step_id = 0
+
+    def _clear_tags(self):
+        """Remove every search highlight"""
+        start, end = self.text_buffer.get_bounds()
+        self.text_buffer.remove_tag(self._match_tag, start, end)
+        self.text_buffer.remove_tag(self._current_tag, start, end)
+        self._tagged = 0
+        self._current = -1
+
+    def _restart(self):
+        """Start searching the current query"""
+        self._stop()
+        self._clear_tags()
+        self.entry.remove_css_class('error')
+
+        query = self.entry.get_text()
+        try:
+            self.matcher.start(self.text_processor.get_snapshot() if query else '',
+                               query, self._get_mode(), self.text_processor.revision)
+        except re.error:
+            self.entry.add_css_class('error')
+            self.count_label.set_text('Regex inválida')
+            return
+
+        self._update_label()
+        if query:
+            self._step_id = GLib.idle_add(self._step, priority=GLib.PRIORITY_LOW)
+
+    def _step(self):
+        """Match and tag a slice of the document"""
+        finished = self.matcher.step(self.STEP_BUDGET_MS)
+
+        end = min(len(self.matcher), self._tagged + self.TAGS_PER_STEP)
+        for index in range(self._tagged, end):
+            start_offset, end_offset = self.matcher.get_match(index)
+            self.text_buffer.apply_tag(self._match_tag,
+                                       self.text_buffer.get_iter_at_offset(start_offset),
+                                       self.text_buffer.get_iter_at_offset(end_offset))
+        self._tagged = end
+
+        self._update_label()
+        if finished and self._tagged == len(self.matcher):
+            self._step_id = 0
+            return GLib.SOURCE_REMOVE
+        return GLib.SOURCE_CONTINUE
+
+    def _update_label(self):
+        """Show the match count and position"""
+        if not self.matcher.query:
+            self.count_label.set_text('')
+            return
+        count = len(self.matcher)
+        suffix = '' if self.matcher.done else '...'
+        if self._current >= 0:
+            self.count_label.set_text(f'{self._current + 1} de {count}{suffix}')
+        else:
+            self.count_label.set_text(f'{count} coincidencias{suffix}')
+
+    def _cursor_offset(self):
+        """Offset of the cursor (start of the selection)"""
+        return self.text_buffer.get_iter_at_mark(self.text_buffer.get_insert()).get_offset()
+
+    def next_match(self):
+        """Select the next match after the cursor"""
+        self._select(self.matcher.next_match(self._cursor_offset()))
+
+    def previous_match(self):
+        """Select the previous match before the cursor"""
+        self._select(self.matcher.previous_match(self._cursor_offset()))
+
+    def _select(self, index):
+        """Select and scroll to a match"""
+        if index < 0:
+            return
+
+        if self._current >= 0 and self._current < len(self.matcher):
+            start_offset, end_offset = self.matcher.get_match(self._current)
+            self.text_buffer.remove_tag(self._current_tag,
+                                        self.text_buffer.get_iter_at_offset(start_offset),
+                                        self.text_buffer.get_iter_at_offset(end_offset))
+
+        start_offset, end_offset = self.matcher.get_match(index)
+        start = self.text_buffer.get_iter_at_offset(start_offset)
+        end = self.text_buffer.get_iter_at_offset(end_offset)
+        self.text_buffer.apply_tag(self._current_tag, start, end)
+        self.text_buffer.select_range(start, end)
+        self.text_view.scroll_to_iter(start, 0.1, False, 0.0, 0.0)
+
+        self._current = index
+        self._update_label()
\ No newline at end of file
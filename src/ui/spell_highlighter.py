@@ -0,0 +1,96 @@
+"""
+Spell Highlighter - UI component underlining misspelled words in the editor
+"""
+import gi
+
+gi.require_version('Gtk', '4.0')
+from gi.repository import Gdk, Gio, Pango
+
+from ui.line_tagger import LineTagger
+
+class SpellHighlighter(LineTagger):
+    """Underlines misspelled words, one line at a time
+
+    Follows a MarkdownHighlighter, which forwards its line changes: an
+    edit re-checks only the lines it touched, the viewport is checked
+    before the next frame and the rest of the note in idle slices, and
+    fenced code is skipped. Off until set_checker() provides a
+    SpellChecker, since loading a dictionary takes a moment.
+    """
+
+    def __init__(self, text_view, highlighter):
+        super().__init__(text_view)
+        self.highlighter = highlighter
+        self.checker = None
+        self.enabled = False
+
+        tag = self.text_buffer.create_tag('spell-error')
+        tag.set_property('underline', Pango.Underline.ERROR)
+        color = Gdk.RGBA()
+        color.parse('#cc0000')
+        tag.set_property('underline-rgba', color)
+        self._tags['error'] = tag
+        highlighter.add_follower(self)
+
+        # "Add to dictionary" in the editor's context menu
+        actions = Gio.SimpleActionGroup()
+        self._add_action = Gio.SimpleAction.new('add-word', None)
+        self._add_action.connect('activate', lambda a, p: self._add_word_at_cursor())
+        self._add_action.set_enabled(False)
+        actions.add_action(self._add_action)
+        self.text_view.insert_action_group('spell', actions)
+        menu = Gio.Menu()
+        menu.append('Añadir al diccionario', 'spell.add-word')
+        self.text_view.set_extra_menu(menu)
+        self.text_buffer.connect('notify::cursor-position', lambda b, p: self._update_add_action())
+
+    def set_checker(self, checker):
+        """Use a SpellChecker and check the whole note again"""
+        self.checker = checker
+        self.reset_lines()
+
+    def set_enabled(self, enabled):
+        super().set_enabled(enabled and self.checker is not None)
+        self._update_add_action()
+
+    def tag_line(self, line, start, end):
+        if self.highlighter.fences.is_code(line):
+            return
+        text = self.text_buffer.get_text(start, end, False)
+        if not text.strip():
+            return
+        offset = start.get_offset()
+        for column_start, column_end in self.checker.misspelled(text):
+            self.text_buffer.apply_tag(self._tags['error'],
+                                       self.text_buffer.get_iter_at_offset(offset + column_start),
+                                       self.text_buffer.get_iter_at_offset(offset + column_end))
+
+    def _error_at_cursor(self):
+        """(start, end) iters of the underlined word at the cursor, or None"""
+        tag = self._tags['error']
+        position = self.text_buffer.get_iter_at_mark(self.text_buffer.get_insert())
+        if not position.has_tag(tag):
+            # The cursor may be right after the word
+            if not position.backward_char() or not position.has_tag(tag):
+                return None
+        start = position.copy()
+        if not start.starts_tag(tag):
+            start.backward_to_tag_toggle(tag)
+        end = position.copy()
+        end.forward_to_tag_toggle(tag)
+        return start, end
+
+    def _update_add_action(self):
+        """Offer "Add to dictionary" only on a misspelled word"""
+        self._add_action.set_enabled(self.enabled and self._error_at_cursor() is not None)
+
+    def _add_word_at_cursor(self):
+        """Accept the misspelled word at the cursor and check the note again"""
+        bounds = self._error_at_cursor()
+        if not bounds or not self.checker:
+            return
+        self.checker.add_word(self.text_buffer.get_text(bounds[0], bounds[1], False))
+        # Verdicts are cached, so this is cheap
+        self.mark_stale()
+        self._schedule()
+        self._update_add_action()
\ No newline at end of file
@@ -16,16 +16,32 @@ class StatusBar(Gtk.Label):
         self.set_margin_end(10)
         self.set_margin_top(5)
         self.set_margin_bottom(5)
+        self._stats = {}
+        self._filename = None
+        self._progress = None
         self.update({}, None)
 
     def update(self, stats, filename=None):
         """Update status bar with new statistics and filename"""
+        self._stats = stats
+        self._filename = filename
+
         lines = stats.get('lines', 0)
         words = stats.get('words', 0)
         chars = stats.get('chars', 0)
 
+        # Counts still being computed (large files) are shown as '...'
+        lines, words, chars = ('...' if value is None else value for value in (lines, words, chars))
+
         status = f"Líneas: {lines} | Palabras: {words} | Caracteres: {chars}"
         if filename:
             status += f" | {filename}"
+        if self._progress is not None:
+            status += f" | Cargando... {int(self._progress * 100)}% (Esc para cancelar)"
+
+        self.set_text(status)
 
-        self.set_text(status)
\ No newline at end of file
+    def set_progress(self, fraction):
+        """Show load progress (0.0 - 1.0), or hide it with None"""
+        self._progress = fraction
+        self.update(self._stats, self._filename)
\ No newline at end of file
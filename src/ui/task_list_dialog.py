@@ -0,0 +1,148 @@
+"""
+Task List Dialog - UI component listing the tasks of every note
+"""
+import os
+import gi
+
+gi.require_version('Gtk', '4.0')
+from gi.repository import Gtk, Pango
+
+class TaskListDialog(Gtk.Window):
+    """Window listing the `- [ ]` tasks of every note, from the task index
+
+    Checking a task toggles it in its note (see NotasApp.toggle_task);
+    activating a row opens the note at the task's line.
+    """
+
+    # Tasks listed at most
+    MAX_TASKS = 1000
+
+    def __init__(self, app):
+        super().__init__()
+        self.app = app
+        self._updating = False
+
+        self.set_title('Tareas')
+        self.set_default_size(640, 520)
+        self.set_transient_for(app.main_window)
+        self.set_hide_on_close(True)
+
+        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=10)
+        box.set_margin_start(12)
+        box.set_margin_end(12)
+        box.set_margin_top(12)
+        box.set_margin_bottom(12)
+
+        self.entry = Gtk.SearchEntry()
+        self.entry.set_placeholder_text('Filtrar tareas...')
+        self.entry.set_hexpand(True)
+        self.entry.connect('search-changed', lambda e: self.refresh())
+        self.entry.connect('stop-search', lambda e: self.close())
+
+        self.done_check = Gtk.CheckButton(label='Mostrar completadas')
+        self.done_check.connect('toggled', lambda b: self.refresh())
+
+        filter_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=6)
+        filter_box.append(self.entry)
+        filter_box.append(self.done_check)
+        box.append(filter_box)
+
+        self.status_label = Gtk.Label()
+        self.status_label.set_halign(Gtk.Align.START)
+        self.status_label.add_css_class('dim-label')
+        box.append(self.status_label)
+
+        self.results = Gtk.ListBox()
+        self.results.set_selection_mode(Gtk.SelectionMode.BROWSE)
+        self.results.connect('row-activated', self._on_row_activated)
+
+        scrolled = Gtk.ScrolledWindow()
+        scrolled.set_vexpand(True)
+        scrolled.set_child(self.results)
+        box.append(scrolled)
+
+        self.set_child(box)
+
+        # Escape to close
+        controller = Gtk.ShortcutController()
+        self.add_controller(controller)
+        shortcut = Gtk.Shortcut()
+        shortcut.set_trigger(Gtk.ShortcutTrigger.parse_string('Escape'))
+        shortcut.set_action(Gtk.CallbackAction.new(lambda w, a: self.close()))
+        controller.add_shortcut(shortcut)
+
+    def open(self):
+        """Show the dialog with the current tasks"""
+        self.refresh()
+        self.present()
+        self.entry.grab_focus()
+
+    def refresh(self):
+        """List the tasks matching the filter"""
+        row = self.results.get_first_child()
+        while row:
+            next_row = row.get_next_sibling()
+            self.results.remove(row)
+            row = next_row
+
+        query = self.entry.get_text().strip().lower()
+        tasks = self.app.tasks.tasks(pending_only=not self.done_check.get_active())
+        if query:
+            tasks = [task for task in tasks if query in task.text.lower()]
+        for task in tasks[:self.MAX_TASKS]:
+            self.results.append(self._build_row(task))
+
+        pending, done = self.app.tasks.counts()
+        status = f'{pending} pendientes, {done} completadas'
+        if len(tasks) > self.MAX_TASKS:
+            status += f' (se muestran las primeras {self.MAX_TASKS})'
+        self.status_label.set_text(status)
+
+    def _build_row(self, task):
+        """Build the row of a task: its checkbox, text and note"""
+        check = Gtk.CheckButton()
+        check.set_active(task.done)
+        check.set_valign(Gtk.Align.CENTER)
+
+        text_label = Gtk.Label(label=task.text)
+        text_label.set_halign(Gtk.Align.START)
+        text_label.set_ellipsize(Pango.EllipsizeMode.END)
+
+        note = os.path.relpath(task.path, self.app.file_manager.get_notes_dir())
+        note_label = Gtk.Label(label=f'{note}:{task.line + 1}')
+        note_label.set_halign(Gtk.Align.START)
+        note_label.set_ellipsize(Pango.EllipsizeMode.MIDDLE)
+        note_label.add_css_class('dim-label')
+
+        labels = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=2)
+        labels.set_hexpand(True)
+        labels.append(text_label)
+        labels.append(note_label)
+
+        row_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=8)
+        row_box.set_margin_top(4)
+        row_box.set_margin_bottom(4)
+        row_box.append(check)
+        row_box.append(labels)
+
+        row = Gtk.ListBoxRow()
+        row.set_child(row_box)
+        row.task = task
+        check.connect('toggled', self._on_check_toggled, row)
+        return row
+
+    def _on_check_toggled(self, check, row):
+        """Toggle the task in its note, or undo the click if that failed"""
+        if self._updating:
+            return
+        updated = self.app.toggle_task(row.task)
+        if updated is None:
+            self._updating = True
+            check.set_active(row.task.done)
+            self._updating = False
+            return
+        row.task = updated
+
+    def _on_row_activated(self, listbox, row):
+        """Open the note at the task's line"""
+        self.app.open_note(row.task.path, row.task.line + 1)
\ No newline at end of file
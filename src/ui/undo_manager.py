@@ -0,0 +1,105 @@
+"""
+Undo Manager - UI component providing undo/redo for a text buffer
+"""
+import gi
+
+gi.require_version('Gtk', '4.0')
+from gi.repository import Gtk
+
+from core.undo_history import UndoHistory
+
+class UndoManager:
+    """Undo/redo for a Gtk.TextBuffer, recorded in a memory-bounded
+    UndoHistory instead of the buffer's built-in history
+
+    Buffer edits are recorded as they happen, one group per user action
+    (begin/end-user-action). Code replacing the whole text reports it with
+    reset(): a file load starts a new history, a template switch records
+    how to produce the template.
+    """
+
+    def __init__(self, text_buffer, max_bytes=None):
+        self.text_buffer = text_buffer
+        self.history = UndoHistory(max_bytes)
+        self._applying = False
+
+        # The built-in history keeps a copy of every change, unbounded
+        self.text_buffer.set_enable_undo(False)
+        # Block these together with other buffer handlers to edit unrecorded
+        self.handler_ids = [
+            self.text_buffer.connect('insert-text', self._on_insert_text),
+            self.text_buffer.connect('delete-range', self._on_delete_range),
+            self.text_buffer.connect('begin-user-action', lambda b: self.history.begin_group()),
+            self.text_buffer.connect('end-user-action', lambda b: self.history.end_group()),
+        ]
+
+    def _on_insert_text(self, buffer, location, text, length):
+        """Record an insertion (before it happens: location is where it goes)"""
+        if not self._applying:
+            self.history.record_insert(location.get_offset(), text)
+
+    def _on_delete_range(self, buffer, start, end):
+        """Record a deletion (before it happens, while the text is there)"""
+        if not self._applying:
+            self.history.record_delete(start.get_offset(), buffer.get_text(start, end, False))
+
+    def reset(self, loader=None):
+        """The whole text was replaced: by loader()'s text, or by a loaded file"""
+        self.history.record_reset(loader)
+
+    def set_text(self, text, loader):
+        """Replace the whole text, undoably; loader() must return text again"""
+        self._applying = True
+        try:
+            self.text_buffer.set_text(text)
+        finally:
+            self._applying = False
+        self.history.record_reset(loader)
+
+    def undo(self):
+        """Revert the last group of edits; returns whether there was one"""
+        return self._apply(self.history.undo())
+
+    def redo(self):
+        """Apply the last undone group again; returns whether there was one"""
+        return self._apply(self.history.redo())
+
+    def _apply(self, operations):
+        """Apply history operations to the buffer and put the cursor after them"""
+        if operations is None:
+            return False
+        buffer = self.text_buffer
+        cursor = 0
+        self._applying = True
+        try:
+            for kind, offset, text in operations:
+                if kind == 'insert':
+                    buffer.insert(buffer.get_iter_at_offset(offset), text)
+                    cursor = offset + len(text)
+                elif kind == 'delete':
+                    buffer.delete(buffer.get_iter_at_offset(offset), buffer.get_iter_at_offset(offset + len(text)))
+                    cursor = offset
+                else:
+                    buffer.set_text(text)
+                    cursor = len(text)
+        finally:
+            self._applying = False
+        buffer.place_cursor(buffer.get_iter_at_offset(cursor))
+        return True
+
+    def add_shortcuts(self, widget, on_applied=None):
+        """Ctrl+Z, Ctrl+Y and Ctrl+Shift+Z on a widget"""
+        controller = Gtk.ShortcutController()
+        widget.add_controller(controller)
+        for trigger, step in (('<Control>z', self.undo), ('<Control>y', self.redo),
+                              ('<Control><Shift>z', self.redo)):
+            shortcut = Gtk.Shortcut()
+            shortcut.set_trigger(Gtk.ShortcutTrigger.parse_string(trigger))
+            shortcut.set_action(Gtk.CallbackAction.new(lambda w, a, step=step: self._on_shortcut(step, on_applied)))
+            controller.add_shortcut(shortcut)
+
+    def _on_shortcut(self, step, on_applied):
+        """Undo or redo from a shortcut"""
+        if step() and on_applied:
+            on_applied()
+        return True
\ No newline at end of file
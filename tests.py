@@ -3,8 +3,11 @@
 
 import tempfile
 import os
+import sys
 from pathlib import Path
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
 
 def test_file_operations():
     """Test operaciones básicas de archivo"""
@@ -45,6 +48,49 @@ def test_text_stats():
     assert chars == 3
 
 
+def test_incremental_stats():
+    """Test estadísticas incrementales contra un recuento completo"""
+    try:
+        from core.text_processor import TextProcessor
+    except (ImportError, ValueError):
+        # Si PyGObject no está instalado, skip el test
+        return
+
+    processor = TextProcessor()
+    processor.reset("")
+    text = ""
+
+    def insert(offset, inserted):
+        nonlocal text
+        processor.apply_insert(offset, inserted, text[offset - 1:offset], text[offset:offset + 1])
+        text = text[:offset] + inserted + text[offset:]
+        assert processor.get_statistics() == processor.get_statistics(text), text
+
+    def delete(offset, length):
+        nonlocal text
+        removed = text[offset:offset + length]
+        processor.apply_delete(offset, removed, text[offset - 1:offset], text[offset + length:offset + length + 1])
+        text = text[:offset] + text[offset + length:]
+        assert processor.get_statistics() == processor.get_statistics(text), text
+
+    # Escribir carácter a carácter, con espacios y saltos de línea
+    for char in "Hola mundo\nadiós  mundo ":
+        insert(len(text), char)
+    # Partir y unir palabras en medio del texto
+    insert(2, " ")
+    insert(3, "\n")
+    delete(2, 2)
+    insert(4, "xx yy")
+    delete(len("Hola mun"), 6)
+    insert(0, " \t")
+    insert(len(text), "pegado de\nvarias palabras")
+    # Borrar carácter a carácter desde el final, y luego todo de golpe
+    for _ in range(10):
+        delete(len(text) - 1, 1)
+    delete(0, len(text))
+    assert processor.get_statistics() == {'lines': 0, 'words': 0, 'chars': 0}
+
+
 def test_markdown_conversion():
     """Test conversión básica de markdown"""
     try:
@@ -61,9 +107,909 @@ def test_markdown_conversion():
         pass
 
 
+def test_stream_load():
+    """Test carga por trozos: UTF-8 partido, cancelación y carga reemplazada"""
+    try:
+        import gi
+        gi.require_version("GLib", "2.0")
+        from gi.repository import GLib
+        from core.file_manager import FileManager
+    except (ImportError, ValueError):
+        # Si PyGObject no está instalado, skip el test
+        return
+
+    manager = FileManager()
+    # Trozos de 10 bytes: la "ñ" (2 bytes) queda partida entre dos trozos
+    manager.LOAD_CHUNK_SIZE = 10
+    events = []
+    chunks = {}
+    loop = GLib.MainLoop()
+
+    def on_chunk(manager, filename, text):
+        chunks.setdefault(filename, []).append(text)
+
+    def on_end(name):
+        def handler(manager, filename, *args):
+            events.append((name, filename))
+            loop.quit()
+        return handler
+
+    manager.connect("load_chunk", on_chunk)
+    manager.connect("file_loaded", on_end("loaded"))
+    manager.connect("load_cancelled", on_end("cancelled"))
+    manager.connect("file_error", on_end("error"))
+
+    def run():
+        events.clear()
+        chunks.clear()
+        timeout_id = GLib.timeout_add_seconds(5, loop.quit)
+        loop.run()
+        GLib.source_remove(timeout_id)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        first = os.path.join(temp_dir, "primera.md")
+        second = os.path.join(temp_dir, "segunda.md")
+        text = "123456789ñandú\n" * 20
+        Path(first).write_text(text, encoding="utf-8")
+        Path(second).write_text("otra nota\n" * 8, encoding="utf-8")
+
+        manager.load_file_async(first)
+        assert manager.is_loading()
+        run()
+        assert events == [("loaded", first)]
+        assert "".join(chunks[first]) == text
+        assert not manager.is_loading() and manager.current_file == first
+
+        # Cancelada a mitad: acaba en load_cancelled, sin file_loaded
+        manager.current_file = None
+        handler_id = manager.connect("load_chunk", lambda manager, filename, text: manager.cancel_load())
+        manager.load_file_async(first)
+        run()
+        manager.disconnect(handler_id)
+        assert events == [("cancelled", first)]
+        assert not manager.is_loading() and manager.current_file is None
+
+        # Una carga nueva a mitad reemplaza a la anterior sin mezclar trozos
+        def supersede(manager, filename, text):
+            if filename == first:
+                manager.disconnect(handler_id)
+                manager.load_file_async(second)
+        handler_id = manager.connect("load_chunk", supersede)
+        manager.load_file_async(first)
+        run()
+        assert events == [("loaded", second)]
+        assert len(chunks[first]) == 1
+        assert "".join(chunks[second]) == "otra nota\n" * 8
+        assert manager.current_file == second
+
+        # Los trozos pendientes de la carga reemplazada no emiten nada
+        context = GLib.MainContext.default()
+        while context.iteration(False):
+            pass
+        assert events == [("loaded", second)]
+
+
+def test_atomic_save():
+    """Test escritura atómica con guardados agrupados"""
+    import threading
+    import time
+    from core.storage import AtomicWriter, write_atomic
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "nota.md")
+        write_atomic(path, "original")
+        assert Path(path).read_text() == "original"
+
+        # El primer guardado retiene al escritor mientras llegan los demás
+        other = os.path.join(temp_dir, "otra.md")
+        release = threading.Event()
+        results = []
+
+        def on_done(p, error):
+            results.append((p, error))
+            if p == other:
+                assert release.wait(5)
+
+        writer = AtomicWriter(on_done)
+        writer.submit(other, "primera")
+        while not results:
+            time.sleep(0.001)
+        for i in range(50):
+            writer.submit(path, f"versión {i}")
+        release.set()
+        assert writer.flush(timeout=5)
+        writer.stop()
+
+        # Los 50 guardados pendientes se escriben una sola vez, con la última versión
+        assert results == [(other, None), (path, None)]
+        assert Path(path).read_text() == "versión 49"
+        assert Path(other).read_text() == "primera"
+        assert not [name for name in os.listdir(temp_dir) if name.endswith(".tmp")]
+        assert sorted(os.listdir(temp_dir)) == ["nota.md", "otra.md"]
+
+
+def test_large_file():
+    """Test índice de líneas y estadísticas de archivos grandes"""
+    import bisect
+    import time
+    try:
+        import gi
+        gi.require_version("GLib", "2.0")
+        from gi.repository import GLib
+        from core.large_file import LargeFile
+    except (ImportError, ValueError):
+        # Si PyGObject no está instalado, skip el test
+        return
+
+    class SmallChunks(LargeFile):
+        # Trozos pequeños: las palabras y los caracteres UTF-8 quedan partidos
+        STATS_CHUNK_SIZE = 1001
+
+    block = LargeFile.BLOCK_SIZE
+    # La primera línea acaba justo antes del límite del primer bloque
+    lines = ["a" * (block - 1)]
+    size = block
+    while size < 3 * block + 5000:
+        line = f"línea {len(lines)} ñandú" + " palabra" * (len(lines) % 13)
+        lines.append(line)
+        size += len(line.encode("utf-8")) + 1
+    lines.append("última sin salto")
+    text = "\n".join(lines)
+    data = text.encode("utf-8")
+
+    offsets = [0]
+    for line in lines[:-1]:
+        offsets.append(offsets[-1] + len(line.encode("utf-8")) + 1)
+    assert offsets[1] == block
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "grande.txt")
+        Path(path).write_bytes(data)
+
+        large_file = SmallChunks(path)
+        deadline = time.monotonic() + 10
+        while large_file.get_statistics()["words"] is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert large_file.is_indexed()
+
+        # Las líneas alrededor de cada límite de bloque
+        checked = {0, 1, 2, len(lines) - 1}
+        for boundary in range(block, len(data), block):
+            line = bisect.bisect_right(offsets, boundary) - 1
+            checked.update((line - 1, line, line + 1))
+        for line in sorted(checked):
+            assert large_file.line_offset(line) == offsets[line], line
+            assert large_file.get_lines(line, 2) == lines[line:line + 2], line
+        assert large_file.line_offset(len(lines)) == len(data)
+
+        assert large_file.get_line_count() == len(lines)
+        assert large_file.get_statistics() == {
+            "lines": len(lines), "words": len(text.split()), "chars": len(text)
+        }
+
+        large_file.close()
+        context = GLib.MainContext.default()
+        while context.iteration(False):
+            pass
+
+
+def test_large_file_close():
+    """Test cerrar un archivo grande con avisos del índice pendientes"""
+    import time
+    try:
+        import gi
+        gi.require_version("GLib", "2.0")
+        from gi.repository import GLib
+        from core.large_file import LargeFile
+    except (ImportError, ValueError):
+        # Si PyGObject no está instalado, skip el test
+        return
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "grande.txt")
+        Path(path).write_text("una línea de texto\n" * 60000, encoding="utf-8")
+
+        large_file = LargeFile(path)
+        calls = []
+        # Como la vista: cada aviso vuelve a leer líneas del mmap
+        large_file.connect("index_progress", lambda f, fraction: calls.append(f.get_lines(0, 1)))
+        large_file.connect("index_ready", lambda f: calls.append(f.get_lines(0, 1)))
+
+        deadline = time.monotonic() + 10
+        while not large_file.is_indexed() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        large_file.close()
+
+        # Los avisos encolados antes de cerrar ya no se emiten
+        context = GLib.MainContext.default()
+        while context.iteration(False):
+            pass
+        assert calls == []
+
+
+def test_autosave_timers():
+    """Test autosave: espera a que se deje de escribir, con un máximo sin guardar"""
+    import time
+    try:
+        import gi
+        gi.require_version("GLib", "2.0")
+        from gi.repository import GObject, GLib
+        from core.autosave import AutoSave
+        from core.text_processor import TextProcessor
+    except (ImportError, ValueError):
+        # Si PyGObject no está instalado, skip el test
+        return
+
+    class FakeFileManager(GObject.Object):
+        __gsignals__ = {"file_saved": (GObject.SignalFlags.RUN_FIRST, None, (str,))}
+
+        def __init__(self):
+            super().__init__()
+            self.current_file = "/tmp/nota.md"
+            self.saves = []
+
+        def save_file(self, filename, content="", set_current=True):
+            self.saves.append(content)
+            self.emit("file_saved", filename)
+
+    def run_loop(ms):
+        context = GLib.MainContext.default()
+        deadline = time.monotonic() + ms / 1000
+        while time.monotonic() < deadline:
+            context.iteration(False)
+            time.sleep(0.002)
+
+    def is_live(source_id):
+        return GLib.MainContext.default().find_source_by_id(source_id) is not None
+
+    text = [""]
+    processor = TextProcessor()
+    processor.set_snapshot_source(lambda: text[0])
+
+    def type_key():
+        processor.apply_insert(len(text[0]), "a")
+        text[0] += "a"
+
+    manager = FakeFileManager()
+    autosave = AutoSave(manager, processor)
+
+    # Debounce: una ráfaga de teclas se guarda una vez, y el tope se retira
+    autosave.IDLE_DELAY_MS = 50
+    autosave.MAX_INTERVAL_MS = 10000
+    for _ in range(5):
+        type_key()
+        run_loop(10)
+    max_id = autosave._max_id
+    assert max_id and is_live(max_id)
+    run_loop(150)
+    assert manager.saves == ["aaaaa"]
+    assert not is_live(max_id)
+    assert autosave._idle_id == autosave._max_id == 0
+    assert not autosave.is_dirty()
+
+    # Tope: escribiendo sin pausa se guarda al vencer el intervalo máximo
+    autosave.IDLE_DELAY_MS = 100
+    autosave.MAX_INTERVAL_MS = 300
+    manager.saves.clear()
+    deadline = time.monotonic() + 0.45
+    while time.monotonic() < deadline:
+        type_key()
+        run_loop(20)
+    assert len(manager.saves) == 1
+    run_loop(300)
+    assert len(manager.saves) == 2 and manager.saves[-1] == text[0]
+    assert autosave._idle_id == autosave._max_id == 0
+
+
+def test_refresh_scheduler():
+    """Test refresco agrupado de vistas con presupuesto por frame"""
+    import time
+    try:
+        import gi
+        gi.require_version("GLib", "2.0")
+        from gi.repository import GLib
+        from ui.refresh_scheduler import RefreshScheduler
+    except (ImportError, ValueError):
+        # Si PyGObject no está instalado, skip el test
+        return
+
+    context = GLib.MainContext.default()
+    rendered = []
+
+    def view(name, cost_s=0):
+        def render():
+            rendered.append(name)
+            time.sleep(cost_s)
+        return render
+
+    # Sin widget se usa un idle: muchas invalidaciones, un solo render
+    scheduler = RefreshScheduler()
+    scheduler.register("status", view("status"))
+    scheduler.register("title", view("title"))
+    for _ in range(20):
+        scheduler.invalidate("status", "desconocida")
+    scheduler.invalidate("title")
+    while context.iteration(False):
+        pass
+    assert sorted(rendered) == ["status", "title"]
+
+    # Agotado el presupuesto, el resto espera al siguiente refresco
+    rendered.clear()
+    scheduler = RefreshScheduler(budget_ms=1)
+    for name in ("a", "b", "c"):
+        scheduler.register(name, view(name, 0.005))
+    scheduler.invalidate("a", "b", "c")
+    context.iteration(False)
+    assert rendered == ["a"]
+    while context.iteration(False):
+        pass
+    assert rendered == ["a", "b", "c"]
+
+
+def test_edit_journal_replay():
+    """Test recuperación de ediciones desde el journal"""
+    from core.edit_journal import EditJournal, find_journals, replay
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        note = os.path.join(temp_dir, "nota.md")
+        Path(note).write_text("Hola mundo")
+        journal_dir = os.path.join(temp_dir, "journal")
+
+        journal = EditJournal(journal_dir)
+        # Abrir una nota sin editarla no escribe nada
+        journal.start(note)
+        journal.close()
+        assert not os.path.exists(journal_dir)
+
+        journal.start(note)
+        assert not os.path.exists(journal_dir)
+        journal.record_insert(1, 10, "!")
+        journal.record_delete(2, 0, 5)
+        journal.record_insert(3, 0, "Adiós ")
+        journal.close()
+
+        [journal_path] = find_journals(journal_dir)
+        assert replay(journal_path) == (note, "Adiós mundo!")
+
+        # Al guardar se descartan las ediciones ya escritas
+        journal.resume(journal_path, note)
+        Path(note).write_text("Adiós mundo!")
+        journal.compact(0, note)
+        journal.close()
+        assert replay(journal_path) is None
+
+        # Si el archivo cambió por fuera, el journal no se aplica
+        journal.start(note)
+        journal.record_insert(1, 0, "x")
+        journal.close()
+        Path(note).write_text("otro contenido")
+        assert replay(journal_path) is None
+
+
+def test_incremental_search():
+    """Test búsqueda incremental en el documento"""
+    from core.search import IncrementalMatcher, MODE_PLAIN, MODE_IGNORE_CASE, MODE_REGEX
+
+    text = "Hola mundo\nhola MUNDO\nholas"
+    matcher = IncrementalMatcher()
+
+    matcher.start(text, "hola", MODE_PLAIN, revision=1)
+    matcher.run()
+    assert list(matcher.starts) == [11, 22]
+
+    matcher.start(text, "hola", MODE_IGNORE_CASE, revision=1)
+    matcher.run()
+    assert list(matcher.starts) == [0, 11, 22]
+
+    # Extender la consulta reutiliza los resultados anteriores
+    matcher.start(text, "holas", MODE_IGNORE_CASE, revision=1)
+    matcher.run()
+    assert list(matcher.starts) == [22]
+
+    matcher.start(text, r"m\w+", MODE_REGEX, revision=1)
+    matcher.run()
+    assert [matcher.get_match(i) for i in range(len(matcher))] == [(5, 10)]
+
+    # Navegación circular
+    matcher.start(text, "o", MODE_PLAIN, revision=2)
+    matcher.run()
+    assert matcher.get_match(matcher.next_match(text.rindex("o")))[0] == 1
+    assert matcher.get_match(matcher.previous_match(0))[0] == text.rindex("o")
+
+
+def test_note_titles():
+    """Test recorrido de notas y extracción de títulos"""
+    from core.notes_tree import iter_note_files, extract_title
+
+    assert extract_title("#tag suelto\n\n## Reunión semanal ##\ntexto") == "Reunión semanal"
+    assert extract_title("\nPrimera línea\nsegunda") == "Primera línea"
+    assert extract_title("", "/tmp/notas/idea.md") == "idea"
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        os.makedirs(os.path.join(tmpdir, "sub"))
+        os.makedirs(os.path.join(tmpdir, ".notas"))
+        for name in ("a.md", "sub/b.txt", "c.png", ".oculta.md", ".notas/d.md"):
+            with open(os.path.join(tmpdir, name), "w") as f:
+                f.write("x")
+        found = sorted(os.path.relpath(path, tmpdir) for path, st in iter_note_files(tmpdir))
+        assert found == ["a.md", os.path.join("sub", "b.txt")]
+
+
+def test_note_index():
+    """Test índice de texto completo: búsqueda y actualización incremental"""
+    import time
+    try:
+        import gi
+        gi.require_version("GLib", "2.0")
+        from gi.repository import GLib
+        from core.note_index import NoteIndex
+    except (ImportError, ValueError):
+        # Si PyGObject no está instalado, skip el test
+        return
+
+    context = GLib.MainContext.default()
+
+    def wait_for(condition):
+        deadline = time.monotonic() + 10
+        while not condition():
+            assert time.monotonic() < deadline
+            context.iteration(False)
+            time.sleep(0.005)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        notes_dir = os.path.join(tmpdir, "Notas")
+        os.makedirs(os.path.join(notes_dir, "proyectos"))
+        garden = os.path.join(notes_dir, "jardin.md")
+        budget = os.path.join(notes_dir, "proyectos", "presupuesto.md")
+        Path(garden).write_text("# Plan de jardín\nregar las plantas", encoding="utf-8")
+        Path(budget).write_text("# Presupuesto\ncomprar macetas y plantas", encoding="utf-8")
+
+        index = NoteIndex(notes_dir, os.path.join(tmpdir, "estado", "index.sqlite"))
+        index.start()
+        try:
+            wait_for(lambda: index.ready)
+
+            def paths(query):
+                return sorted(row[0] for row in index.search(query))
+
+            assert paths("plantas") == [garden, budget]
+            # Sin tildes y con el último término como prefijo
+            assert paths("jardin") == [garden]
+            assert paths("maceta") == [budget]
+            assert index.search("presupuesto")[0][:2] == (budget, "Presupuesto")
+
+            # El worker recorre el árbol; el main loop solo crea los monitores
+            wait_for(lambda: len(index._monitors) == 2)
+
+            # Solo se reindexa la nota modificada, y las borradas desaparecen
+            Path(garden).write_text("# Plan de huerto\nsembrar tomates", encoding="utf-8")
+            index.update_file(garden)
+            wait_for(lambda: paths("tomates") == [garden])
+            assert paths("plantas") == [budget]
+
+            os.unlink(budget)
+            index.update_file(budget)
+            wait_for(lambda: paths("presupuesto") == [])
+            assert paths("plantas") == []
+        finally:
+            index.stop()
+
+
+def test_note_grep():
+    """Test búsqueda regex en paralelo sobre las notas"""
+    import re
+    import threading
+    from core.note_grep import grep_file, ParallelGrep
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "claves.md")
+        with open(path, "w") as f:
+            f.write("# Claves\nnada aquí\ntoken=ghp_abc123 y ghp_zz9\n")
+        for i in range(20):
+            with open(os.path.join(tmpdir, f"nota{i}.md"), "w") as f:
+                f.write("ghp_x\n" * 10)
+
+        hits = grep_file(path, re.compile(r"ghp_\w+"), 10)
+        assert hits == [(path, 3, 7, "token=ghp_abc123 y ghp_zz9"),
+                        (path, 3, 20, "token=ghp_abc123 y ghp_zz9")]
+
+        grep = ParallelGrep(workers=2)
+        found = []
+        done = threading.Event()
+        try:
+            job = grep.search(tmpdir, r"GHP_\w+", lambda job, hits: found.extend(hits),
+                              lambda job: done.set(), ignore_case=True, max_results=50)
+            assert done.wait(30)
+        finally:
+            grep.shutdown()
+        assert job.count == len(found) == 50
+        assert job.truncated
+
+
+def test_notes_catalog():
+    """Test catálogo de notas con caché y reescaneo incremental"""
+    from core.notes_catalog import NotesCatalog
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache = os.path.join(tmpdir, ".notas", "catalog.bin")
+        os.makedirs(os.path.join(tmpdir, "proyectos"))
+        with open(os.path.join(tmpdir, "a.md"), "w") as f:
+            f.write("# Compras\nleche #casa\n")
+        with open(os.path.join(tmpdir, "proyectos", "b.md"), "w") as f:
+            f.write("Plan del proyecto #trabajo\n")
+
+        catalog = NotesCatalog(tmpdir, cache)
+        assert catalog.rescan()
+        catalog.save()
+
+        catalog = NotesCatalog(tmpdir, cache)
+        assert catalog.load()
+        assert len(catalog) == 2
+        entry = catalog.get(os.path.join(tmpdir, "a.md"))
+        assert entry.title == "Compras" and entry.tags == ("casa",)
+        assert [e.title for e in catalog.with_tag("trabajo")] == ["Plan del proyecto #trabajo"]
+        assert not catalog.rescan()
+
+        # Nota nueva y nota modificada
+        with open(os.path.join(tmpdir, "proyectos", "c.md"), "w") as f:
+            f.write("# Nueva\n")
+        with open(os.path.join(tmpdir, "a.md"), "a") as f:
+            f.write("pan #super\n")
+        os.utime(os.path.join(tmpdir, "a.md"), ns=(1, 2 * 10**18))
+        assert catalog.rescan()
+        assert len(catalog) == 3
+        assert catalog.get(os.path.join(tmpdir, "a.md")).tags == ("casa", "super")
+        assert catalog.recent(1)[0].title == "Compras"
+
+
+def test_quick_open():
+    """Test búsqueda difusa de notas por nombre y título"""
+    from core.quick_open import TrigramIndex, normalize
+
+    assert normalize("Reunión_Semanal.md") == "reunion semanal md"
+
+    index = TrigramIndex()
+    index.sync([
+        ("/notas/reunion-semanal.md", "Reunión semanal del equipo"),
+        ("/notas/compras.md", "Lista de compras"),
+        ("/notas/ideas/proyecto.md", "Ideas para el proyecto"),
+    ])
+    assert index.search("reunion")[0][0] == "/notas/reunion-semanal.md"
+    # Tolera errores de tipeo
+    assert index.search("reunoin sem")[0][0] == "/notas/reunion-semanal.md"
+    assert index.search("proyecto ideas")[0][0] == "/notas/ideas/proyecto.md"
+
+    index.update("/notas/compras.md", "Supermercado")
+    assert index.search("supermer")[0] == ("/notas/compras.md", "Supermercado")
+    index.remove("/notas/compras.md")
+    assert index.search("supermer") == []
+    assert len(index) == 2
+
+
+def test_markdown_blocks():
+    """Test división en bloques y conversión a marcado Pango"""
+    from core.markdown_blocks import split_blocks, html_to_pango, BlockCache
+
+    text = "# Título\n\nUn párrafo\nseguido\n\n```\ncódigo\n\nmás\n```\n\n- a\n\n- b\n    sigue"
+    assert split_blocks(text) == ["# Título", "Un párrafo\nseguido", "```\ncódigo\n\nmás\n```",
+                                  "- a\n\n- b\n    sigue"]
+
+    assert html_to_pango("<h1>A &amp; B</h1>") == '<span size="xx-large" weight="bold">A &amp; B</span>'
+    assert html_to_pango("<p>x <strong>y</strong> <code>&lt;z&gt;</code></p>") == "x <b>y</b> <tt>&lt;z&gt;</tt>"
+    assert html_to_pango("<ol start=\"3\">\n<li>a</li>\n<li>b</li>\n</ol>") == "3. a\n4. b"
+
+    cache = BlockCache(max_blocks=2)
+    for block in ("a", "b", "c"):
+        cache.put(BlockCache.key(block), block.upper())
+    assert cache.get(BlockCache.key("a")) is None
+    assert cache.get(BlockCache.key("c")) == "C"
+
+
+def test_block_document():
+    """Test bloques de Markdown actualizados desde las ediciones"""
+    import random
+    from core.markdown_blocks import BlockDocument, BlockCache, split_blocks, reference_definitions
+
+    pieces = ["\n", "\n\n", "```\n", "- ", "1. ", "    ", "texto ", "# T", "[a]: http://x\n", "[a] ", "  \n"]
+    rng = random.Random(7)
+    for _ in range(50):
+        text = "".join(rng.choice(pieces) for _ in range(rng.randrange(40)))
+        document = BlockDocument(text)
+        for _ in range(40):
+            if text and rng.random() < 0.4:
+                offset = rng.randrange(len(text))
+                removed = rng.randrange(1, min(8, len(text) - offset) + 1)
+                text = text[:offset] + text[offset + removed:]
+                document.apply_edit(offset, "", removed)
+            else:
+                offset = rng.randrange(len(text) + 1)
+                inserted = rng.choice(pieces)
+                text = text[:offset] + inserted + text[offset:]
+                document.apply_edit(offset, inserted)
+
+            # Igual que dividir el texto entero, con las mismas claves
+            blocks = split_blocks(text)
+            references = reference_definitions(blocks)
+            assert document.text() == text
+            assert document.blocks() == [(BlockCache.key(block, references if "[" in block else ""), block)
+                                         for block in blocks]
+
+    # Una edición solo vuelve a dividir los bloques de alrededor
+    document = BlockDocument("".join(f"Párrafo {i:03}\n\n" for i in range(100)))
+    first, last = document._segments[0], document._segments[-1]
+    document.apply_edit(len("Párrafo 000\n\n") * 50, "nuevo ")
+    assert document._segments[0] is first and document._segments[-1] is last
+    assert document.blocks()[50][1] == "nuevo Párrafo 050"
+
+
+def test_html_export_manifest():
+    """Test exportación a HTML que solo reconvierte notas modificadas"""
+    try:
+        import markdown  # noqa: F401
+    except ImportError:
+        # Si no está instalado, skip el test
+        return
+    from core.html_export import HtmlExporter
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        notes_dir = os.path.join(tmpdir, "Notas")
+        output_dir = os.path.join(tmpdir, "Notas-html")
+        os.makedirs(os.path.join(notes_dir, "sub"))
+        for name in ("a.md", "b.md", os.path.join("sub", "c.md")):
+            with open(os.path.join(notes_dir, name), "w") as f:
+                f.write(f"# {name}\n\nVer [b](b.md)\n")
+
+        exporter = HtmlExporter(notes_dir, output_dir, workers=2)
+        result = exporter.run()
+        assert (result.converted, result.unchanged) == (3, 0)
+        with open(os.path.join(output_dir, "a.html")) as f:
+            assert 'href="b.html"' in f.read()
+
+        with open(os.path.join(notes_dir, "a.md"), "a") as f:
+            f.write("más\n")
+        os.unlink(os.path.join(notes_dir, "b.md"))
+        result = exporter.run()
+        assert (result.converted, result.unchanged, result.removed) == (1, 1, 1)
+        assert not os.path.exists(os.path.join(output_dir, "b.html"))
+
+
+def test_startup_profile():
+    """Test tiempos por fase del perfil de arranque"""
+    from core.startup_profile import StartupProfile
+
+    profile = StartupProfile(origin=0.0)
+    profile.mark("importaciones")
+    profile.mark("primer frame")
+    names = [name for name, elapsed, total in profile.phases]
+    assert names == ["importaciones", "primer frame"]
+    assert all(elapsed >= 0 for name, elapsed, total in profile.phases)
+    assert profile.total_ms() == profile.phases[-1][2]
+    assert abs(sum(elapsed for name, elapsed, total in profile.phases) - profile.total_ms()) < 1e-6
+    assert "primer frame" in profile.report()
+
+
+def test_capture_inbox():
+    """Test bandeja de capturas: anexado, registro cortado y archivado en notas"""
+    from core.capture_inbox import CaptureInbox
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        inbox = CaptureInbox(os.path.join(temp_dir, ".notas", "inbox.log"), temp_dir)
+        inbox.append("Idea", "uno")
+        inbox.append("Idea", "dos")
+
+        # Un registro cortado por un fallo no oculta los siguientes
+        with open(inbox.path, "ab") as f:
+            f.write(b"\x10\x00\x00")
+        CaptureInbox(inbox.path, temp_dir).append("../Otra", "tres")
+        assert [title for title, content, created in inbox.pending()] == ["Idea", "Idea", "../Otra"]
+
+        # Mismo título: se numera en vez de sobrescribir
+        inbox.BATCH_RECORDS = 2
+        filed = inbox.compact()
+        assert sorted(os.path.basename(path) for path in filed) == ["Idea (2).md", "Idea.md", "___Otra.md"]
+        assert Path(temp_dir, "Idea (2).md").read_text() == "dos"
+        assert not inbox.has_pending() and inbox.pending() == []
+
+        # Archivar de nuevo la misma captura no la duplica
+        inbox.append("Idea", "uno")
+        assert [os.path.basename(path) for path in inbox.compact()] == ["Idea.md"]
+
+
+def test_markdown_syntax():
+    """Test tokenizado de líneas y bloques de código mantenidos por ediciones"""
+    from core.markdown_syntax import FenceMap, tokenize_line
+
+    kinds = [kind for start, end, kind in tokenize_line("- [x] hecho con `a*b*` y **negrita**")]
+    assert kinds == ["list", "checkbox", "task-done", "code", "strong"]
+    assert tokenize_line("# Título")[0] == (0, 8, "heading-1")
+    assert tokenize_line("snake_case_word") == []
+
+    def code_lines(lines):
+        fences = FenceMap()
+        fences.reset("\n".join(lines))
+        return [fences.is_code(i) for i in range(len(lines))]
+
+    lines = ["# Nota", "```py", "x = 1", "```", "texto", "~~~", "fin"]
+    fences = FenceMap()
+    fences.reset("\n".join(lines))
+    assert code_lines(lines) == [False, True, True, True, False, True, True]
+
+    # Borrar la apertura del bloque cambia lo que sigue, y se informa
+    changed = fences.splice(1, 2, ["x = 1"])
+    lines[1:3] = ["x = 1"]
+    assert [fences.is_code(i) for i in range(len(lines))] == code_lines(lines)
+    assert any(start <= 2 and (end is None or end > 3) for start, end in changed)
+
+    # Una edición sin delimitadores solo desplaza las líneas
+    assert fences.splice(0, 1, ["# Nota", "más"]) == []
+    lines[0:1] = ["# Nota", "más"]
+    assert [fences.is_code(i) for i in range(len(lines))] == code_lines(lines)
+
+
+def test_spell_check():
+    """Test diccionario local, caché acotada y palabras ignoradas"""
+    from core.spell_check import SpellChecker, load_words
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        dictionary = os.path.join(temp_dir, "es.dic")
+        with open(dictionary, "w", encoding="utf-8") as f:
+            f.write("3\ncasa/S\nperro\nMadrid\n")
+        assert load_words(dictionary) == {"casa", "perro", "Madrid"}
+
+        personal = os.path.join(temp_dir, "state", "dictionary.txt")
+        checker = SpellChecker.load(dictionary, personal)
+        checker.CACHE_WORDS = 2
+        line = "Perro en Madrid: `cassa` http://gato.com ONU perrro"
+        assert [line[start:end] for start, end in checker.misspelled(line)] == ["en", "perrro"]
+        assert len(checker._cache) <= 2
+
+        # Las palabras añadidas se guardan en el diccionario personal
+        checker.add_word("perrro")
+        assert SpellChecker.load(dictionary, personal).check("perrro")
+
+
+def test_undo_history():
+    """Test deshacer agrupado por palabras, plantillas y presupuesto de memoria"""
+    from core.undo_history import UndoHistory
+
+    now = [0.0]
+    history = UndoHistory(clock=lambda: now[0])
+    history.record_reset(lambda: "")
+    document = ""
+
+    def apply(operations):
+        nonlocal document
+        for kind, offset, text in operations:
+            if kind == "insert":
+                document = document[:offset] + text + document[offset:]
+            elif kind == "delete":
+                document = document[:offset] + document[offset + len(text):]
+            else:
+                document = text
+
+    # Se escribe letra a letra; se deshace palabra a palabra
+    for offset, char in enumerate("hola mundo"):
+        history.record_insert(offset, char)
+    document = "hola mundo"
+    apply(history.undo())
+    assert document == "hola "
+    apply(history.redo())
+    assert document == "hola mundo"
+
+    # Un cambio de plantilla guarda cómo obtenerla, no una copia del texto
+    history.record_reset(lambda: "# Idea\n")
+    document = "# Idea\n"
+    apply(history.undo())
+    assert document == "hola mundo"
+    apply(history.redo())
+    assert document == "# Idea\n"
+
+    # Con un presupuesto pequeño se olvidan los grupos más antiguos
+    history = UndoHistory(max_bytes=4096, clock=lambda: now[0])
+    for i in range(2000):
+        now[0] += 2
+        history.record_insert(i * 2, "w ")
+    assert history.memory_used <= 4096
+    assert history.can_undo()
+
+
+def test_task_index():
+    """Test índice de tareas: lectura, caché y marcado en el archivo"""
+    from core.notes_catalog import NotesCatalog
+    from core.task_index import TaskIndex
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        note = os.path.join(temp_dir, "proyecto.md")
+        Path(note).write_text("# Proyecto\n- [ ] escribir\n```\n- [ ] no es tarea\n```\n* [x] revisar\n",
+                              encoding="utf-8")
+        catalog = NotesCatalog(temp_dir, os.path.join(temp_dir, ".notas", "catalog.bin"))
+        catalog.rescan()
+
+        tasks = TaskIndex(temp_dir, os.path.join(temp_dir, ".notas", "tasks.bin"))
+        assert tasks.sync(catalog.entries())
+        assert [(task.line, task.done, task.text) for task in tasks.tasks()] == [(1, False, "escribir"),
+                                                                                 (5, True, "revisar")]
+        # Sin cambios en disco no se relee nada
+        assert not tasks.sync(catalog.entries())
+
+        # Marcar una tarea cambia solo su carácter
+        updated = tasks.toggle(tasks.tasks()[0])
+        assert updated.done
+        assert Path(note).read_text(encoding="utf-8").startswith("# Proyecto\n- [x] escribir\n")
+        assert tasks.counts() == (0, 2)
+
+        # La caché guarda las tareas y el estado de cada nota
+        tasks.save()
+        cached = TaskIndex(temp_dir, os.path.join(temp_dir, ".notas", "tasks.bin"))
+        assert cached.load() and cached.tasks() == tasks.tasks()
+        catalog.rescan()
+        assert not cached.sync(catalog.entries())
+
+
+def test_link_graph():
+    """Test enlaces [[...]], índice inverso persistido y actualización por nota"""
+    from core.link_graph import LinkGraph, parse_links
+    from core.notes_catalog import NotesCatalog
+
+    assert parse_links("[[Proyecto X|px]] y [[proyecto  x#plan]] `[[código]]` [[Idea.md]]") == ("proyecto x", "idea")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        project = os.path.join(temp_dir, "Proyecto X.md")
+        idea = os.path.join(temp_dir, "Idea.md")
+        other = os.path.join(temp_dir, "Otra.md")
+        Path(project).write_text("# Plan maestro\nver [[Idea]]", encoding="utf-8")
+        Path(idea).write_text("# Idea\nvuelve a [[Plan maestro]]", encoding="utf-8")
+        Path(other).write_text("[[idea]]", encoding="utf-8")
+
+        cache_path = os.path.join(temp_dir, ".notas", "links.bin")
+        graph = LinkGraph(temp_dir, cache_path)
+        catalog = NotesCatalog(temp_dir, os.path.join(temp_dir, ".notas", "catalog.bin"))
+        catalog.rescan()
+        assert graph.sync(catalog.entries())
+        assert graph.backlinks(idea) == [other, project]
+        # Se enlaza por título o por nombre de archivo
+        assert graph.backlinks(project, "Plan maestro") == [idea]
+
+        # Solo se reemplazan las aristas de la nota modificada
+        Path(other).write_text("sin enlaces", encoding="utf-8")
+        os.utime(other, ns=(1, 1))
+        assert graph.update_file(other)
+        assert graph.backlinks(idea) == [project]
+
+        graph.save()
+        cached = LinkGraph(temp_dir, cache_path)
+        assert cached.load() and cached.backlinks(idea) == [project]
+        catalog.rescan()
+        assert not cached.sync(catalog.entries())
+
+
 if __name__ == "__main__":
     # Ejecutar tests básicos
     test_file_operations()
     test_text_stats()
+    test_incremental_stats()
     test_markdown_conversion()
+    test_stream_load()
+    test_atomic_save()
+    test_large_file()
+    test_large_file_close()
+    test_autosave_timers()
+    test_refresh_scheduler()
+    test_edit_journal_replay()
+    test_incremental_search()
+    test_note_titles()
+    test_note_index()
+    test_note_grep()
+    test_notes_catalog()
+    test_quick_open()
+    test_markdown_blocks()
+    test_block_document()
+    test_html_export_manifest()
+    test_startup_profile()
+    test_capture_inbox()
+    test_markdown_syntax()
+    test_spell_check()
+    test_undo_history()
+    test_task_index()
+    test_link_graph()
     print("Todos los tests pasaron!")
\ No newline at end of file